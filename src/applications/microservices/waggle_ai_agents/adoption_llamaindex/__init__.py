@@ -1,5 +1,5 @@
 """Adoption sub-agent (LlamaIndex)."""
 
-from waggle_ai_agents.adoption_llamaindex.agent import run
+from waggle_ai_agents.adoption_llamaindex.agent import run, stream_run
 
-__all__ = ["run"]
+__all__ = ["run", "stream_run"]
@@ -2,13 +2,25 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
+import time
 
-from llama_index.core.agent.workflow import FunctionAgent
+from llama_index.core.agent.workflow import AgentStream, FunctionAgent
 from llama_index.core.tools import FunctionTool
 from llama_index.llms.bedrock_converse import BedrockConverse
 
-from waggle_ai_agents.common import config, models, petstore
+from waggle_ai_agents.common import (
+    config,
+    fallback,
+    instrumentation,
+    model_gate,
+    models,
+    petstore,
+    prefetch,
+    resolver,
+    usage,
+)
 from waggle_ai_agents.common.asyncrun import run_coro_sync
 
 ADOPTION_PROMPT = """You are the Adoption specialist for Waggle, the PetStore assistant.
@@ -26,11 +38,11 @@ map the customer's words to these (a "cat" is a kitten, a "dog" is a puppy, a
   it if the customer asks about recent/past adoptions, never to show availability.
 
 Customers usually refer to a pet by its PET ID (clicking a photo in the chat sends
-"adopt pet <petid>, the <pettype>"). Call `search_available_pets` to confirm that
-pet's type, color and price, describe it, and ask the customer to confirm. Only
-call `complete_adoption` once they confirm, because adopting is a real transaction.
-If the customer instead gives a PHOTO URL, match it against each pet's `peturl` to
-get the petid. If nothing matches, say so and show what is available instead.
+"adopt pet <petid>, the <pettype>") or by a PHOTO URL. If the message comes with
+resolved references, use those pet details as given; otherwise call `resolve_pet`
+with the petid or URL. Describe the pet (type, color, price) and ask the customer
+to confirm. Only call `complete_adoption` once they confirm, because adopting is a
+real transaction. If nothing matches, say so and show what is available instead.
 
 When you list pets, include each pet's photo as markdown `![petid pettype](peturl)`
 so the customer can see and click it.
@@ -41,14 +53,39 @@ so the site can mark that pet as adopted.
 Confirm exactly what you did and report the result. Be warm and clear."""
 
 
-def search_available_pets(pettype: str = "", petcolor: str = "") -> str:
-    """List pets available to adopt, optionally filtered by type and/or color.
-    pettype: puppy | kitten | bunny (a cat is a kitten, a dog is a puppy).
-    petcolor: black | brown | white. Leave an arg empty to not filter on it.
-    Returns JSON."""
-    return json.dumps(petstore.search_pets(pettype or None, petcolor or None))
+_PET_FIELDS = ("petid", "pettype", "petcolor", "availability", "price", "peturl")
 
 
+@instrumentation.traced_tool("adoption")
+def search_available_pets(
+    pettype: str = "", petcolor: str = "", petid: str = ""
+) -> str:
+    """List pets available to adopt, optionally filtered by type, color and/or id.
+    pettype: puppy | kitten | bunny (a cat is a kitten, a dog is a puppy).
+    petcolor: black | brown | white. petid: one specific pet. Leave an arg empty to
+    not filter on it. Returns JSON; `more_available` means more matches exist, so
+    narrow the filters."""
+    return petstore.pets_view(
+        _PET_FIELDS, pettype or None, petcolor or None, petid or None
+    )
+
+
+@instrumentation.traced_tool("adoption")
+def resolve_pet(reference: str) -> str:
+    """Find the pet a PHOTO URL (its peturl) or pet id refers to: its petid, type,
+    color, price and availability. An empty `pets` list means no such pet. Returns
+    JSON."""
+    return petstore.compact(
+        {
+            "pets": [
+                {f: pet[f] for f in _PET_FIELDS if f in pet}
+                for pet in resolver.pets(reference)
+            ],
+        },
+    )
+
+
+@instrumentation.traced_tool("adoption")
 def list_recent_adoptions() -> str:
     """List recently COMPLETED adoptions (history) — pets already adopted, not
     pets available to adopt. Use search_available_pets for availability. Returns JSON.
@@ -56,31 +93,86 @@ def list_recent_adoptions() -> str:
     return json.dumps(petstore.list_recent_adoptions())
 
 
+@instrumentation.traced_tool("adoption")
 def complete_adoption(pet_id: str, pet_type: str, user_id: str) -> str:
     """Complete an adoption of pet_id (pet_type) for user_id. Returns JSON."""
-    return json.dumps(petstore.complete_adoption(pet_id, pet_type, user_id))
+    result = petstore.complete_adoption(pet_id, pet_type, user_id)
+    resolver.invalidate_pets()  # the pet's availability just changed
+    return json.dumps(result)
+
 
+class _AdoptionBedrockConverse(BedrockConverse):
+    """BedrockConverse that reports each LLM step, streaming only where Bedrock can.
 
-class _NonStreamingBedrockConverse(BedrockConverse):
-    """BedrockConverse that never streams tool calls."""
+    ConverseStream rejects tool definitions for Llama, so on those models each
+    step is one Converse call replayed as a single chunk; Claude and Nova stream.
+    """
 
     async def astream_chat_with_tools(self, *args, **kwargs):  # noqa: ANN002,ANN003
-        response = await self.achat_with_tools(*args, **kwargs)
+        if models.streams_tool_use("adoption"):
+            return self._timed(await super().astream_chat_with_tools(*args, **kwargs))
+        start = time.perf_counter()
+        try:
+            response = await self.achat_with_tools(*args, **kwargs)
+        except Exception as exc:
+            instrumentation.llm_step(
+                "adoption", (time.perf_counter() - start) * 1000, error=exc
+            )
+            raise
+        raw = response.raw if isinstance(response.raw, dict) else {}
+        instrumentation.llm_step(
+            "adoption",
+            (time.perf_counter() - start) * 1000,
+            tokens=usage.converse_counts(raw.get("usage")),
+        )
+        response.delta = response.message.content or ""  # the whole text is one delta
 
         async def _single():
             yield response
 
         return _single()
 
-
-_llm = _NonStreamingBedrockConverse(
-    model=models.model_id("adoption"),
-    region_name=config.AWS_REGION,
-)
+    async def _timed(self, responses):  # noqa: ANN001,ANN202
+        start = time.perf_counter()
+        counts = None
+        try:
+            async for response in responses:
+                raw = response.raw if isinstance(response.raw, dict) else {}
+                if "metadata" in raw:  # the final event carries the usage
+                    counts = usage.converse_counts(raw["metadata"].get("usage"))
+                yield response
+        except Exception as exc:
+            instrumentation.llm_step(
+                "adoption", (time.perf_counter() - start) * 1000, error=exc
+            )
+            raise
+        instrumentation.llm_step(
+            "adoption", (time.perf_counter() - start) * 1000, tokens=counts
+        )
+
+
+_llm_kwargs: dict = {
+    "model": models.model_id("adoption"),
+    "region_name": config.AWS_REGION,
+    # one attempt per call: common/model_gate.py retries throttles with jitter,
+    # where LlamaIndex would wait a fixed 4-10s, up to 10 times
+    "max_retries": 1,
+}
+if models.prompt_caching("adoption"):  # off by default: Llama 4 has no prompt caching
+    _llm_kwargs["system_prompt_caching"] = True
+    _llm_kwargs["tool_caching"] = True
+_llm = _AdoptionBedrockConverse(**_llm_kwargs)
+fallback.attach(model_gate.attach(_llm._client, "adoption"), "adoption")
+# The async calls run the same gated client on a thread. With aioboto3 installed,
+# LlamaIndex would open its own async clients, past the gate, its retries and the
+# fallback chain, and fail outright on a throttle with max_retries 1.
+_llm._asession = None
+_llm._async_client = _llm._client
 
 _agent = FunctionAgent(
     tools=[
         FunctionTool.from_defaults(fn=search_available_pets),
+        FunctionTool.from_defaults(fn=resolve_pet),
         FunctionTool.from_defaults(fn=list_recent_adoptions),
         FunctionTool.from_defaults(fn=complete_adoption),
     ],
@@ -94,7 +186,29 @@ async def _run_agent(message: str):
     return await _agent.run(message)
 
 
+@instrumentation.traced_run("adoption")
 def run(query: str, user_id: str | None = None, session_id: str | None = None) -> str:
     """Answer/execute an adoption request and return plain text."""
     message = query if not user_id else f"[userId={user_id}] {query}"
-    return str(run_coro_sync(_run_agent(message)))
+    with prefetch.turn("adoption", query):
+        message += resolver.annotate("adoption", query, _PET_FIELDS)
+        return str(run_coro_sync(_run_agent(message)))
+
+
+@instrumentation.traced_stream("adoption")
+async def stream_run(
+    query: str,
+    user_id: str | None = None,
+    session_id: str | None = None,
+):
+    """Stream the answer from the workflow's ``AgentStream`` events (async generator)."""
+    message = query if not user_id else f"[userId={user_id}] {query}"
+    with prefetch.turn("adoption", query):
+        message += await asyncio.to_thread(
+            resolver.annotate, "adoption", query, _PET_FIELDS
+        )
+        handler = _agent.run(message)
+        async for event in handler.stream_events():
+            if isinstance(event, AgentStream) and event.delta:
+                yield event.delta
+        await handler  # re-raises a failed run
@@ -1,9 +1,9 @@
 """AgentCore Runtime entrypoint for the Adoption agent (LlamaIndex)."""
 
-from waggle_ai_agents.adoption_llamaindex import run
-from waggle_ai_agents.common.agentcore_server import build_app
+from waggle_ai_agents.adoption_llamaindex import stream_run
+from waggle_ai_agents.common.agentcore_server import build_streaming_app
 
-app = build_app(run)
+app = build_streaming_app(stream_run, agent="adoption")
 
 if __name__ == "__main__":
     app.run()
@@ -0,0 +1 @@
+"""Offline benchmark harness: local Bedrock and petstore stand-ins for every agent."""
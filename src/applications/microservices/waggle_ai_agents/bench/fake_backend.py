@@ -0,0 +1,231 @@
+"""Local stand-in for the pet-search, petfood, cart and payforadoption APIs.
+
+Serves the response shapes ``common.petstore`` reads, from a small fixed data set,
+after an optional per-request delay (``latency_ms``) so tool latency is realistic
+but repeatable. One server answers every backend; point all ``*_API_URL`` at it.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FOODS = [
+    {
+        "id": "F-bench-1",
+        "pet_type": "puppy",
+        "name": "Puppy Growth Formula",
+        "food_type": "dry",
+        "description": "Complete dry food for growing puppies.",
+        "price": "12.99",
+        "image": "petfood/puppy-growth.jpg",
+        "nutritional_info": {"protein_percentage": 28.0, "fat_percentage": 17.0},
+        "ingredients": ["chicken", "rice", "fish oil"],
+        "availability_status": "in_stock",
+        "stock_quantity": 40,
+    },
+    {
+        "id": "F-bench-2",
+        "pet_type": "kitten",
+        "name": "Kitten Salmon Pate",
+        "food_type": "wet",
+        "description": "Soft salmon pate for kittens.",
+        "price": "3.49",
+        "image": "petfood/kitten-salmon.jpg",
+        "nutritional_info": {"protein_percentage": 11.0, "fat_percentage": 6.0},
+        "ingredients": ["salmon", "taurine"],
+        "availability_status": "in_stock",
+        "stock_quantity": 120,
+    },
+    {
+        "id": "F-bench-3",
+        "pet_type": "bunny",
+        "name": "Timothy Hay Pellets",
+        "food_type": "dry",
+        "description": "High-fibre pellets for young rabbits.",
+        "price": "8.25",
+        "image": "petfood/bunny-hay.jpg",
+        "nutritional_info": {"protein_percentage": 14.0, "fat_percentage": 2.5},
+        "ingredients": ["timothy hay", "alfalfa"],
+        "availability_status": "in_stock",
+        "stock_quantity": 25,
+    },
+]
+
+PETS = [
+    {
+        "petid": f"0{n:02d}",
+        "pettype": pettype,
+        "petcolor": petcolor,
+        "availability": "yes",
+        "cuteness_rate": "5",
+        "price": "199",
+        "peturl": f"https://example.com/{pettype}-{n}.jpg",
+    }
+    for n, (pettype, petcolor) in enumerate(
+        [
+            (t, c)
+            for t in ("puppy", "kitten", "bunny")
+            for c in ("black", "brown", "white")
+        ],
+        start=1,
+    )
+]
+
+_CART_ITEMS = re.compile(r"^/api/cart/([^/]+)/items$")
+_CHECKOUT = re.compile(r"^/api/cart/([^/]+)/checkout$")
+_CART = re.compile(r"^/api/cart/([^/]+)$")
+_FOOD = re.compile(r"^/api/foods/([^/]+)$")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FakeBackend
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real services behind the ALB
+    # no delayed-ACK stalls between the header and body writes
+    disable_nagle_algorithm = True
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        pass
+
+    def _send(self, status: int, payload: object = None) -> None:
+        body = b"" if payload is None else json.dumps(payload).encode()
+        time.sleep(self.server.latency_ms / 1000)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.count()
+
+    def _body(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+    def do_HEAD(self) -> None:  # warm-up opens pooled connections with HEAD
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        path, query = url.path, parse_qs(url.query)
+        if path == "/api/search":
+            pets = [
+                p
+                for p in PETS
+                if all(
+                    p[k] == query[k][0]
+                    for k in ("pettype", "petcolor", "petid")
+                    if k in query
+                )
+            ]
+            return self._send(200, pets)
+        if path == "/api/foods":
+            foods = [
+                f
+                for f in FOODS
+                if f["pet_type"] == query.get("pet_type", [f["pet_type"]])[0]
+                and float(query.get("min_price", ["0"])[0])
+                <= float(f["price"])
+                <= float(query.get("max_price", ["inf"])[0])
+            ]
+            return self._send(
+                200,
+                {"foods": foods, "total_count": len(foods), "page": 1, "page_size": 50},
+            )
+        if match := _FOOD.match(path):
+            food = next((f for f in FOODS if f["id"] == match[1]), None)
+            return (
+                self._send(200, food)
+                if food
+                else self._send(404, {"error": "not found"})
+            )
+        if match := _CART.match(path):
+            return self._send(200, self.server.cart(match[1]))
+        if path.rstrip("/") == "/api/adoptionlist":
+            return self._send(200, self.server.adoptions[-25:])
+        self._send(404, {"error": f"no route for GET {path}"})
+
+    def do_POST(self) -> None:
+        path = urlsplit(self.path).path
+        body = self._body()
+        if match := _CART_ITEMS.match(path):
+            item = {
+                "food_id": body.get("food_id"),
+                "quantity": int(body.get("quantity") or 1),
+            }
+            with self.server.lock:
+                self.server.carts.setdefault(match[1], []).append(item)
+            return self._send(201, item)
+        if match := _CHECKOUT.match(path):
+            cart = self.server.cart(match[1])
+            with self.server.lock:
+                self.server.carts.pop(match[1], None)
+            return self._send(
+                200,
+                {
+                    "order_id": str(uuid.uuid4()),
+                    "status": "confirmed",
+                    "items": cart["items"],
+                    "total_amount": cart["total_price"],
+                },
+            )
+        if path == "/api/completeadoption":
+            query = parse_qs(urlsplit(self.path).query)
+            with self.server.lock:
+                self.server.adoptions.append(
+                    {
+                        "transactionid": str(uuid.uuid4()),
+                        "petid": query.get("petId", [""])[0],
+                        "pettype": query.get("petType", [""])[0],
+                        "adoptiondate": time.strftime(
+                            "%Y-%m-%dT%H:%M:%SZ", time.gmtime()
+                        ),
+                    },
+                )
+            return self._send(200)
+        self._send(404, {"error": f"no route for POST {path}"})
+
+
+class FakeBackend(ThreadingHTTPServer):
+    """Threaded stub of every petstore backend, with in-memory carts and adoptions."""
+
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, latency_ms: float = 0.0) -> None:
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.latency_ms = latency_ms
+        self.lock = threading.Lock()
+        self.carts: dict[str, list[dict]] = {}
+        self.adoptions: list[dict] = []
+        self.requests = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def count(self) -> None:
+        with self.lock:
+            self.requests += 1
+
+    def cart(self, user_id: str) -> dict:
+        prices = {f["id"]: float(f["price"]) for f in FOODS}
+        with self.lock:
+            items = list(self.carts.get(user_id, []))
+        return {
+            "user_id": user_id,
+            "items": items,
+            "total_items": sum(i["quantity"] for i in items),
+            "total_price": f"{sum(prices.get(i['food_id'], 0) * i['quantity'] for i in items):.2f}",
+        }
+
+    def start(self) -> FakeBackend:
+        threading.Thread(
+            target=self.serve_forever, name="fake-backend", daemon=True
+        ).start()
+        return self
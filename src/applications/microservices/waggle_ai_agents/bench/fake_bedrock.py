@@ -0,0 +1,297 @@
+"""Local Converse-compatible model server that replays scripted tool calls.
+
+Answers ``POST /model/{id}/converse`` (JSON) and ``/model/{id}/converse-stream``
+(AWS event stream) the way Bedrock would, so every framework's real client code
+runs unchanged: boto3 (Strands, LangChain, LlamaIndex) via
+``AWS_ENDPOINT_URL_BEDROCK_RUNTIME``, LiteLLM (CrewAI, OpenAI Agents SDK) via
+``AWS_BEDROCK_RUNTIME_ENDPOINT``.
+
+Which script plays is picked from the tool names in ``toolConfig``; the step is
+the number of tool results since the user's last text message, so one turn walks
+the script's tool calls in order and then gets the final text. Every response is
+delayed by ``latency_ms``; a ``throttle_rate`` fraction of calls is refused with a
+429 ThrottlingException instead, as an overloaded model would.
+
+Token usage is estimated from the request size (about four bytes a token). A
+request with ``cachePoint`` blocks has the system prompt and tool schemas before
+its last cache point counted as ``cacheWriteInputTokens`` the first time that
+prefix is seen and as ``cacheReadInputTokens`` after, like Bedrock's prompt cache.
+"""
+
+from __future__ import annotations
+
+import binascii
+import json
+import random
+import re
+import struct
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+# agent -> (tool that identifies it, [(tool, input), ...], final answer)
+SCRIPTS: dict[str, tuple[str, list[tuple[str, dict[str, Any]]], str]] = {
+    "orchestrator": (
+        "nutrition_advisor",
+        [("nutrition_advisor", {"query": "What should I feed a growing puppy?"})],
+        "A growing puppy does well on Puppy Growth Formula, fed three times a day.",
+    ),
+    "nutrition": (
+        "retrieve_nutrition_guidance",
+        [
+            ("get_pet_profile", {"pettype": "puppy"}),
+            ("retrieve_nutrition_guidance", {"query": "puppy feeding guidelines"}),
+            ("get_available_foods", {"pet_type": "puppy"}),
+        ],
+        "Puppies need protein-rich food in small, frequent meals; "
+        "Puppy Growth Formula (F-bench-1) fits.",
+    ),
+    "ordering": (
+        "add_food_to_cart",
+        [
+            ("resolve_food", {"reference": "Puppy Growth Formula"}),
+            (
+                "add_food_to_cart",
+                {"user_id": "bench-user", "food_id": "F-bench-1", "quantity": 1},
+            ),
+        ],
+        "Thought: I now know the final answer\n"
+        "Final Answer: Added 1 x Puppy Growth Formula to your cart.",
+    ),
+    "adoption": (
+        "search_available_pets",
+        [("search_available_pets", {"pettype": "puppy"})],
+        "Three puppies are available: 001 (black), 002 (brown) and 003 (white).",
+    ),
+    "concierge": (
+        "lookup_foods",
+        [("lookup_foods", {})],
+        "We stock food for puppies, kittens and bunnies — ask me about any of them.",
+    ),
+}
+
+_DEFAULT_TEXT = "Thought: I now know the final answer\nFinal Answer: Happy to help."
+_PATH = re.compile(r"^/model/(?P<model>[^/]+)/(?P<op>converse|converse-stream)$")
+_OUTPUT_TOKENS = 60
+
+
+def _tool_names(request: dict[str, Any]) -> set[str]:
+    tools = (request.get("toolConfig") or {}).get("tools") or []
+    return {t["toolSpec"]["name"] for t in tools if "toolSpec" in t}
+
+
+def _step(messages: list[dict[str, Any]]) -> int:
+    """Tool results since the last user message that carried text (i.e. this turn)."""
+    step = 0
+    for message in reversed(messages):
+        if message.get("role") != "user":
+            continue
+        blocks = message.get("content") or []
+        results = sum(1 for b in blocks if "toolResult" in b)
+        if not results:
+            break
+        step += results
+    return step
+
+
+def reply(request: dict[str, Any]) -> tuple[list[dict[str, Any]], str]:
+    """Content blocks and stop reason for the next assistant message."""
+    offered = _tool_names(request)
+    script = next((s for s in SCRIPTS.values() if s[0] in offered), None)
+    if script is None:
+        return [{"text": _DEFAULT_TEXT}], "end_turn"
+    _, calls, final = script
+    step = _step(request.get("messages") or [])
+    if step < len(calls):
+        name, tool_input = calls[step]
+        tool_use = {
+            "toolUseId": f"tooluse_{uuid.uuid4().hex[:20]}",
+            "name": name,
+            "input": tool_input,
+        }
+        return [{"toolUse": tool_use}], "tool_use"
+    return [{"text": final}], "end_turn"
+
+
+def _tokens(value: Any) -> int:
+    return len(json.dumps(value)) // 4
+
+
+def _cached_prefix(request: dict[str, Any]) -> list[Any]:
+    """System and tool blocks up to the request's last cache point ([] if none)."""
+    system = request.get("system") or []
+    tools = (request.get("toolConfig") or {}).get("tools") or []
+    for blocks, before in ((tools, system), (system, [])):
+        marks = [i for i, b in enumerate(blocks) if "cachePoint" in b]
+        if marks:
+            return [*before, *blocks[: marks[-1]]]
+    return []
+
+
+def usage(request: dict[str, Any], seen: set[str]) -> dict[str, int]:
+    """Converse ``usage`` for ``request``; ``seen`` holds the prefixes cached so far."""
+    prefix = _cached_prefix(request)
+    cached = _tokens(prefix) if prefix else 0
+    counts = {
+        "inputTokens": _tokens(request) - cached,
+        "outputTokens": _OUTPUT_TOKENS,
+    }
+    if cached:
+        key = json.dumps(prefix, sort_keys=True)
+        kind = "cacheReadInputTokens" if key in seen else "cacheWriteInputTokens"
+        seen.add(key)
+        counts[kind] = cached
+    counts["totalTokens"] = sum(counts.values())
+    return counts
+
+
+def _header(name: str, value: str) -> bytes:
+    key, val = name.encode(), value.encode()
+    return struct.pack("!B", len(key)) + key + struct.pack("!BH", 7, len(val)) + val
+
+
+def event_frame(event_type: str, payload: dict[str, Any]) -> bytes:
+    """One ``application/vnd.amazon.eventstream`` message (prelude, headers, CRCs)."""
+    headers = (
+        _header(":event-type", event_type)
+        + _header(":content-type", "application/json")
+        + _header(":message-type", "event")
+    )
+    body = json.dumps(payload).encode()
+    total = 12 + len(headers) + len(body) + 4
+    prelude = struct.pack("!II", total, len(headers))
+    prelude += struct.pack("!I", binascii.crc32(prelude))
+    message = prelude + headers + body
+    return message + struct.pack("!I", binascii.crc32(message))
+
+
+def stream_events(
+    content: list[dict[str, Any]],
+    stop_reason: str,
+    usage: dict[str, int],
+) -> list[tuple[str, dict[str, Any]]]:
+    """ConverseStream events for one assistant message."""
+    events: list[tuple[str, dict[str, Any]]] = [("messageStart", {"role": "assistant"})]
+    for index, block in enumerate(content):
+        if "toolUse" in block:
+            tool_use = block["toolUse"]
+            start = {
+                "toolUse": {
+                    "toolUseId": tool_use["toolUseId"],
+                    "name": tool_use["name"],
+                }
+            }
+            events.append(
+                ("contentBlockStart", {"contentBlockIndex": index, "start": start})
+            )
+            deltas = [{"toolUse": {"input": json.dumps(tool_use["input"])}}]
+        else:  # word by word, like a real token stream
+            deltas = [{"text": w} for w in re.findall(r"\S+\s*", block["text"])]
+        for delta in deltas:
+            events.append(
+                ("contentBlockDelta", {"contentBlockIndex": index, "delta": delta})
+            )
+        events.append(("contentBlockStop", {"contentBlockIndex": index}))
+    events.append(("messageStop", {"stopReason": stop_reason}))
+    events.append(("metadata", {"usage": usage, "metrics": {"latencyMs": 0}}))
+    return events
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FakeBedrock
+    protocol_version = "HTTP/1.1"
+    # headers and body go out as separate writes; without this, delayed ACKs
+    # stall keep-alive responses by ~40ms
+    disable_nagle_algorithm = True
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        pass
+
+    def do_POST(self) -> None:
+        match = _PATH.match(self.path.split("?", 1)[0])
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if match is None:
+            return self._send(
+                404, "application/json", b'{"message":"unknown operation"}'
+            )
+        if random.random() < self.server.throttle_rate:
+            self.server.count(throttled=True)
+            return self._send(
+                429,
+                "application/json",
+                b'{"message":"Too many requests, please wait before trying again."}',
+                {"x-amzn-ErrorType": "ThrottlingException"},
+            )
+        content, stop_reason = reply(request)
+        counts = self.server.usage(request)
+        time.sleep(self.server.latency_ms / 1000)
+        self.server.count()
+        if match["op"] == "converse":
+            body = {
+                "output": {"message": {"role": "assistant", "content": content}},
+                "stopReason": stop_reason,
+                "usage": counts,
+                "metrics": {"latencyMs": int(self.server.latency_ms)},
+            }
+            return self._send(200, "application/json", json.dumps(body).encode())
+        frames = b"".join(
+            event_frame(*e) for e in stream_events(content, stop_reason, counts)
+        )
+        self._send(200, "application/vnd.amazon.eventstream", frames)
+
+    def _send(
+        self,
+        status: int,
+        content_type: str,
+        body: bytes,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeBedrock(ThreadingHTTPServer):
+    """Threaded scripted Converse endpoint; ``requests`` counts model calls served,
+    ``throttled`` the calls refused."""
+
+    daemon_threads = True
+
+    def __init__(
+        self, port: int = 0, latency_ms: float = 0.0, throttle_rate: float = 0.0
+    ) -> None:
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.latency_ms = latency_ms
+        self.throttle_rate = throttle_rate
+        self.requests = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+        self._cached: set[str] = set()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def count(self, throttled: bool = False) -> None:
+        with self._lock:
+            if throttled:
+                self.throttled += 1
+            else:
+                self.requests += 1
+
+    def usage(self, request: dict[str, Any]) -> dict[str, int]:
+        with self._lock:
+            return usage(request, self._cached)
+
+    def start(self) -> FakeBedrock:
+        threading.Thread(
+            target=self.serve_forever, name="fake-bedrock", daemon=True
+        ).start()
+        return self
@@ -0,0 +1,320 @@
+"""Offline benchmark: every agent's ``run()`` against local model and backend stand-ins.
+
+Starts ``FakeBedrock`` (scripted Converse tool calls) and ``FakeBackend`` (petstore
+APIs), points the AWS clients, LiteLLM and ``config.backend_url`` at them, then
+times each agent: one untimed first turn, ``--turns`` sequential turns (latency
+split into model, tool and framework overhead from ``instrumentation.stats()``,
+plus the tool-result bytes handed to the model and the prompt tokens read from
+the prompt cache, from ``usage.stats()``), and the same number again across
+``--concurrency`` threads for throughput.
+Nothing leaves the machine, so numbers are comparable run to run.
+
+    python -m waggle_ai_agents.bench.run [--agents nutrition,ordering] [--turns 10]
+        [--concurrency 4] [--model-latency-ms 0] [--backend-latency-ms 0]
+        [--throttle-rate 0] [--max-overhead-ms 50] [--allow-skip] [--json]
+        [--baseline bench/baseline.json [--tolerance 0.2]] [--write-baseline PATH]
+
+Exits 1 if any turn errors, an agent's overhead per turn exceeds --max-overhead-ms,
+an agent is skipped because its framework is not installed (with --allow-skip,
+only if no agent ran at all), or an agent regressed against --baseline: more
+LLM steps, tool calls, tool-result bytes or overhead per turn than its baseline
+allows (plus --tolerance, and OVERHEAD_SLACK_MS for overhead), or fewer tokens
+read from the prompt cache. Agents missing from the baseline are not compared.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from waggle_ai_agents.bench.fake_backend import FakeBackend
+from waggle_ai_agents.bench.fake_bedrock import FakeBedrock
+
+# agent -> (package, query that exercises its scripted tool calls)
+AGENTS: dict[str, tuple[str, str]] = {
+    # free text, so the fast router leaves it to the LLM (which delegates in-process)
+    "orchestrator": (
+        "orchestrator_strands",
+        "My puppy is growing fast and always hungry. What should he eat?",
+    ),
+    "nutrition": ("nutrition_langgraph", "What should I feed a growing puppy?"),
+    "ordering": ("ordering_crewai", "Add one bag of Puppy Growth Formula to my cart."),
+    "adoption": ("adoption_llamaindex", "Which puppies can I adopt?"),
+    "concierge": ("concierge_openai", "What kinds of pet food do you stock?"),
+}
+USER_ID = "bench-user"
+
+# per-turn metrics compared with the baseline: name -> True if higher is worse
+BASELINE_METRICS = {
+    "llm_steps": True,
+    "tool_calls": True,
+    "tool_bytes": True,
+    "overhead_ms": True,
+    "cache_read": False,
+}
+# runners differ in speed: overhead may also exceed its baseline by this much
+OVERHEAD_SLACK_MS = 25.0
+
+
+def _isolate(bedrock: FakeBedrock, backend: FakeBackend) -> None:
+    """Point every client at the stand-ins; must run before any agent module loads."""
+    snapshot = os.path.join(tempfile.mkdtemp(prefix="waggle-bench-"), "config.json")
+    os.environ.update(
+        {
+            "AWS_ENDPOINT_URL_BEDROCK_RUNTIME": bedrock.url,  # boto3
+            "AWS_BEDROCK_RUNTIME_ENDPOINT": bedrock.url,  # LiteLLM
+            "AWS_ACCESS_KEY_ID": "bench",
+            "AWS_SECRET_ACCESS_KEY": "bench",
+            "AWS_SESSION_TOKEN": "bench",
+            "AWS_EC2_METADATA_DISABLED": "true",
+            "LITELLM_LOCAL_MODEL_COST_MAP": "True",  # no cost-map download at import
+            "RETRIEVAL_BACKEND": "local",
+            "RESPONSE_CACHE": "false",
+            "CONFIG_TTL": "0",
+            "CONFIG_SNAPSHOT_PATH": snapshot,
+        },
+    )
+    from waggle_ai_agents.common import config
+
+    # Serve config from a snapshot so no SSM call is made: backends -> stub, the
+    # rest (memory, knowledge base, guardrail, gateway) empty, i.e. disabled.
+    backends = config.backend_parameters()
+    values = {name: "" for name in config.parameter_names()}
+    values.update({name: backend.url for name in backends.values()})
+    config.write_snapshot(values, time.time())
+    # Env overrides win over SSM, and config's .env load may have set real ones.
+    os.environ.update({key: backend.url for key in backends})
+
+
+def _failed(answer: Any) -> bool:
+    return not answer or str(answer).lstrip().startswith('{"error"')
+
+
+def _turn(run: Any, query: str) -> tuple[float, bool]:
+    start = time.perf_counter()
+    try:
+        failed = _failed(run(query, user_id=USER_ID))
+    except Exception:  # noqa: BLE001 - count it; the report shows errors
+        failed = True
+    return (time.perf_counter() - start) * 1000, failed
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+def bench_agent(agent: str, turns: int, concurrency: int) -> dict[str, Any]:
+    """Time one agent; returns per-turn averages and concurrent throughput."""
+    from waggle_ai_agents.common import instrumentation, usage
+
+    package, query = AGENTS[agent]
+    try:
+        run = importlib.import_module(f"waggle_ai_agents.{package}").run
+    except ImportError as exc:  # framework not installed in this environment
+        return {"skipped": str(exc)}
+
+    first_ms, first_failed = _turn(run, query)  # lazy imports, client construction
+
+    instrumentation.reset()
+    cache_read = (usage.stats().get(agent) or {}).get("cache_read", 0)
+    sequential = [_turn(run, query) for _ in range(turns)]
+    cache_read = (usage.stats().get(agent) or {}).get("cache_read", 0) - cache_read
+    totals = instrumentation.stats().get(agent) or {}
+    runs = totals.get("runs") or 1
+    llm_ms = totals.get("llm_ms", 0.0) / runs
+    tool_ms = totals.get("tool_ms", 0.0) / runs
+    latency = statistics.fmean(ms for ms, _ in sequential)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        concurrent = list(pool.map(lambda _: _turn(run, query), range(turns)))
+    wall = time.perf_counter() - start
+    samples = [ms for ms, _ in concurrent]
+
+    return {
+        "first_ms": first_ms,
+        "latency_ms": latency,
+        "llm_ms": llm_ms,
+        "tool_ms": tool_ms,
+        "overhead_ms": latency - llm_ms - tool_ms,
+        "llm_steps": totals.get("llm_steps", 0) / runs,
+        "tool_calls": totals.get("tool_calls", 0) / runs,
+        "tool_bytes": totals.get("tool_bytes", 0) / runs,
+        "cache_read": cache_read / runs,
+        "turns_per_s": len(samples) / wall if wall else 0.0,
+        "p50_ms": statistics.median(samples),
+        "p95_ms": _percentile(samples, 95),
+        "errors": first_failed
+        + sum(f for _, f in sequential)
+        + sum(f for _, f in concurrent),
+    }
+
+
+def regressions(
+    report: dict[str, dict[str, Any]],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float,
+) -> list[str]:
+    """How each agent in both ``report`` and ``baseline`` fell behind its baseline."""
+    found = []
+    for agent, row in report.items():
+        base = baseline.get(agent)
+        if base is None or "skipped" in row:
+            continue
+        for metric, higher_is_worse in BASELINE_METRICS.items():
+            if metric not in base:
+                continue
+            value, expected = row[metric], base[metric]
+            if higher_is_worse:
+                limit = expected * (1 + tolerance)
+                if metric == "overhead_ms":
+                    limit += OVERHEAD_SLACK_MS
+                worse = value > limit
+            else:
+                limit = expected * (1 - tolerance)
+                worse = value < limit
+            if worse:
+                found.append(
+                    f"{agent}: {metric} {value:.1f} vs baseline {expected:.1f} "
+                    f"(limit {limit:.1f})"
+                )
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--agents", default=",".join(AGENTS), help="comma-separated agents"
+    )
+    parser.add_argument("--turns", type=int, default=10, help="turns per phase")
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="threads for the throughput phase"
+    )
+    parser.add_argument(
+        "--model-latency-ms", type=float, default=0.0, help="delay per model call"
+    )
+    parser.add_argument(
+        "--backend-latency-ms", type=float, default=0.0, help="delay per backend call"
+    )
+    parser.add_argument(
+        "--throttle-rate",
+        type=float,
+        default=0.0,
+        help="fraction of model calls refused with a 429",
+    )
+    parser.add_argument(
+        "--max-overhead-ms",
+        type=float,
+        default=None,
+        help="fail above this overhead per turn",
+    )
+    parser.add_argument(
+        "--allow-skip",
+        action="store_true",
+        help="do not fail on agents whose framework is not installed",
+    )
+    parser.add_argument(
+        "--baseline", help="fail on regressions against this baseline JSON file"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="fraction a metric may be worse than its baseline",
+    )
+    parser.add_argument(
+        "--write-baseline", help="write this run's per-turn metrics to this file"
+    )
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+    agents = [a.strip() for a in args.agents.split(",") if a.strip()]
+    unknown = sorted(set(agents) - set(AGENTS))
+    if unknown:
+        parser.error(f"unknown agents {unknown}; known: {sorted(AGENTS)}")
+
+    bedrock = FakeBedrock(
+        latency_ms=args.model_latency_ms, throttle_rate=args.throttle_rate
+    ).start()
+    backend = FakeBackend(latency_ms=args.backend_latency_ms).start()
+    _isolate(bedrock, backend)
+    report = {
+        agent: bench_agent(agent, args.turns, args.concurrency) for agent in agents
+    }
+    bedrock.shutdown()
+    backend.shutdown()
+
+    failures = []
+    for agent, row in report.items():
+        if "skipped" in row and not args.allow_skip:
+            failures.append(f"{agent}: skipped (pass --allow-skip to allow)")
+        if row.get("errors"):
+            failures.append(f"{agent}: {row['errors']} failed turns")
+        if (
+            args.max_overhead_ms is not None
+            and row.get("overhead_ms", 0.0) > args.max_overhead_ms
+        ):
+            failures.append(
+                f"{agent}: overhead {row['overhead_ms']:.1f}ms > {args.max_overhead_ms:.1f}ms"
+            )
+    if all("skipped" in row for row in report.values()):
+        failures.append("no agent ran")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            failures += regressions(report, json.load(f), args.tolerance)
+    if args.write_baseline:
+        with open(args.write_baseline, "w", encoding="utf-8") as f:
+            baseline = {
+                agent: {m: round(row[m], 1) for m in BASELINE_METRICS}
+                for agent, row in report.items()
+                if "skipped" not in row
+            }
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+    if args.json:
+        print(
+            json.dumps(
+                {
+                    "agents": report,
+                    "throttled": bedrock.throttled,
+                    "failures": failures,
+                },
+                indent=2,
+            )
+        )
+    else:
+        print(
+            f"{'agent':<13} {'first':>8} {'latency':>8} {'model':>8} {'tools':>8} "
+            f"{'overhead':>8} {'steps':>5} {'calls':>5} {'bytes':>7} {'cached':>7} "
+            f"{'turns/s':>8} "
+            f"{'p50':>8} {'p95':>8}",
+        )
+        for agent, row in report.items():
+            if "skipped" in row:
+                print(f"{agent:<13} skipped: {row['skipped']}")
+                continue
+            print(
+                f"{agent:<13} {row['first_ms']:>8.1f} {row['latency_ms']:>8.1f} {row['llm_ms']:>8.1f} "
+                f"{row['tool_ms']:>8.1f} {row['overhead_ms']:>8.1f} {row['llm_steps']:>5.1f} "
+                f"{row['tool_calls']:>5.1f} {row['tool_bytes']:>7.0f} {row['cache_read']:>7.0f} "
+                f"{row['turns_per_s']:>8.2f} {row['p50_ms']:>8.1f} "
+                f"{row['p95_ms']:>8.1f}",
+            )
+        if bedrock.throttled:
+            print(f"model calls throttled (429) and retried: {bedrock.throttled}")
+        for failure in failures:
+            print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
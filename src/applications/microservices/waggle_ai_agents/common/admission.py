@@ -0,0 +1,181 @@
+"""Admission control for an agent runtime: a concurrency limit with a bounded queue.
+
+At most AGENT_MAX_CONCURRENCY turns run at once. Up to AGENT_QUEUE_SIZE more wait
+for a slot (no longer than AGENT_QUEUE_TIMEOUT seconds); anything beyond that is
+shed straight away with ``Busy`` rather than slowing every in-flight turn down.
+Sync ``run`` functions execute on a thread pool sized to the limit, off the
+server's event loop. Queue time is recorded as ``waggle.admission.queue_time``
+(by agent and outcome), shed requests as ``waggle.admission.shed``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import time
+import weakref
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from waggle_ai_agents.common import metrics
+
+MAX_CONCURRENCY = int(os.getenv("AGENT_MAX_CONCURRENCY", "8"))
+QUEUE_SIZE = int(os.getenv("AGENT_QUEUE_SIZE", "16"))
+QUEUE_TIMEOUT = float(os.getenv("AGENT_QUEUE_TIMEOUT", "30"))
+RETRY_AFTER = int(os.getenv("AGENT_RETRY_AFTER", "5"))  # hint sent with a busy response
+
+
+class Busy(Exception):
+    """The request was shed: the queue is full or it waited past the timeout."""
+
+    def __init__(self, agent: str, reason: str) -> None:
+        super().__init__(f"{agent} is at capacity ({reason}); retry in {RETRY_AFTER}s")
+        self.reason = reason
+        self.retry_after = RETRY_AFTER
+
+
+class Gate:
+    """Concurrency limit + bounded wait queue for one runtime's turns."""
+
+    def __init__(
+        self,
+        agent: str,
+        limit: int = MAX_CONCURRENCY,
+        queue_size: int = QUEUE_SIZE,
+        timeout: float = QUEUE_TIMEOUT,
+    ) -> None:
+        self.agent = agent
+        self.limit = max(1, limit)
+        self.queue_size = max(0, queue_size)
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(self.limit)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._waiting = 0
+        self._shed = 0
+        self._pool = ThreadPoolExecutor(self.limit, thread_name_prefix=f"{agent}-turn")
+        # queued waiters block here, never on the event loop
+        self._waiters = ThreadPoolExecutor(
+            max(1, self.queue_size),
+            thread_name_prefix=f"{agent}-queue",
+        )
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _releaser(self) -> Callable[[], None]:
+        done = False
+
+        def release() -> None:
+            nonlocal done
+            with self._lock:
+                if done:
+                    return
+                done = True
+                self._in_flight -= 1
+            self._slots.release()
+
+        return release
+
+    def _admitted(self, start: float, outcome: str) -> None:
+        metrics.histogram("waggle.admission.queue_time").record(
+            (time.perf_counter() - start) * 1000,
+            {"agent": self.agent, "outcome": outcome},
+        )
+
+    def _reject(self, start: float, reason: str) -> Busy:
+        with self._lock:
+            self._shed += 1
+        self._admitted(start, "shed")
+        metrics.counter("waggle.admission.shed").add(
+            1,
+            {"agent": self.agent, "reason": reason},
+        )
+        return Busy(self.agent, reason)
+
+    def _try_acquire(self, start: float) -> Callable[[], None] | None:
+        if not self._slots.acquire(blocking=False):
+            return None
+        with self._lock:
+            self._in_flight += 1
+        self._admitted(start, "admitted")
+        return self._releaser()
+
+    def _wait(self, start: float) -> Callable[[], None]:
+        try:
+            got = self._slots.acquire(timeout=self.timeout)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+        if not got:
+            raise self._reject(start, "timeout")
+        with self._lock:
+            self._in_flight += 1
+        self._admitted(start, "admitted")
+        return self._releaser()
+
+    async def admit(self) -> Callable[[], None]:
+        """Take a slot, queueing if needed; return its (idempotent) release. Raises Busy."""
+        start = time.perf_counter()
+        release = self._try_acquire(start)
+        if release is not None:
+            return release
+        with self._lock:
+            full = self._waiting >= self.queue_size
+            if not full:
+                self._waiting += 1
+        if full:
+            raise self._reject(start, "queue_full")
+        waiter = self._waiters.submit(self._wait, start)
+        try:
+            return await asyncio.wrap_future(waiter)
+        except asyncio.CancelledError:
+            # caller went away: hand back the slot if the waiter still gets one
+            waiter.add_done_callback(
+                lambda f: f.cancelled() or f.exception() or f.result()(),
+            )
+            raise
+
+    async def call(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run sync ``fn`` on the turn pool once admitted (contextvars carried over)."""
+        release = await self.admit()
+        ctx = contextvars.copy_context()
+        future = self._pool.submit(ctx.run, functools.partial(fn, *args, **kwargs))
+        # the slot is held until fn returns, even if the caller stops waiting
+        future.add_done_callback(lambda _: release())
+        return await asyncio.wrap_future(future)
+
+    async def stream(
+        self,
+        open_stream: Callable[..., AsyncIterator[str]],
+        *args: Any,
+        **kwargs: Any,
+    ) -> AsyncIterator[str]:
+        """Admit (raising Busy now, before any chunk), then hold the slot while streaming."""
+        release = await self.admit()
+
+        async def chunks() -> AsyncIterator[str]:
+            try:
+                async for chunk in open_stream(*args, **kwargs):
+                    yield chunk
+            finally:
+                release()
+
+        gen = chunks()
+        weakref.finalize(gen, release)  # a stream dropped before its first chunk
+        return gen
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "in_flight": self._in_flight,
+                "waiting": self._waiting,
+                "queue_size": self.queue_size,
+                "shed": self._shed,
+            }
@@ -1,10 +1,19 @@
-"""Wrap an agent's ``run()`` as a Bedrock AgentCore Runtime app."""
+"""Wrap an agent's ``run()`` as a Bedrock AgentCore Runtime app.
+
+Passing ``agent`` runs the warm-up phases (``warmup.py``) before the app is
+returned, so the runtime only reports ready once cold-start work is done. Every
+turn goes through an ``admission.Gate``: over capacity, the caller gets an HTTP
+503 busy response with ``Retry-After`` instead of a slow answer.
+"""
 
 from __future__ import annotations
 
 from collections.abc import AsyncIterator, Callable
 
-from bedrock_agentcore.runtime import BedrockAgentCoreApp
+from bedrock_agentcore.runtime import BedrockAgentCoreApp, PingStatus
+from starlette.responses import JSONResponse
+
+from waggle_ai_agents.common import admission, warmup
 
 
 def _extract(payload: dict) -> tuple[str | None, str | None, str | None]:
@@ -24,34 +33,72 @@ def _extract(payload: dict) -> tuple[str | None, str | None, str | None]:
     return prompt, user_id, session_id
 
 
-def build_app(run: Callable[..., str]) -> BedrockAgentCoreApp:
-    """Return a BedrockAgentCoreApp whose entrypoint delegates to ``run``."""
+def _busy(exc: admission.Busy) -> JSONResponse:
+    return JSONResponse(
+        {"error": "busy", "reason": exc.reason, "message": str(exc)},
+        status_code=503,
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+def _app(gate: admission.Gate) -> BedrockAgentCoreApp:
     app = BedrockAgentCoreApp()
 
+    @app.ping
+    def ping() -> PingStatus:  # busy while turns run, so the session is not reclaimed
+        return PingStatus.HEALTHY_BUSY if gate.in_flight else PingStatus.HEALTHY
+
+    return app
+
+
+def build_app(
+    run: Callable[..., str],
+    agent: str | None = None,
+) -> BedrockAgentCoreApp:
+    """Return a BedrockAgentCoreApp whose entrypoint delegates to ``run``."""
+    if agent:
+        warmup.warm(agent)
+    gate = admission.Gate(agent or "agent")
+    app = _app(gate)
+
     @app.entrypoint
-    def handler(payload):  # noqa: ANN001 - AgentCore passes a dict
+    async def handler(payload):  # noqa: ANN001 - AgentCore passes a dict
         prompt, user_id, session_id = _extract(payload or {})
         if not prompt:
             return "Error: no 'prompt' provided in the request."
-        return run(prompt, user_id=user_id, session_id=session_id)
+        try:
+            return await gate.call(run, prompt, user_id=user_id, session_id=session_id)
+        except admission.Busy as exc:
+            return _busy(exc)
 
     return app
 
 
 def build_streaming_app(
     stream: Callable[..., AsyncIterator[str]],
+    agent: str | None = None,
 ) -> BedrockAgentCoreApp:
     """Return a BedrockAgentCoreApp that streams text chunks from ``stream``."""
-    app = BedrockAgentCoreApp()
+    if agent:
+        warmup.warm(agent)
+    gate = admission.Gate(agent or "agent")
+    app = _app(gate)
+
+    async def chunks(prompt: str, user_id: str | None, session_id: str | None):
+        async for chunk in stream(prompt, user_id=user_id, session_id=session_id):
+            if chunk:
+                yield chunk
 
     @app.entrypoint
     async def handler(payload):  # noqa: ANN001 - AgentCore passes a dict
+        # A coroutine (not a generator) so a shed request can still get a 503;
+        # AgentCore streams the async generator it returns otherwise.
         prompt, user_id, session_id = _extract(payload or {})
         if not prompt:
-            yield "Error: no 'prompt' provided in the request."
-            return
-        async for chunk in stream(prompt, user_id=user_id, session_id=session_id):
-            if chunk:
-                yield chunk
+            return "Error: no 'prompt' provided in the request."
+        try:
+            return await gate.stream(chunks, prompt, user_id, session_id)
+        except admission.Busy as exc:
+            return _busy(exc)
 
     return app
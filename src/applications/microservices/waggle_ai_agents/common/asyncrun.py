@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import asyncio
 import concurrent.futures
+import contextvars
 from typing import Any
 from collections.abc import Coroutine
 
@@ -16,7 +17,9 @@ def run_coro_sync(coro: Coroutine[Any, Any, Any]) -> Any:
         running = None
 
     if running is not None:
-        # A loop is already running in this thread — run in a fresh one elsewhere.
+        # A loop is already running in this thread — run in a fresh one elsewhere,
+        # carrying this context along (current turn, trace span, user id).
+        ctx = contextvars.copy_context()
         with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
-            return pool.submit(lambda: asyncio.run(coro)).result()
+            return pool.submit(ctx.run, asyncio.run, coro).result()
     return asyncio.run(coro)
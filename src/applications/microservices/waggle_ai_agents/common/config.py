@@ -30,9 +30,18 @@ CLAUDE_MODEL_ID: str = os.getenv(
 GPT_OSS_MODEL_ID: str = os.getenv("BEDROCK_GPT_OSS_MODEL_ID", "openai.gpt-oss-120b-1:0")
 
 # --- Backend base URLs, resolved in order: env override -> SSM (PARAMETER_STORE_PREFIX) -> "".
-import functools  # noqa: E402
+# The parameters the agents read come from one get_parameters_by_path sweep, refreshed
+# in the background after CONFIG_TTL seconds (0 = never) and, with CONFIG_SNAPSHOT_PATH
+# set, persisted so the next cold start can serve from disk while it refreshes. Other
+# parameters under the prefix are neither kept nor persisted.
+import json  # noqa: E402
+import logging  # noqa: E402
+import threading  # noqa: E402
+import time  # noqa: E402
 
 PARAMETER_STORE_PREFIX: str = os.getenv("PARAMETER_STORE_PREFIX", "/petstore")
+CONFIG_TTL: float = float(os.getenv("CONFIG_TTL", "300"))
+CONFIG_SNAPSHOT_PATH: str = os.getenv("CONFIG_SNAPSHOT_PATH", "")
 
 # logical key -> SSM parameter short name (under the prefix)
 _BACKEND_SSM_NAMES: dict[str, str] = {
@@ -43,20 +52,160 @@ _BACKEND_SSM_NAMES: dict[str, str] = {
     "PAYFORADOPTION_API_URL": "paymentapiurl",
 }
 
+# Other short names read below; the fallback when the sweep is not permitted.
+_OTHER_SSM_NAMES = (
+    "waggleai/nutritionkbid",
+    "waggleai/gatewayurl",
+    "imagescdnurl",
+    "waggleai/memoryid",
+    "waggleai/guardrailid",
+    "waggleai/guardrailversion",
+)
 
-@functools.cache
-def _ssm_value(short_name: str) -> str:
-    """Fetch {PREFIX}/{short_name} from SSM; return '' on any failure."""
-    try:
+
+def backend_parameters() -> dict[str, str]:
+    """Backend keys accepted by ``backend_url`` (and as env overrides) -> SSM short name."""
+    return dict(_BACKEND_SSM_NAMES)
+
+
+def parameter_names() -> tuple[str, ...]:
+    """SSM short names (under the prefix) of every parameter the agents read."""
+    return (*_BACKEND_SSM_NAMES.values(), *_OTHER_SSM_NAMES)
+
+
+_logger = logging.getLogger(__name__)
+_ssm_client = None
+_params: dict[str, str] | None = None  # short name -> value, once loaded
+_params_at = 0.0  # time.time() of the sweep that produced _params
+_params_lock = threading.Lock()
+_load_lock = threading.Lock()
+_refreshing = threading.Event()
+
+
+def _ssm():
+    global _ssm_client
+    if _ssm_client is None:
         import boto3
 
-        ssm = boto3.client("ssm", region_name=AWS_REGION)
-        resp = ssm.get_parameter(Name=f"{PARAMETER_STORE_PREFIX}/{short_name}")
-        return resp["Parameter"]["Value"].rstrip("/")
+        _ssm_client = boto3.client("ssm", region_name=AWS_REGION)
+    return _ssm_client
+
+
+def _sweep() -> dict[str, str]:
+    """The parameters the agents read, keyed by their name relative to the prefix."""
+    root = PARAMETER_STORE_PREFIX.rstrip("/") + "/"
+    values: dict[str, str] = {}
+    try:
+        pages = (
+            _ssm()
+            .get_paginator("get_parameters_by_path")
+            .paginate(
+                Path=PARAMETER_STORE_PREFIX,
+                Recursive=True,
+            )
+        )
+        params = [p for page in pages for p in page.get("Parameters", [])]
+    except Exception as exc:  # noqa: BLE001 - e.g. role only allows GetParameter(s)
+        _logger.info("get_parameters_by_path failed (%s); reading known names", exc)
+        names = [root + n for n in parameter_names()]
+        params = []
+        while names:  # GetParameters takes at most 10 names
+            batch, names = names[:10], names[10:]
+            params += _ssm().get_parameters(Names=batch)["Parameters"]
+    wanted = set(parameter_names())
+    for param in params:
+        name = param["Name"].removeprefix(root)
+        if param["Name"].startswith(root) and name in wanted:
+            values[name] = param["Value"].rstrip("/")
+    return values
+
+
+def _read_snapshot() -> tuple[dict[str, str], float] | None:
+    try:
+        with open(CONFIG_SNAPSHOT_PATH) as f:
+            snap = json.load(f)
+        if snap.get("prefix") == PARAMETER_STORE_PREFIX:
+            return dict(snap["values"]), float(snap["fetched_at"])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+def write_snapshot(values: dict[str, str], fetched_at: float) -> None:
+    """Persist ``values`` to CONFIG_SNAPSHOT_PATH for the next cold start."""
+    tmp = f"{CONFIG_SNAPSHOT_PATH}.tmp"
+    try:
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(
+                {
+                    "prefix": PARAMETER_STORE_PREFIX,
+                    "fetched_at": fetched_at,
+                    "values": values,
+                },
+                f,
+            )
+        os.replace(tmp, CONFIG_SNAPSHOT_PATH)
+    except OSError as exc:
+        _logger.warning("config snapshot not written: %s", exc)
+
+
+def refresh() -> bool:
+    """Re-read the parameters from SSM now; on failure keep the current values."""
+    global _params, _params_at
+    try:
+        values = _sweep()
     except (
         Exception
-    ):  # noqa: BLE001 - missing param / no creds -> tools report "not configured"
-        return ""
+    ) as exc:  # noqa: BLE001 - missing param / no creds -> tools report "not configured"
+        _logger.warning("SSM read of %s failed: %s", PARAMETER_STORE_PREFIX, exc)
+        with _params_lock:
+            if _params is None:  # retry after CONFIG_TTL rather than on every lookup
+                _params, _params_at = {}, time.time()
+        return False
+    fetched_at = time.time()
+    with _params_lock:
+        _params, _params_at = values, fetched_at
+    if CONFIG_SNAPSHOT_PATH:
+        write_snapshot(values, fetched_at)
+    return True
+
+
+def _refresh_in_background() -> None:
+    with _params_lock:
+        if _refreshing.is_set():
+            return
+        _refreshing.set()
+
+    def work() -> None:
+        try:
+            refresh()
+        finally:
+            _refreshing.clear()
+
+    threading.Thread(target=work, name="config-refresh", daemon=True).start()
+
+
+def parameters() -> dict[str, str]:
+    """SSM parameters under the prefix: loaded once, then refreshed when stale."""
+    global _params, _params_at
+    if _params is None:
+        with _load_lock:  # one cold-start load, however many threads ask
+            if _params is None:
+                snap = _read_snapshot() if CONFIG_SNAPSHOT_PATH else None
+                if snap is not None:
+                    with _params_lock:
+                        _params, _params_at = snap
+                else:
+                    refresh()
+    if CONFIG_TTL and time.time() - _params_at > CONFIG_TTL:
+        _refresh_in_background()  # serve current values; fresh ones swap in when ready
+    return _params or {}
+
+
+def _ssm_value(short_name: str) -> str:
+    """Value of {PREFIX}/{short_name}, or '' if it is absent or SSM is unavailable."""
+    return parameters().get(short_name, "")
 
 
 def _origin(url: str) -> str:
@@ -71,7 +220,6 @@ def _origin(url: str) -> str:
     return url.rstrip("/")
 
 
-@functools.cache
 def backend_url(key: str) -> str:
     """Resolve a backend base (origin) URL: env override wins, else SSM, else ''."""
     override = os.getenv(key, "")
@@ -80,37 +228,31 @@ def backend_url(key: str) -> str:
     )
 
 
-@functools.cache
 def nutrition_kb_id() -> str:
     """Bedrock Knowledge Base id for the nutrition RAG: env override, else SSM, else ''."""
     return os.getenv("NUTRITION_KB_ID", "") or _ssm_value("waggleai/nutritionkbid")
 
 
-@functools.cache
 def gateway_url() -> str:
     """AgentCore Gateway base URL for delegation: env override, else SSM, else ''."""
     return os.getenv("GATEWAY_URL", "").rstrip("/") or _ssm_value("waggleai/gatewayurl")
 
 
-@functools.cache
 def images_cdn_url() -> str:
     """CloudFront base URL for pet/food images: env override, else SSM, else ''."""
     return os.getenv("IMAGES_CDN_URL", "").rstrip("/") or _ssm_value("imagescdnurl")
 
 
-@functools.cache
 def memory_id() -> str:
     """AgentCore Memory id: env override, else SSM, else '' (memory is best-effort no-op)."""
     return os.getenv("MEMORY_ID", "") or _ssm_value("waggleai/memoryid")
 
 
-@functools.cache
 def guardrail_id() -> str:
     """Bedrock Guardrail id: env override, else SSM, else '' (no guardrail applied)."""
     return os.getenv("GUARDRAIL_ID", "") or _ssm_value("waggleai/guardrailid")
 
 
-@functools.cache
 def guardrail_version() -> str:
     """Bedrock Guardrail version: env override, else SSM, else 'DRAFT'."""
     return (
@@ -121,3 +263,4 @@ def guardrail_version() -> str:
 
 
 HTTP_TIMEOUT: float = float(os.getenv("HTTP_TIMEOUT", "15"))
+HTTP_MAX_CONNECTIONS: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
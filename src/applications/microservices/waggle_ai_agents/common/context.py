@@ -0,0 +1,89 @@
+"""Token-budgeted assembly of recalled memory into prompt context.
+
+Recalled preferences and session turns are fitted into MEMORY_CONTEXT_TOKENS
+(estimated locally, no tokenizer download). Preferences take at most a third of
+the budget. The newest turns are kept verbatim; older lines stay verbatim only if
+they are relevant to the current query. Otherwise (or when a line does not fit)
+they are cut to their first sentence, capped at fewer words the older the line
+is.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import re
+
+from waggle_ai_agents.common import embeddings, metrics
+
+BUDGET_TOKENS = int(os.getenv("MEMORY_CONTEXT_TOKENS", "800"))
+RECENT_LINES = int(os.getenv("MEMORY_CONTEXT_RECENT_LINES", "4"))  # 2 turns
+RELEVANCE = float(os.getenv("MEMORY_CONTEXT_RELEVANCE", "0.3"))
+
+_PIECE = re.compile(r"\w+|[^\w\s]")
+_SENTENCE = re.compile(r"(?<=[.!?])\s")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate BPE token count: ~4 characters per word piece, 1 per symbol."""
+    return sum(math.ceil(len(p) / 4) for p in _PIECE.findall(text))
+
+
+def _truncate(line: str, age: int) -> str:
+    """``line`` cut to its first sentence and at most a word limit that shrinks
+    with ``age`` (not a summary: nothing past the cut is kept)."""
+    limit = max(8, 40 - 4 * age)
+    role, _, text = line.partition(": ")
+    sentences = _SENTENCE.split(text.strip(), maxsplit=1)
+    words = sentences[0].split()
+    cut = " ".join(words[:limit])
+    if len(words) > limit or len(sentences) > 1:
+        cut += " …"
+    return f"{role} (truncated): {cut}"
+
+
+def build(
+    prefs: list[str],
+    lines: list[str],
+    query: str,
+    budget: int = BUDGET_TOKENS,
+) -> str:
+    """Return the memory context block for ``query`` within ``budget`` tokens."""
+    blocks: list[str] = []
+    used = 0
+
+    kept_prefs: list[str] = []
+    for pref in prefs:
+        cost = estimate_tokens(pref) + 2
+        if used + cost > budget // 3:
+            break
+        kept_prefs.append(pref)
+        used += cost
+    if kept_prefs:
+        blocks.append(
+            "Known preferences about this user:\n- " + "\n- ".join(kept_prefs)
+        )
+
+    query_vec = embeddings.embed(query) if len(lines) > RECENT_LINES else None
+    chosen: list[str] = []  # newest first
+    for age, line in enumerate(reversed(lines)):
+        verbatim = age < RECENT_LINES or (
+            embeddings.cosine(query_vec, embeddings.embed(line)) >= RELEVANCE
+        )
+        cut = _truncate(line, age)
+        candidates = [line, cut] if verbatim else [cut]
+        for text in candidates:
+            cost = estimate_tokens(text) + 1
+            if used + cost <= budget:
+                chosen.append(text)
+                used += cost
+                break
+        else:
+            break  # budget spent; anything older would be less useful still
+    if chosen:
+        blocks.append(
+            "Recent conversation this session:\n" + "\n".join(reversed(chosen)),
+        )
+
+    metrics.histogram("waggle.memory.context_tokens", unit="{token}").record(used)
+    return "\n\n".join(blocks)
@@ -0,0 +1,42 @@
+"""Local, dependency-free text embeddings for lightweight similarity checks.
+
+A hashed bag of words and character trigrams: no model, no network, stable across
+processes. Good enough to tell "adopt a puppy" from "what should my kitten eat";
+not a substitute for a real embedding model on open-ended text.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import zlib
+
+DIM = 512
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _features(text: str) -> list[str]:
+    words = _WORD.findall(text.lower())
+    feats = [f"w:{w}" for w in words]
+    feats += [f"b:{a}_{b}" for a, b in zip(words, words[1:])]
+    for w in words:
+        padded = f"#{w}#"
+        feats += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+    return feats
+
+
+def embed(text: str) -> list[float]:
+    """Return an L2-normalised ``DIM``-length vector for ``text``."""
+    vec = [0.0] * DIM
+    for feat in _features(text):
+        h = zlib.crc32(feat.encode())
+        weight = 2.0 if feat[0] in "wb" else 1.0  # whole words outweigh trigrams
+        vec[h % DIM] += weight if h & 0x80000000 else -weight
+    norm = math.sqrt(sum(v * v for v in vec))
+    return [v / norm for v in vec] if norm else vec
+
+
+def cosine(a: list[float], b: list[float]) -> float:
+    """Cosine similarity of two vectors from :func:`embed` (already normalised)."""
+    return sum(x * y for x, y in zip(a, b))
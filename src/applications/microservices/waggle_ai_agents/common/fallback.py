@@ -0,0 +1,211 @@
+"""Model fallback chains and hedged requests for an agent's Bedrock client.
+
+``attach(client, agent)`` wraps the client's ``converse`` and ``converse_stream``.
+When the agent has fallback models (``models.fallback_models``), a call that is
+throttled (after the model gate's retries), finds the model unavailable, or times
+out is sent again to the next model in the chain. With
+``models.hedge_after_ms(agent)`` set, a call still unanswered after that long is
+also sent to the first fallback, and whichever answers first wins. The loser is
+left to finish (an in-flight call cannot be cancelled) and its stream, if any, is
+closed unread. A hedge costs a second model call, so it is off by default.
+
+A request moved to another model drops its ``additionalModelRequestFields`` when
+the provider differs, and its cache points when that model has no prompt cache.
+The model that served each call counts as ``waggle.model.served`` (by agent,
+model and route: primary, fallback, hedge), each failover as
+``waggle.model.fallbacks``.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import functools
+import os
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any
+
+from botocore.exceptions import ClientError, ReadTimeoutError
+from botocore.exceptions import ConnectionError as BotoConnectionError
+
+from waggle_ai_agents.common import metrics, models
+
+WORKERS = int(os.getenv("MODEL_HEDGE_WORKERS", "16"))
+
+_FAILOVER_CODES = frozenset(
+    {
+        "ThrottlingException",
+        "ServiceUnavailableException",
+        "ModelNotReadyException",
+        "ModelTimeoutException",
+        "InternalServerException",
+    }
+)
+
+_pool = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="model-hedge")
+
+
+def _reason(exc: BaseException) -> str | None:
+    """Why ``exc`` should move the call to the next model (None: it should not)."""
+    if isinstance(exc, ClientError):
+        code = exc.response.get("Error", {}).get("Code", "")
+        return code if code in _FAILOVER_CODES else None
+    if isinstance(exc, (ReadTimeoutError, BotoConnectionError)):
+        return type(exc).__name__
+    return None
+
+
+def _strip_cache_points(blocks: Any) -> Any:
+    if not isinstance(blocks, list):
+        return blocks
+    return [b for b in blocks if not (isinstance(b, dict) and "cachePoint" in b)]
+
+
+def _for_model(params: dict, model: str) -> dict:
+    """``params`` as a request to ``model`` instead of the model they were built for."""
+    if model == params.get("modelId"):
+        return params
+    moved = {**params, "modelId": model}
+    if models.vendor(model) != models.vendor(params.get("modelId", "")):
+        moved.pop("additionalModelRequestFields", None)
+    if not models.caches_prompts(model):
+        moved["system"] = _strip_cache_points(params.get("system"))
+        moved["messages"] = [
+            {**m, "content": _strip_cache_points(m.get("content"))}
+            for m in params.get("messages", [])
+        ]
+        if "toolConfig" in params:
+            moved["toolConfig"] = {
+                **params["toolConfig"],
+                "tools": _strip_cache_points(params["toolConfig"].get("tools")),
+            }
+        if moved["system"] is None:
+            del moved["system"]
+    return moved
+
+
+def _served(agent: str, model: str, route: str) -> None:
+    metrics.counter("waggle.model.served").add(
+        1,
+        {"agent": agent, "model": model, "route": route},
+    )
+
+
+def _failed_over(agent: str, model: str, reason: str) -> None:
+    metrics.counter("waggle.model.fallbacks").add(
+        1,
+        {"agent": agent, "model": model, "reason": reason},
+    )
+
+
+def _in_order(
+    agent: str,
+    call: Callable[..., Any],
+    params: dict,
+    chain: list[str],
+    route: str = "primary",
+) -> Any:
+    """Try each model in ``chain`` until one answers or fails for another reason."""
+    for model in chain[:-1]:
+        try:
+            result = call(**_for_model(params, model))
+        except Exception as exc:
+            reason = _reason(exc)
+            if reason is None:
+                raise
+            _failed_over(agent, model, reason)
+            route = "fallback"
+            continue
+        _served(agent, model, route)
+        return result
+    result = call(**_for_model(params, chain[-1]))
+    _served(agent, chain[-1], route if len(chain) == 1 else "fallback")
+    return result
+
+
+def _discard(future: Future) -> None:
+    # a hedge that lost the race: close its unread event stream
+    if future.cancelled() or future.exception() is not None:
+        return
+    stream = future.result().get("stream")
+    if stream is not None:
+        stream.close()
+
+
+def _hedged(
+    agent: str,
+    call: Callable[..., Any],
+    params: dict,
+    chain: list[str],
+    after: float,
+) -> Any:
+    primary = _pool.submit(contextvars.copy_context().run, call, **params)
+    try:
+        result = primary.result(timeout=after)
+    except FutureTimeout:
+        pass
+    except Exception as exc:
+        reason = _reason(exc)
+        if reason is None:
+            raise
+        _failed_over(agent, chain[0], reason)
+        return _in_order(agent, call, params, chain[1:], route="fallback")
+    else:
+        _served(agent, chain[0], "primary")
+        return result
+
+    hedge = _pool.submit(
+        contextvars.copy_context().run, call, **_for_model(params, chain[1])
+    )
+    racing = {primary: (chain[0], "primary"), hedge: (chain[1], "hedge")}
+    errors: dict[str, BaseException] = {}
+    while racing:
+        done, _ = wait(racing, return_when=FIRST_COMPLETED)
+        for future in done:
+            model, route = racing.pop(future)
+            try:
+                result = future.result()
+            except Exception as exc:  # noqa: BLE001 - the other call may still answer
+                errors[route] = exc
+                continue
+            for loser in racing:
+                loser.add_done_callback(_discard)
+            _served(agent, model, route)
+            return result
+    error = errors["primary"]
+    reason = _reason(error)
+    if reason is None or len(chain) < 3:
+        raise error
+    _failed_over(agent, chain[0], reason)
+    return _in_order(agent, call, params, chain[2:], route="fallback")
+
+
+def _call(
+    agent: str,
+    call: Callable[..., Any],
+    fallbacks: list[str],
+    after: float,
+    **params: Any,
+) -> Any:
+    chain = list(dict.fromkeys([params.get("modelId", ""), *fallbacks]))
+    if len(chain) == 1:
+        return call(**params)
+    if after > 0:
+        return _hedged(agent, call, params, chain, after)
+    return _in_order(agent, call, params, chain)
+
+
+def attach(client: Any, agent: str) -> Any:
+    """Give ``client``'s Converse calls ``agent``'s fallback chain and hedging.
+
+    Returns ``client``; a no-op when the agent has no fallback models.
+    """
+    fallbacks = models.fallback_models(agent)
+    if not fallbacks:
+        return client
+    after = models.hedge_after_ms(agent) / 1000
+    for name in ("converse", "converse_stream"):
+        call = getattr(client, name)
+        setattr(client, name, functools.partial(_call, agent, call, fallbacks, after))
+    return client
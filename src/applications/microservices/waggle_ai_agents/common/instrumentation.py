@@ -0,0 +1,489 @@
+"""One span/metric schema for agent turns, LLM steps and tool calls, across frameworks.
+
+Every agent's ``run`` is wrapped in ``traced_run`` (``traced_stream`` for async
+generators) and every tool function in ``traced_tool``. LLM steps are reported by
+a small adapter per framework — Strands hooks, a LangChain callback handler, the
+LlamaIndex converse subclass, botocore events on CrewAI's Bedrock client and a
+LiteLLM logger (OpenAI Agents) — all calling ``llm_step``. Emitted (OTel API; no-ops without it):
+
+- spans ``waggle.agent.run`` > ``waggle.llm.step`` / ``waggle.tool.call``, with
+  ``waggle.agent``, ``waggle.framework``, ``waggle.tool``, ``gen_ai.*`` attributes
+- histograms ``waggle.agent.run.duration``, ``waggle.llm.step.duration``,
+  ``waggle.tool.duration`` (by agent, tool, outcome), ``waggle.tool.result_size``
+  (bytes each tool hands the model) and per-turn
+  ``waggle.agent.run.llm_steps`` / ``waggle.agent.run.tool_calls``
+- token counts through ``usage.record`` (``waggle.llm.tokens``)
+"""
+
+from __future__ import annotations
+
+import functools
+import threading
+import time
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from waggle_ai_agents.common import metrics, models, usage
+
+try:  # ADOT ships the OTel API in every image; local dev may not have it
+    from opentelemetry import trace as _otel_trace
+    from opentelemetry.trace import Status, StatusCode
+
+    _tracer = _otel_trace.get_tracer("waggle_ai_agents")
+except ImportError:
+    _tracer = None
+
+FRAMEWORKS = {
+    "orchestrator": "strands",
+    "nutrition": "langgraph",
+    "ordering": "crewai",
+    "adoption": "llamaindex",
+    "concierge": "openai-agents",
+}
+
+
+class _NoOpSpan:
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+    def set_status(self, *args: Any) -> None:
+        pass
+
+    def end(self, end_time: int | None = None) -> None:
+        pass
+
+
+@dataclass
+class _Turn:
+    agent: str
+    llm_steps: int = 0
+    tool_calls: int = 0
+
+
+_turn: ContextVar[_Turn | None] = ContextVar("waggle_turn", default=None)
+
+# In-process totals per agent for stats() (the benchmark harness reads these).
+_FIELDS = (
+    "runs",
+    "run_ms",
+    "llm_steps",
+    "llm_ms",
+    "tool_calls",
+    "tool_ms",
+    "tool_bytes",
+    "errors",
+)
+_totals: dict[str, dict[str, float]] = {}
+_totals_lock = threading.Lock()
+
+
+def _add(agent: str, **amounts: float) -> None:
+    with _totals_lock:
+        totals = _totals.setdefault(agent, dict.fromkeys(_FIELDS, 0))
+        for field, amount in amounts.items():
+            totals[field] += amount
+
+
+@contextmanager
+def _span(name: str, attributes: dict[str, Any]) -> Iterator[Any]:
+    if _tracer is None:
+        yield _NoOpSpan()
+        return
+    with _tracer.start_as_current_span(
+        name,
+        attributes=attributes,
+        record_exception=False,
+        set_status_on_exception=False,
+    ) as span:
+        yield span
+
+
+def _fail(span: Any, error: BaseException | str) -> None:
+    if isinstance(error, BaseException):
+        span.record_exception(error)
+    if _tracer is not None:
+        span.set_status(Status(StatusCode.ERROR, str(error)[:200]))
+    span.set_attribute(
+        "error.type",
+        type(error).__name__ if isinstance(error, BaseException) else "tool_error",
+    )
+
+
+@contextmanager
+def _run(agent: str) -> Iterator[None]:
+    attrs = {"waggle.agent": agent, "waggle.framework": FRAMEWORKS.get(agent, "")}
+    turn = _Turn(agent)
+    token = _turn.set(turn)
+    start = time.perf_counter()
+    outcome = "ok"
+    with _span("waggle.agent.run", attrs) as span:
+        try:
+            yield
+        except BaseException as exc:
+            outcome = "error"
+            _fail(span, exc)
+            raise
+        finally:
+            _turn.reset(token)
+            elapsed = (time.perf_counter() - start) * 1000
+            _add(agent, runs=1, run_ms=elapsed, errors=outcome == "error")
+            span.set_attribute("waggle.llm_steps", turn.llm_steps)
+            span.set_attribute("waggle.tool_calls", turn.tool_calls)
+            labels = {"agent": agent, "outcome": outcome}
+            metrics.histogram("waggle.agent.run.duration").record(elapsed, labels)
+            metrics.histogram("waggle.agent.run.llm_steps", unit="1").record(
+                turn.llm_steps,
+                {"agent": agent},
+            )
+            metrics.histogram("waggle.agent.run.tool_calls", unit="1").record(
+                turn.tool_calls,
+                {"agent": agent},
+            )
+
+
+def traced_run(agent: str) -> Callable[[Callable[..., str]], Callable[..., str]]:
+    """Decorate an agent's sync ``run`` so each turn is one ``waggle.agent.run`` span."""
+
+    def decorate(fn: Callable[..., str]) -> Callable[..., str]:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> str:
+            with _run(agent):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def traced_stream(
+    agent: str,
+) -> Callable[[Callable[..., AsyncIterator[str]]], Callable[..., AsyncIterator[str]]]:
+    """``traced_run`` for an async-generator ``stream_run``."""
+
+    def decorate(
+        fn: Callable[..., AsyncIterator[str]],
+    ) -> Callable[..., AsyncIterator[str]]:
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> AsyncIterator[str]:
+            with _run(agent):
+                async for chunk in fn(*args, **kwargs):
+                    yield chunk
+
+        return wrapper
+
+    return decorate
+
+
+def traced_tool(agent: str) -> Callable[[Callable[..., str]], Callable[..., str]]:
+    """Decorate a tool function (beneath the framework's own tool decorator).
+
+    A tool that returns a JSON ``{"error": ...}`` payload counts as failed, like one
+    that raises.
+    """
+
+    def decorate(fn: Callable[..., str]) -> Callable[..., str]:
+        tool = fn.__name__
+        attrs = {"waggle.agent": agent, "waggle.tool": tool}
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> str:
+            turn = _turn.get()
+            if turn is not None:
+                turn.tool_calls += 1
+            start = time.perf_counter()
+            outcome = "ok"
+            size = 0
+            with _span("waggle.tool.call", attrs) as span:
+                try:
+                    result = fn(*args, **kwargs)
+                except BaseException as exc:
+                    outcome = "error"
+                    _fail(span, exc)
+                    raise
+                else:
+                    if isinstance(result, str):
+                        size = len(result.encode())
+                        span.set_attribute("waggle.tool.result_size", size)
+                        if result.startswith('{"error"'):
+                            outcome = "error"
+                            _fail(span, result)
+                    return result
+                finally:
+                    elapsed = (time.perf_counter() - start) * 1000
+                    _add(agent, tool_calls=1, tool_ms=elapsed, tool_bytes=size)
+                    labels = {"agent": agent, "tool": tool, "outcome": outcome}
+                    metrics.histogram("waggle.tool.duration").record(elapsed, labels)
+                    metrics.histogram("waggle.tool.result_size", unit="By").record(
+                        size,
+                        {"agent": agent, "tool": tool},
+                    )
+
+        return wrapper
+
+    return decorate
+
+
+def llm_step(
+    agent: str,
+    duration_ms: float,
+    tokens: tuple[int, int, int, int] | None = None,
+    error: BaseException | str | None = None,
+    model: str | None = None,
+) -> None:
+    """Record one model call that just finished (span back-dated by ``duration_ms``)."""
+    turn = _turn.get()
+    if turn is not None and turn.agent == agent:
+        turn.llm_steps += 1
+    outcome = "error" if error is not None else "ok"
+    _add(agent, llm_steps=1, llm_ms=duration_ms)
+    metrics.histogram("waggle.llm.step.duration").record(
+        duration_ms,
+        {"agent": agent, "outcome": outcome},
+    )
+    if tokens:
+        usage.record(agent, *tokens)
+    if _tracer is None:
+        return
+    end = time.time_ns()
+    span = _tracer.start_span(
+        "waggle.llm.step",
+        start_time=end - int(duration_ms * 1e6),
+        attributes={
+            "waggle.agent": agent,
+            "waggle.framework": FRAMEWORKS.get(agent, ""),
+            "gen_ai.system": "aws.bedrock",
+            "gen_ai.request.model": model or models.model_id(agent),
+        },
+    )
+    if tokens:
+        span.set_attribute(
+            "gen_ai.usage.input_tokens", tokens[0] + tokens[2] + tokens[3]
+        )
+        span.set_attribute("gen_ai.usage.output_tokens", tokens[1])
+        span.set_attribute("gen_ai.usage.cache_read_input_tokens", tokens[2])
+    if error is not None:
+        _fail(span, error)
+    span.end(end_time=end)
+
+
+# --- framework adapters -------------------------------------------------------------
+
+
+# start of the model call in flight in this turn (each turn runs in its own context)
+_strands_call_started: ContextVar[float | None] = ContextVar(
+    "waggle_strands_call_started",
+    default=None,
+)
+
+
+class StrandsHooks:
+    """Strands hook provider: one ``llm_step`` per model call (tokens come per turn)."""
+
+    def __init__(self, agent: str) -> None:
+        self.agent = agent
+
+    def register_hooks(self, registry: Any, **_: Any) -> None:
+        from strands.hooks import AfterModelCallEvent, BeforeModelCallEvent
+
+        registry.add_callback(BeforeModelCallEvent, self._before)
+        registry.add_callback(AfterModelCallEvent, self._after)
+
+    def _before(self, event: Any) -> None:
+        # one hook instance serves every concurrent turn: keep the start per turn
+        _strands_call_started.set(time.perf_counter())
+
+    def _after(self, event: Any) -> None:
+        start = _strands_call_started.get()
+        _strands_call_started.set(None)
+        if start is not None:
+            llm_step(
+                self.agent, (time.perf_counter() - start) * 1000, error=event.exception
+            )
+
+
+def langchain_callbacks(agent: str) -> Any:
+    """LangChain callback handler: one ``llm_step`` per chat-model call, with tokens."""
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class _Handler(BaseCallbackHandler):
+        def __init__(self) -> None:
+            self._started: dict[Any, float] = {}
+
+        def on_chat_model_start(
+            self, serialized, messages, *, run_id, **kwargs
+        ):  # noqa: ANN001
+            self._started[run_id] = time.perf_counter()
+
+        def on_llm_end(self, response, *, run_id, **kwargs):  # noqa: ANN001
+            start = self._started.pop(run_id, None)
+            if start is None:
+                return
+            message = (
+                getattr(response.generations[0][0], "message", None)
+                if response.generations
+                else None
+            )
+            llm_step(
+                agent,
+                (time.perf_counter() - start) * 1000,
+                tokens=usage.langchain_counts(getattr(message, "usage_metadata", None)),
+            )
+
+        def on_llm_error(self, error, *, run_id, **kwargs):  # noqa: ANN001
+            start = self._started.pop(run_id, None)
+            if start is not None:
+                llm_step(agent, (time.perf_counter() - start) * 1000, error=error)
+
+    return _Handler()
+
+
+_CONVERSE_STEP_KEY = "waggle_llm_step"
+
+
+def converse_hooks(client: Any, agent: str) -> Any:
+    """boto3 ``bedrock-runtime`` adapter (CrewAI's native Bedrock provider): one
+    ``llm_step`` per Converse or ConverseStream call, with Converse's token usage.
+
+    A streamed call is timed to its headers and has no tokens (they come in the
+    stream). Returns ``client``.
+    """
+
+    def started(params: dict, context: dict, **_: Any) -> None:
+        context[_CONVERSE_STEP_KEY] = (time.perf_counter(), params.get("modelId"))
+
+    def finished(
+        context: dict,
+        http_response: Any = None,
+        parsed: dict | None = None,
+        exception: BaseException | None = None,
+        **_: Any,
+    ) -> None:
+        start, model = context.pop(_CONVERSE_STEP_KEY, (None, None))
+        if start is None:
+            return
+        error: BaseException | str | None = exception
+        if (
+            error is None
+            and http_response is not None
+            and http_response.status_code >= 300
+        ):
+            error = (parsed or {}).get("Error", {}).get("Code") or "llm_error"
+        llm_step(
+            agent,
+            (time.perf_counter() - start) * 1000,
+            tokens=(
+                usage.converse_counts(parsed["usage"])
+                if error is None and parsed and "usage" in parsed
+                else None
+            ),
+            error=error,
+            model=model,
+        )
+
+    events = client.meta.events
+    for operation in ("Converse", "ConverseStream"):
+        events.register(
+            f"before-parameter-build.bedrock-runtime.{operation}",
+            started,
+            unique_id=f"waggle-llm-step-{agent}-{operation}-start",
+        )
+        for event in ("after-call", "after-call-error"):
+            events.register(
+                f"{event}.bedrock-runtime.{operation}",
+                finished,
+                unique_id=f"waggle-llm-step-{agent}-{operation}-{event}",
+            )
+    return client
+
+
+_litellm_registered = False
+_litellm_lock = threading.Lock()
+
+
+def _agent_for(model: str) -> str:
+    model = model.removeprefix("bedrock/").removeprefix("converse/")
+    for agent, model_id in models.AGENT_MODELS.items():
+        if model_id == model:
+            return agent
+    return "unknown"
+
+
+def register_litellm() -> None:
+    """Report every LiteLLM call (OpenAI Agents concierge) as an LLM step.
+
+    LiteLLM runs callbacks off the calling context, so the agent is found by model id.
+    """
+    global _litellm_registered
+    with _litellm_lock:
+        if _litellm_registered:
+            return
+        _litellm_registered = True
+
+    import litellm
+    from litellm.integrations.custom_logger import CustomLogger
+
+    def step(
+        kwargs: dict,
+        response_obj: Any,
+        start_time: Any,
+        end_time: Any,
+        error: Any = None,
+    ) -> None:
+        llm_step(
+            _agent_for(kwargs.get("model", "")),
+            (end_time - start_time).total_seconds() * 1000,
+            tokens=(
+                usage.litellm_counts(getattr(response_obj, "usage", None))
+                if error is None
+                else None
+            ),
+            error=error,
+            model=kwargs.get("model"),
+        )
+
+    class _StepLogger(CustomLogger):
+        def log_success_event(
+            self, kwargs, response_obj, start_time, end_time
+        ):  # noqa: ANN001
+            step(kwargs, response_obj, start_time, end_time)
+
+        def log_failure_event(
+            self, kwargs, response_obj, start_time, end_time
+        ):  # noqa: ANN001
+            step(
+                kwargs,
+                response_obj,
+                start_time,
+                end_time,
+                kwargs.get("exception") or "llm_error",
+            )
+
+        async def async_log_success_event(
+            self, kwargs, response_obj, start_time, end_time
+        ):  # noqa: ANN001
+            self.log_success_event(kwargs, response_obj, start_time, end_time)
+
+        async def async_log_failure_event(
+            self, kwargs, response_obj, start_time, end_time
+        ):  # noqa: ANN001
+            self.log_failure_event(kwargs, response_obj, start_time, end_time)
+
+    litellm.callbacks.append(_StepLogger())
+
+
+def stats() -> dict[str, dict[str, float]]:
+    """Totals per agent since start (or ``reset``): runs, LLM steps, tool calls and
+    result bytes, ms."""
+    with _totals_lock:
+        return {agent: dict(totals) for agent, totals in _totals.items()}
+
+
+def reset() -> None:
+    with _totals_lock:
+        _totals.clear()
@@ -1,20 +1,65 @@
-"""AgentCore Memory helper — best-effort short/long-term memory for agents."""
+"""AgentCore Memory helper — best-effort short/long-term memory for agents.
+
+Turn writes are write-behind by default: ``record_turn`` enqueues and returns, and a
+daemon thread drains the bounded queue, coalescing consecutive turns of the same
+session into one ``create_event``. The queue is flushed at interpreter exit; when it
+is full the turn is dropped (memory is best-effort) rather than stalling the user.
+
+``recall`` serves a session's recent turns from an in-process ring buffer that
+``record_turn`` keeps current, fetching from AgentCore only for cold or long-idle
+sessions, concurrently with the preferences lookup and under a shared deadline.
+The result is fitted to a token budget by ``context.build``.
+"""
 
 from __future__ import annotations
 
+import atexit
 import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError, wait
 from datetime import datetime, timezone
 
 import boto3
 
-from waggle_ai_agents.common import config
+from waggle_ai_agents.common import config, context, metrics
+from waggle_ai_agents.common.cache import TTLCache, normalize_query
 
 logger = logging.getLogger(__name__)
 
+ASYNC_WRITES = os.getenv("MEMORY_ASYNC_WRITES", "true").lower() == "true"
+QUEUE_SIZE = int(os.getenv("MEMORY_QUEUE_SIZE", "256"))
+BATCH_MAX = int(os.getenv("MEMORY_BATCH_MAX", "10"))  # turns per drain
+# How long record_turn may wait for queue space before dropping; 0 = never wait.
+ENQUEUE_TIMEOUT = float(os.getenv("MEMORY_ENQUEUE_TIMEOUT", "0"))
+FLUSH_TIMEOUT = float(os.getenv("MEMORY_FLUSH_TIMEOUT", "5"))
+# Recall: one deadline for all lookups; session turns kept locally; re-fetch after idling.
+RECALL_TIMEOUT = float(os.getenv("MEMORY_RECALL_TIMEOUT", "1.5"))
+SESSION_TURNS = int(os.getenv("MEMORY_SESSION_TURNS", "20"))
+SESSION_REFRESH = float(os.getenv("MEMORY_SESSION_REFRESH", "300"))
+PREFS_TTL = float(os.getenv("MEMORY_PREFS_TTL", "120"))
+
 _client = None
 
+# (memory id, actor id, session id, timestamp, user text, assistant text)
+_Turn = tuple[str, str, str, datetime, str, str]
+_queue: queue.Queue[_Turn] = queue.Queue(maxsize=QUEUE_SIZE)
+_worker: threading.Thread | None = None
+_worker_lock = threading.Lock()
+_counts = {"enqueued": 0, "written": 0, "events": 0, "dropped": 0, "failed": 0}
+_counts_lock = threading.Lock()
+
+_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="memory-recall")
+_sessions = TTLCache(maxsize=1024, ttl=3600)
+_sessions_lock = threading.Lock()
+_prefs_cache = TTLCache(maxsize=1024, ttl=PREFS_TTL)
 
-def _mem():
+
+def client():
+    """The shared AgentCore Memory (``bedrock-agentcore``) client."""
     global _client
     if _client is None:
         _client = boto3.client("bedrock-agentcore", region_name=config.AWS_REGION)
@@ -27,28 +72,243 @@ def record_turn(
     user_text: str,
     assistant_text: str,
 ) -> None:
-    """Store a user/assistant exchange as an event (best-effort)."""
+    """Store a user/assistant exchange as an event (best-effort, non-blocking)."""
     mem_id = config.memory_id()
     if not mem_id or not actor_id or not session_id:
         return
+    _session(actor_id, session_id).append(user_text, assistant_text)
+    turn = (
+        mem_id,
+        actor_id,
+        session_id,
+        datetime.now(timezone.utc),
+        user_text,
+        assistant_text,
+    )
+    if not ASYNC_WRITES:
+        _write([turn])
+        return
+    _ensure_worker()
     try:
-        _mem().create_event(
-            memoryId=mem_id,
-            actorId=actor_id,
-            sessionId=session_id,
-            eventTimestamp=datetime.now(timezone.utc),
-            payload=[
+        _queue.put(turn, block=ENQUEUE_TIMEOUT > 0, timeout=ENQUEUE_TIMEOUT or None)
+    except queue.Full:
+        _count("dropped")
+        logger.warning("memory.record_turn dropped: write queue full")
+        return
+    _count("enqueued")
+    metrics.histogram("waggle.memory.queue_depth", unit="1").record(_queue.qsize())
+
+
+def _count(key: str, n: int = 1) -> None:
+    with _counts_lock:
+        _counts[key] += n
+    metrics.counter("waggle.memory.writes").add(n, {"result": key})
+
+
+def _ensure_worker() -> None:
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(
+                target=_drain,
+                name="memory-writer",
+                daemon=True,
+            )
+            _worker.start()
+
+
+def _drain() -> None:
+    while True:
+        batch = [_queue.get()]
+        while len(batch) < BATCH_MAX:
+            try:
+                batch.append(_queue.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            _write(batch)
+        finally:
+            for _ in batch:
+                _queue.task_done()
+
+
+def _write(turns: list[_Turn]) -> None:
+    """One create_event per session, carrying that session's turns in order."""
+    sessions: dict[tuple[str, str, str], list[_Turn]] = {}
+    for turn in turns:
+        sessions.setdefault(turn[:3], []).append(turn)
+    for (mem_id, actor_id, session_id), group in sessions.items():
+        payload = []
+        for *_, user_text, assistant_text in group:
+            payload.append(
                 {"conversational": {"role": "USER", "content": {"text": user_text}}},
+            )
+            payload.append(
                 {
                     "conversational": {
                         "role": "ASSISTANT",
                         "content": {"text": assistant_text},
                     },
                 },
-            ],
+            )
+        start = time.perf_counter()
+        try:
+            client().create_event(
+                memoryId=mem_id,
+                actorId=actor_id,
+                sessionId=session_id,
+                eventTimestamp=group[0][3],
+                payload=payload,
+            )
+        except Exception as exc:  # noqa: BLE001 - memory is best-effort
+            _count("failed", len(group))
+            logger.warning("memory.record_turn failed: %s", exc)
+            continue
+        metrics.histogram("waggle.memory.write_latency").record(
+            (time.perf_counter() - start) * 1000,
         )
-    except Exception as exc:  # noqa: BLE001 - memory is best-effort
-        logger.warning("memory.record_turn failed: %s", exc)
+        _count("written", len(group))
+        with _counts_lock:
+            _counts["events"] += 1
+
+
+def flush(timeout: float = FLUSH_TIMEOUT) -> bool:
+    """Wait up to ``timeout`` s for queued turns to be written; True if drained."""
+    deadline = time.monotonic() + timeout
+    with _queue.all_tasks_done:
+        while _queue.unfinished_tasks:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.warning(
+                    "memory.flush timed out with %d turns pending",
+                    _queue.unfinished_tasks,
+                )
+                return False
+            _queue.all_tasks_done.wait(remaining)
+    return True
+
+
+def stats() -> dict:
+    """Write-behind counters and current queue depth."""
+    with _counts_lock:
+        return {**_counts, "queued": _queue.qsize()}
+
+
+atexit.register(flush)
+
+
+class _SessionBuffer:
+    """Ring buffer of a session's recent conversation lines, kept warm by record_turn."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._lines: deque[str] = deque(maxlen=2 * SESSION_TURNS)
+        # (user, assistant) lines the fetched history may not have yet
+        self._since_fetch: list[tuple[str, str]] = []
+        self._primed_at: float | None = None
+        self._used_at = time.monotonic()
+        self._fetching: int | None = None  # id of the fetch in flight
+        self._fetches = 0
+
+    def start_fetch(self) -> int | None:
+        """Return a fetch id if cold or idle past MEMORY_SESSION_REFRESH, else None."""
+        with self._lock:
+            idle = time.monotonic() - self._used_at
+            self._used_at = time.monotonic()
+            if self._fetching is not None or (
+                self._primed_at is not None and idle < SESSION_REFRESH
+            ):
+                return None
+            self._fetches += 1
+            self._fetching = self._fetches
+            # turns recorded before the first fetch may still be in the write queue
+            lines = list(self._lines) if self._primed_at is None else []
+            self._since_fetch = list(zip(lines[::2], lines[1::2]))
+            return self._fetching
+
+    def prime(self, fetch_id: int, lines: list[str] | None) -> None:
+        """Replace the buffer with fetched ``lines`` plus the turns recorded here
+        that they do not include yet."""
+        with self._lock:
+            if fetch_id != self._fetching:  # stale or already applied
+                return
+            self._fetching = None
+            if lines is None:  # fetch failed; retry on the next turn
+                return
+            fetched = set(zip(lines, lines[1:]))
+            unsaved = [
+                line
+                for turn in self._since_fetch
+                if turn not in fetched
+                for line in turn
+            ]
+            self._lines = deque(lines + unsaved, maxlen=2 * SESSION_TURNS)
+            self._since_fetch.clear()
+            self._primed_at = time.monotonic()
+
+    def append(self, user_text: str, assistant_text: str) -> None:
+        turn = (f"User: {user_text}", f"Assistant: {assistant_text}")
+        with self._lock:
+            self._lines.extend(turn)
+            if self._fetching is not None:
+                self._since_fetch.append(turn)
+
+    def lines(self) -> list[str]:
+        with self._lock:
+            return list(self._lines)
+
+
+def _session(actor_id: str, session_id: str) -> _SessionBuffer:
+    with _sessions_lock:
+        buf = _sessions.get((actor_id, session_id))
+        if buf is None:
+            buf = _SessionBuffer()
+            _sessions.set((actor_id, session_id), buf)
+        return buf
+
+
+def _fetch_preferences(
+    mem_id: str,
+    actor_id: str,
+    query: str,
+    max_results: int,
+) -> list[str]:
+    resp = client().retrieve_memory_records(
+        memoryId=mem_id,
+        namespace=f"/waggleai/{actor_id}/preferences",
+        searchCriteria={"searchQuery": query, "topK": max_results},
+    )
+    records = resp.get("memoryRecordSummaries") or resp.get("memoryRecords") or []
+    prefs = [(r.get("content") or {}).get("text", "") for r in records]
+    return [t for t in prefs if t]
+
+
+def _fetch_events(mem_id: str, actor_id: str, session_id: str) -> list[str]:
+    resp = client().list_events(
+        memoryId=mem_id,
+        actorId=actor_id,
+        sessionId=session_id,
+        maxResults=20,
+    )
+    events = sorted(resp.get("events", []), key=lambda e: e.get("eventId", ""))
+    lines: list[str] = []
+    for ev in events:
+        for item in ev.get("payload", []):
+            conv = item.get("conversational") or {}
+            text = (conv.get("content") or {}).get("text", "")
+            if text:
+                lines.append(f"{(conv.get('role') or '').title()}: {text}")
+    return lines
+
+
+def _primed_by(buf: _SessionBuffer, fetch_id: int):
+    def done(fut: Future) -> None:
+        exc = fut.exception()
+        if exc is not None:
+            logger.warning("memory.recall (events) failed: %s", exc)
+        buf.prime(fetch_id, None if exc is not None else fut.result())
+
+    return done
 
 
 def recall(
@@ -57,50 +317,60 @@ def recall(
     session_id: str | None = None,
     max_results: int = 3,
 ) -> str:
-    """Assemble memory context for the prompt; '' if none/unavailable."""
+    """Assemble memory context for the prompt; '' if none/unavailable.
+
+    Preferences and (cold) session events are fetched concurrently under one
+    MEMORY_RECALL_TIMEOUT deadline; whatever is late is skipped this turn. Warm
+    sessions are served from the local ring buffer with no AgentCore call.
+    """
     mem_id = config.memory_id()
     if not mem_id or not actor_id:
         return ""
 
-    blocks: list[str] = []
+    start = time.perf_counter()
+    pending: list[Future] = []
 
-    # Long-term durable preferences (cross-session).
-    try:
-        resp = _mem().retrieve_memory_records(
-            memoryId=mem_id,
-            namespace=f"/waggleai/{actor_id}/preferences",
-            searchCriteria={"searchQuery": query, "topK": max_results},
+    # Long-term durable preferences (cross-session); extraction lags, so a short cache is safe.
+    prefs_key = (actor_id, normalize_query(query), max_results)
+    prefs = _prefs_cache.get(prefs_key)
+    prefs_future = None
+    if prefs is None:
+        prefs_future = _pool.submit(
+            _fetch_preferences,
+            mem_id,
+            actor_id,
+            query,
+            max_results,
         )
-        records = resp.get("memoryRecordSummaries") or resp.get("memoryRecords") or []
-        prefs = [(r.get("content") or {}).get("text", "") for r in records]
-        prefs = [t for t in prefs if t]
-        if prefs:
-            blocks.append("Known preferences about this user:\n- " + "\n- ".join(prefs))
-    except Exception as exc:  # noqa: BLE001
-        logger.warning("memory.recall (preferences) failed: %s", exc)
+        pending.append(prefs_future)
 
     # Short-term recent turns of this session (immediate; no extraction delay).
-    if session_id:
+    buf = _session(actor_id, session_id) if session_id else None
+    fetch_id = buf.start_fetch() if buf is not None else None
+    events_future = None
+    if fetch_id is not None:
+        events_future = _pool.submit(_fetch_events, mem_id, actor_id, session_id)
+        pending.append(events_future)
+
+    if pending:
+        wait(pending, timeout=RECALL_TIMEOUT)
+    if events_future is not None:
+        # Runs now if the fetch made the deadline, else primes the next turn when it lands.
+        events_future.add_done_callback(_primed_by(buf, fetch_id))
+    if prefs_future is not None:
         try:
-            resp = _mem().list_events(
-                memoryId=mem_id,
-                actorId=actor_id,
-                sessionId=session_id,
-                maxResults=20,
-            )
-            events = sorted(resp.get("events", []), key=lambda e: e.get("eventId", ""))
-            lines: list[str] = []
-            for ev in events:
-                for item in ev.get("payload", []):
-                    conv = item.get("conversational") or {}
-                    text = (conv.get("content") or {}).get("text", "")
-                    if text:
-                        lines.append(f"{(conv.get('role') or '').title()}: {text}")
-            if lines:
-                blocks.append(
-                    "Recent conversation this session:\n" + "\n".join(lines[-16:]),
-                )
+            prefs = prefs_future.result(timeout=0)
+            _prefs_cache.set(prefs_key, prefs)
+        except TimeoutError:
+            logger.warning("memory.recall (preferences) timed out")
         except Exception as exc:  # noqa: BLE001
-            logger.warning("memory.recall (events) failed: %s", exc)
+            logger.warning("memory.recall (preferences) failed: %s", exc)
+
+    lines = buf.lines() if buf is not None else []
+    recalled = context.build(prefs or [], lines, query)
 
-    return "\n\n".join(blocks)
+    metrics.histogram("waggle.memory.recall_latency").record(
+        (time.perf_counter() - start) * 1000,
+        {"remote": bool(pending)},
+    )
+    return recalled
@@ -0,0 +1,74 @@
+"""OpenTelemetry metrics for the Waggle agents (no-op without the OTel API)."""
+
+from __future__ import annotations
+
+import bisect
+import functools
+import threading
+from typing import Any
+
+try:  # ADOT ships the OTel API in every image; local dev may not have it
+    from opentelemetry import metrics as _otel_metrics
+
+    _meter = _otel_metrics.get_meter("waggle_ai_agents")
+except ImportError:
+    _meter = None
+
+
+class _NoOp:
+    """Stands in for any OTel instrument when the API is unavailable."""
+
+    def add(self, amount: float, attributes: dict | None = None) -> None:
+        pass
+
+    def record(self, amount: float, attributes: dict | None = None) -> None:
+        pass
+
+
+@functools.cache
+def counter(name: str, unit: str = "1", description: str = "") -> Any:
+    """Return the process-wide counter called ``name``."""
+    if _meter is None:
+        return _NoOp()
+    return _meter.create_counter(name, unit=unit, description=description)
+
+
+@functools.cache
+def histogram(name: str, unit: str = "ms", description: str = "") -> Any:
+    """Return the process-wide histogram called ``name``."""
+    if _meter is None:
+        return _NoOp()
+    return _meter.create_histogram(name, unit=unit, description=description)
+
+
+class LatencyHistogram:
+    """In-process latency histogram for ``stats()`` endpoints (OTel gets the raw values)."""
+
+    BOUNDS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+    def __init__(self, name: str, description: str = "") -> None:
+        self._otel = histogram(name, description=description)
+        self._counts = [0] * (len(self.BOUNDS_MS) + 1)
+        self._total = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, ms: float, attributes: dict | None = None) -> None:
+        self._otel.record(ms, attributes)
+        slot = bisect.bisect_left(self.BOUNDS_MS, ms)
+        with self._lock:
+            self._counts[slot] += 1
+            self._total += ms
+
+    def snapshot(self) -> dict:
+        """Count, mean and cumulative ``le_<bound>`` bucket counts."""
+        with self._lock:
+            count = sum(self._counts)
+            buckets, running = {}, 0
+            for bound, n in zip((*self.BOUNDS_MS, "inf"), self._counts):
+                running += n
+                buckets[f"le_{bound}"] = running
+            return {
+                "count": count,
+                "mean_ms": round(self._total / count, 2) if count else 0.0,
+                "buckets": buckets,
+            }
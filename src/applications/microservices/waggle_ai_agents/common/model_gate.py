@@ -0,0 +1,257 @@
+"""Shared access to each Bedrock model: rate limit, adaptive concurrency, jittered retry.
+
+Every agent's model client goes through one ``ModelGate`` per model id, so the
+agents sharing a model (the orchestrator and nutrition both default to Sonnet)
+share its budget instead of each retrying on its own. A call waits for:
+
+- a token from the model's bucket (MODEL_RPS per second, bursts of MODEL_BURST;
+  0 turns the rate limit off), and
+- a concurrency slot. The limit starts at MODEL_MAX_CONCURRENCY, halves on every
+  throttle and grows back by about one per round of successful calls (AIMD).
+
+A throttled attempt (429, ThrottlingException, ServiceUnavailableException), a
+5xx or a connection error is retried up to MODEL_RETRIES times after a
+full-jitter backoff (uniform up to MODEL_RETRY_BASE * 2**attempt, capped at
+MODEL_RETRY_CAP seconds), so clients hitting the same throttle do not retry in
+lockstep. This replaces the client's own botocore retry policy. A call that has waited
+MODEL_QUEUE_TIMEOUT seconds goes ahead anyway rather than failing the turn.
+MODEL_LIMITS overrides the rate and ceiling per model:
+``<model-id>=<rps>[/<max concurrency>],...``.
+
+``attach`` wires a boto3 ``bedrock-runtime`` client (Strands, LangChain,
+LlamaIndex, CrewAI) through botocore's request events; LiteLLM callers use
+``ModelGate.acquire``/``release`` and ``backoff`` directly. A streamed response
+holds its slot until its headers arrive. Queue time is recorded as
+``waggle.model.queue_time`` (by model, agent and outcome), throttles as
+``waggle.model.throttles``. Limits are per process.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import re
+import threading
+import time
+from typing import Any
+from urllib.parse import unquote, urlsplit
+
+from botocore.exceptions import ConnectionError as BotoConnectionError
+from botocore.exceptions import HTTPClientError
+
+from waggle_ai_agents.common import metrics
+
+RPS = float(os.getenv("MODEL_RPS", "10"))
+BURST = float(os.getenv("MODEL_BURST", "20"))
+MAX_CONCURRENCY = int(os.getenv("MODEL_MAX_CONCURRENCY", "16"))
+RETRIES = int(os.getenv("MODEL_RETRIES", "4"))
+RETRY_BASE = float(os.getenv("MODEL_RETRY_BASE", "0.5"))
+RETRY_CAP = float(os.getenv("MODEL_RETRY_CAP", "8"))
+QUEUE_TIMEOUT = float(os.getenv("MODEL_QUEUE_TIMEOUT", "30"))
+
+_THROTTLE_CODES = frozenset(
+    {"ThrottlingException", "TooManyRequestsException", "ServiceUnavailableException"}
+)
+_MODEL_PATH = re.compile(r"^/model/([^/]+)/")
+_CONTEXT_KEY = "waggle_model_gate"
+
+
+def _limits() -> dict[str, tuple[float, int]]:
+    limits = {}
+    for entry in os.getenv("MODEL_LIMITS", "").split(","):
+        model, _, value = entry.strip().rpartition("=")
+        if not model:
+            continue
+        rps, _, ceiling = value.partition("/")
+        limits[model] = (float(rps), int(ceiling) if ceiling else MAX_CONCURRENCY)
+    return limits
+
+
+_LIMITS = _limits()
+
+
+def backoff(attempt: int) -> float:
+    """Full-jitter delay in seconds before retry number ``attempt`` (1-based)."""
+    return random.uniform(0, min(RETRY_CAP, RETRY_BASE * 2 ** (attempt - 1)))
+
+
+class ModelGate:
+    """Token bucket + AIMD concurrency limit for one model id."""
+
+    def __init__(
+        self,
+        model: str,
+        rps: float = RPS,
+        burst: float = BURST,
+        max_concurrency: int = MAX_CONCURRENCY,
+        timeout: float = QUEUE_TIMEOUT,
+    ) -> None:
+        self.model = model
+        self.rps = rps
+        self.burst = max(1.0, burst)
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._tokens = self.burst
+        self._stamp = time.monotonic()
+        self._limit = float(self.max_concurrency)
+        self._in_flight = 0
+        self._waiting = 0
+        self._throttles = 0
+        self._timeouts = 0
+
+    def _refill(self, now: float) -> None:
+        if self.rps > 0:
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._stamp) * self.rps
+            )
+        self._stamp = now
+
+    def _wait_for(self, now: float) -> float:
+        """Seconds until a call may start (0 = now); call with the lock held."""
+        if self._in_flight >= int(self._limit):
+            return float("inf")  # until a release notifies
+        if self.rps > 0 and self._tokens < 1:
+            return (1 - self._tokens) / self.rps
+        return 0.0
+
+    def acquire(self, agent: str) -> None:
+        """Block until this model has a token and a free slot (or the wait times out)."""
+        start = time.monotonic()
+        outcome = "granted"
+        with self._cond:
+            self._waiting += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    wait = self._wait_for(now)
+                    if not wait:
+                        break
+                    remaining = start + self.timeout - now
+                    if remaining <= 0:
+                        outcome = "timeout"
+                        self._timeouts += 1
+                        break
+                    self._cond.wait(min(wait, remaining))
+            finally:
+                self._waiting -= 1
+            if self.rps > 0:
+                self._tokens -= 1
+            self._in_flight += 1
+        metrics.histogram("waggle.model.queue_time").record(
+            (time.monotonic() - start) * 1000,
+            {"model": self.model, "agent": agent, "outcome": outcome},
+        )
+
+    def release(self, agent: str, throttled: bool = False) -> None:
+        """Free the slot: halve the limit after a throttle, else grow it slowly."""
+        with self._cond:
+            self._in_flight -= 1
+            if throttled:
+                self._throttles += 1
+                self._limit = max(1.0, self._limit / 2)
+            else:
+                self._limit = min(
+                    float(self.max_concurrency), self._limit + 1 / self._limit
+                )
+            self._cond.notify_all()
+        if throttled:
+            metrics.counter("waggle.model.throttles").add(
+                1,
+                {"model": self.model, "agent": agent},
+            )
+
+    def stats(self) -> dict[str, float]:
+        with self._cond:
+            return {
+                "limit": round(self._limit, 2),
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self._in_flight,
+                "waiting": self._waiting,
+                "tokens": round(max(self._tokens, 0.0), 2),
+                "throttles": self._throttles,
+                "timeouts": self._timeouts,
+            }
+
+
+_gates: dict[str, ModelGate] = {}
+_gates_lock = threading.Lock()
+
+
+def gate(model: str) -> ModelGate:
+    """The process-wide gate for Bedrock model id ``model``."""
+    with _gates_lock:
+        if model not in _gates:
+            rps, ceiling = _LIMITS.get(model, (RPS, MAX_CONCURRENCY))
+            _gates[model] = ModelGate(model, rps=rps, max_concurrency=ceiling)
+        return _gates[model]
+
+
+def _throttled(response: Any) -> bool:
+    if response is None:
+        return False
+    http_response, parsed = response
+    code = (parsed or {}).get("Error", {}).get("Code", "")
+    return http_response.status_code == 429 or code in _THROTTLE_CODES
+
+
+def _transient(response: Any, exception: Any) -> bool:
+    if isinstance(exception, (BotoConnectionError, HTTPClientError)):
+        return True
+    return response is not None and response[0].status_code in (500, 502, 503, 504)
+
+
+def attach(client: Any, agent: str) -> Any:
+    """Route every call ``client`` (boto3 ``bedrock-runtime``) makes through the
+    gate of the model it calls, on behalf of ``agent``. Returns ``client``."""
+
+    def take_slot(request: Any, **_: Any) -> None:
+        match = _MODEL_PATH.match(urlsplit(request.url).path)
+        if match is None:
+            return
+        model_gate = gate(unquote(match.group(1)))
+        model_gate.acquire(agent)
+        request.context[_CONTEXT_KEY] = model_gate
+
+    def retry_after(
+        request_dict: dict,
+        response: Any,
+        caught_exception: Any,
+        attempts: int,
+        **_: Any,
+    ) -> float | None:
+        throttled = _throttled(response)
+        model_gate = request_dict.get("context", {}).pop(_CONTEXT_KEY, None)
+        if model_gate is not None:
+            model_gate.release(agent, throttled)
+        if attempts > RETRIES:
+            return None
+        if throttled or _transient(response, caught_exception):
+            return backoff(attempts)  # botocore sleeps this long, then retries
+        return None
+
+    events = client.meta.events
+    # the client's own retry handler (legacy, standard or adaptive mode) would retry
+    # throttles again on its own schedule
+    events.unregister(
+        "needs-retry.bedrock-runtime", unique_id="retry-config-bedrock-runtime"
+    )
+    events.register(
+        "request-created.bedrock-runtime",
+        take_slot,
+        unique_id=f"waggle-model-gate-{agent}-acquire",
+    )
+    events.register(
+        "needs-retry.bedrock-runtime",
+        retry_after,
+        unique_id=f"waggle-model-gate-{agent}-release",
+    )
+    return client
+
+
+def stats() -> dict[str, dict[str, float]]:
+    """Per-model limit, in-flight and waiting calls, tokens, throttles and timeouts."""
+    with _gates_lock:
+        gates = dict(_gates)
+    return {model: g.stats() for model, g in gates.items()}
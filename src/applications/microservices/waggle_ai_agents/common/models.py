@@ -49,3 +49,91 @@ def model_id(agent: str) -> str:
 def litellm_model(agent: str) -> str:
     """Return the LiteLLM-style id (``bedrock/<model-id>``) for CrewAI."""
     return f"bedrock/{model_id(agent)}"
+
+
+# --- Bedrock prompt caching: cache points after the static system prompt and tool schemas.
+# PROMPT_CACHE (default for all) or <AGENT>_PROMPT_CACHE: true | false | auto (only
+# where the model supports it — Claude and Nova; Llama 4 and gpt-oss do not).
+PROMPT_CACHE = os.getenv("PROMPT_CACHE", "auto").lower()
+_CACHE_CAPABLE = ("anthropic.claude", "amazon.nova")
+
+
+def caches_prompts(model: str) -> bool:
+    """Whether Bedrock model id `model` accepts prompt-cache points."""
+    return any(family in model for family in _CACHE_CAPABLE)
+
+
+def prompt_caching(agent: str) -> bool:
+    """Whether `agent` should send prompt-cache points with its model calls."""
+    setting = os.getenv(f"{agent.upper()}_PROMPT_CACHE", PROMPT_CACHE).lower()
+    if setting == "auto":
+        return caches_prompts(model_id(agent))
+    return setting == "true"
+
+
+def litellm_cache_points(agent: str) -> list[dict]:
+    """LiteLLM ``cache_control_injection_points`` for `agent` ([] when caching is off)."""
+    if not prompt_caching(agent):
+        return []
+    return [{"location": "message", "role": "system"}]
+
+
+CACHE_POINT = {"cachePoint": {"type": "default"}}
+
+
+def add_cache_points(params: dict, **_: object) -> None:
+    """Put cache points after the system prompt (and, on Claude, the tool schemas) of
+    Converse request ``params`` when its model caches prompts.
+
+    A botocore ``before-parameter-build`` handler, for clients whose framework sends
+    no cache points of its own (CrewAI's native Bedrock provider). The blocks are
+    replaced, not appended to, as frameworks reuse them across calls.
+    """
+    model = params.get("modelId", "")
+    if not caches_prompts(model):
+        return
+    if (system := params.get("system")) and not any("cachePoint" in b for b in system):
+        params["system"] = [*system, CACHE_POINT]
+    tool_config = params.get("toolConfig") or {}
+    tools = tool_config.get("tools")
+    if "anthropic.claude" in model and tools and "cachePoint" not in tools[-1]:
+        params["toolConfig"] = {**tool_config, "tools": [*tools, CACHE_POINT]}
+
+
+# --- Streaming: ConverseStream accepts tool definitions only on some families (Llama
+# takes tools on Converse alone), so agents on other models keep tool-capable calls
+# non-streaming and emit each response whole.
+_STREAM_TOOLS_CAPABLE = ("anthropic.claude", "amazon.nova")
+
+
+def streams_tool_use(agent: str) -> bool:
+    """Whether `agent`'s model supports tool use over ConverseStream."""
+    return any(family in model_id(agent) for family in _STREAM_TOOLS_CAPABLE)
+
+
+# --- Fallback and hedging: <AGENT>_FALLBACK_MODELS lists model ids (comma-separated) to try
+# in order when the agent's model is throttled, unavailable or times out; routing falls
+# back from Sonnet to Nova Lite by default. <AGENT>_HEDGE_AFTER_MS > 0 also sends a call
+# still unanswered after that long to the first fallback and takes whichever answers first.
+_DEFAULT_FALLBACKS = {"orchestrator": NOVA_2_LITE}
+
+
+def fallback_models(agent: str) -> list[str]:
+    """Model ids to fail over to for `agent`, in order ([] when none)."""
+    setting = os.getenv(
+        f"{agent.upper()}_FALLBACK_MODELS",
+        _DEFAULT_FALLBACKS.get(agent, ""),
+    )
+    chain = [m.strip() for m in setting.split(",") if m.strip()]
+    return [m for m in dict.fromkeys(chain) if m != model_id(agent)]
+
+
+def hedge_after_ms(agent: str) -> float:
+    """Milliseconds after which `agent`'s call is hedged to its first fallback (0 = never)."""
+    return float(os.getenv(f"{agent.upper()}_HEDGE_AFTER_MS", "0"))
+
+
+def vendor(model: str) -> str:
+    """Provider part of a Bedrock model id (``us.anthropic.claude-...`` -> ``anthropic``)."""
+    parts = model.split(".")
+    return parts[-2] if len(parts) > 1 else ""
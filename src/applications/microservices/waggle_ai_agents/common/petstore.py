@@ -2,23 +2,47 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
 import os
+import threading
+import time
 from typing import Any
 
 import httpx
 
-from waggle_ai_agents.common import config
+from waggle_ai_agents.common import config, prefetch, turn_memo
+
+_http: httpx.Client | None = None
+_http_lock = threading.Lock()
+
+
+def http_client() -> httpx.Client:
+    """Process-wide pooled client, so tool calls reuse keep-alive connections."""
+    global _http
+    with _http_lock:
+        if _http is None:
+            _http = httpx.Client(
+                timeout=config.HTTP_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=config.HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=config.HTTP_MAX_CONNECTIONS,
+                ),
+            )
+        return _http
+
+
+def _invalidate(*reads: str) -> None:
+    # after a write: reads made or prefetched earlier in the turn are stale
+    turn_memo.invalidate(*reads)
+    prefetch.invalidate(*reads)
 
 
 def _get(base_url: str, name: str, path: str, params: dict | None = None) -> Any:
     if not base_url:
         return {"error": f"{name} is not configured (set its *_API_URL in .env)"}
     try:
-        resp = httpx.get(
-            f"{base_url}{path}",
-            params=params,
-            timeout=config.HTTP_TIMEOUT,
-        )
+        resp = http_client().get(f"{base_url}{path}", params=params)
         resp.raise_for_status()
         return resp.json()
     except Exception as exc:  # noqa: BLE001 - surface any failure to the agent
@@ -35,12 +59,7 @@ def _post(
     if not base_url:
         return {"error": f"{name} is not configured (set its *_API_URL in .env)"}
     try:
-        resp = httpx.post(
-            f"{base_url}{path}",
-            params=params,
-            json=json_body,
-            timeout=config.HTTP_TIMEOUT,
-        )
+        resp = http_client().post(f"{base_url}{path}", params=params, json=json_body)
         resp.raise_for_status()
         # some endpoints return empty bodies
         return resp.json() if resp.content else {"status": "ok"}
@@ -95,11 +114,18 @@ def search_pets(
         "petid": petid or "",
         "userId": user_id or "",
     }
-    return _get(
-        config.backend_url("SEARCH_API_URL"),
-        "pet-search",
-        "/api/search",
-        params,
+    key = ("search_pets", *params.values())
+    return prefetch.serve(
+        key,
+        lambda: turn_memo.read(
+            key,
+            lambda: _get(
+                config.backend_url("SEARCH_API_URL"),
+                "pet-search",
+                "/api/search",
+                params,
+            ),
+        ),
     )
 
 
@@ -129,37 +155,104 @@ def _with_image_url(payload: Any) -> Any:
     return payload
 
 
-def list_foods() -> Any:
-    """Return the full pet-food catalog (each item gains an absolute `image_url`)."""
-    return _with_image_url(
-        _get(config.backend_url("PETFOOD_API_URL"), "petfood", "/api/foods"),
+def list_foods(
+    pet_type: str | None = None,
+    min_price: float | None = None,
+    max_price: float | None = None,
+) -> Any:
+    """Return the pet-food catalog, filtered by the API (each item gains an `image_url`)."""
+    pet_type = normalize_pet_type(pet_type) or None
+    params = {
+        key: value
+        for key, value in (
+            ("pet_type", pet_type),
+            ("min_price", min_price),
+            ("max_price", max_price),
+        )
+        if value is not None
+    }
+    key = ("list_foods", pet_type or "", min_price, max_price)
+    return prefetch.serve(
+        key,
+        lambda: turn_memo.read(
+            key,
+            lambda: _with_image_url(
+                _get(
+                    config.backend_url("PETFOOD_API_URL"),
+                    "petfood",
+                    "/api/foods",
+                    params or None,
+                ),
+            ),
+        ),
     )
 
 
+CATALOG_VERSION_TTL = float(os.getenv("CATALOG_VERSION_TTL", "60"))
+_catalog_lock = threading.Lock()
+_catalog_version: tuple[float, str] = (0.0, "")
+
+
+def catalog_version() -> str:
+    """Short content hash of the food catalog (env CATALOG_VERSION pins it instead).
+
+    Re-fetched at most every CATALOG_VERSION_TTL seconds; caches key on it so a
+    catalog change invalidates answers that quoted the old one. A failed fetch
+    keeps the last version and is retried on the next call.
+    """
+    global _catalog_version
+    pinned = os.getenv("CATALOG_VERSION", "")
+    if pinned:
+        return pinned
+    with _catalog_lock:
+        fetched_at, version = _catalog_version
+        if version and time.monotonic() - fetched_at < CATALOG_VERSION_TTL:
+            return version
+        foods = list_foods()
+        if isinstance(foods, dict) and "error" in foods:
+            return version  # keep the last good version ("" if none: no caching)
+        payload = json.dumps(foods, sort_keys=True, default=str)
+        version = hashlib.sha256(payload.encode()).hexdigest()[:12]
+        _catalog_version = (time.monotonic(), version)
+        return version
+
+
 def get_food(food_id: str) -> Any:
     """Return details for a single food item (with an absolute `image_url`)."""
-    return _with_image_url(
-        _get(config.backend_url("PETFOOD_API_URL"), "petfood", f"/api/foods/{food_id}"),
+    return turn_memo.read(
+        ("get_food", food_id),
+        lambda: _with_image_url(
+            _get(
+                config.backend_url("PETFOOD_API_URL"),
+                "petfood",
+                f"/api/foods/{food_id}",
+            ),
+        ),
     )
 
 
 def get_cart(user_id: str) -> Any:
     """Return the user's current cart."""
-    return _get(
-        config.backend_url("PETFOOD_CART_URL"),
-        "petfood-cart",
-        f"/api/cart/{user_id}",
+    return turn_memo.read(
+        ("get_cart", user_id),
+        lambda: _get(
+            config.backend_url("PETFOOD_CART_URL"),
+            "petfood-cart",
+            f"/api/cart/{user_id}",
+        ),
     )
 
 
 def add_to_cart(user_id: str, food_id: str, quantity: int = 1) -> Any:
     """Add a food item to the user's cart."""
-    return _post(
+    result = _post(
         config.backend_url("PETFOOD_CART_URL"),
         "petfood-cart",
         f"/api/cart/{user_id}/items",
         json_body={"food_id": food_id, "quantity": quantity},
     )
+    _invalidate("get_cart")
+    return result
 
 
 def checkout(user_id: str, email: str | None = None) -> Any:
@@ -169,21 +262,26 @@ def checkout(user_id: str, email: str | None = None) -> Any:
         "shipping_address": None,
         "billing_address": None,
     }
-    return _post(
+    result = _post(
         config.backend_url("PETFOOD_CART_URL"),
         "petfood-cart",
         f"/api/cart/{user_id}/checkout",
         json_body=body,
     )
+    _invalidate("get_cart")
+    return result
 
 
 # --- adoption ------------------------------------------------------------
 def list_recent_adoptions() -> Any:
     """Return recently COMPLETED adoptions (history), not pets available to adopt."""
-    return _get(
-        config.backend_url("ADOPTIONLIST_API_URL"),
-        "petlistadoptions",
-        "/api/adoptionlist/",
+    return turn_memo.read(
+        ("list_recent_adoptions",),
+        lambda: _get(
+            config.backend_url("ADOPTIONLIST_API_URL"),
+            "petlistadoptions",
+            "/api/adoptionlist/",
+        ),
     )
 
 
@@ -194,9 +292,83 @@ def complete_adoption(pet_id: str, pet_type: str, user_id: str) -> Any:
         "petType": normalize_pet_type(pet_type),
         "userId": user_id,
     }
-    return _post(
+    result = _post(
         config.backend_url("PAYFORADOPTION_API_URL"),
         "payforadoption",
         "/api/completeadoption",
         params=params,
     )
+    _invalidate("search_pets", "list_recent_adoptions")
+    return result
+
+
+# --- compact tool payloads -----------------------------------------------
+# Tools hand the model only the fields they need, at most TOOL_MAX_ITEMS records
+# (plus a "more_available" count), as compact JSON with empty values dropped.
+TOOL_MAX_ITEMS = int(os.getenv("TOOL_MAX_ITEMS", "20"))
+
+
+def _prune(value: Any) -> Any:
+    if isinstance(value, dict):
+        pruned = {k: _prune(v) for k, v in value.items()}
+        return {k: v for k, v in pruned.items() if v not in (None, "", [], {})}
+    if isinstance(value, list):
+        return [_prune(v) for v in value]
+    return value
+
+
+def compact(payload: Any) -> str:
+    """Tool-result JSON: no whitespace, no null/empty fields, non-ASCII kept as is."""
+    return json.dumps(
+        _prune(payload), separators=(",", ":"), ensure_ascii=False, default=str
+    )
+
+
+def _project(
+    payload: Any,
+    key: str,
+    fields: tuple[str, ...],
+    limit: int,
+) -> Any:
+    """``{key: [records with only fields], "count": n}``, truncated to ``limit``."""
+    if isinstance(payload, dict) and "error" in payload:
+        return payload
+    records = payload.get(key) if isinstance(payload, dict) else payload
+    if not isinstance(records, list):
+        return payload
+    view: dict[str, Any] = {
+        "count": len(records),
+        key: [
+            {f: r[f] for f in fields if f in r} if isinstance(r, dict) else r
+            for r in records[:limit]
+        ],
+    }
+    if len(records) > limit:
+        view["more_available"] = len(records) - limit
+    return view
+
+
+def foods_view(
+    fields: tuple[str, ...],
+    pet_type: str | None = None,
+    min_price: float | None = None,
+    max_price: float | None = None,
+    limit: int = TOOL_MAX_ITEMS,
+) -> str:
+    """Compact catalog slice for a tool: ``fields`` of the first ``limit`` matches."""
+    return compact(
+        _project(list_foods(pet_type, min_price, max_price), "foods", fields, limit),
+    )
+
+
+def pets_view(
+    fields: tuple[str, ...],
+    pettype: str | None = None,
+    petcolor: str | None = None,
+    petid: str | None = None,
+    limit: int = TOOL_MAX_ITEMS,
+) -> str:
+    """Compact pet-search slice for a tool: ``fields`` of the first ``limit`` matches."""
+    return compact(
+        _project(search_pets(pettype, petcolor, petid), "pets", fields, limit),
+    )
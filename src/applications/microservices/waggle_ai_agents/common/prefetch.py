@@ -0,0 +1,185 @@
+"""Speculative prefetch: start a turn's likely petstore reads alongside its first LLM call.
+
+Nutrition turns nearly always look up the pet and the food catalog, adoption turns
+search the available pets, ordering turns list the catalog, but only after an LLM
+step decides to. ``turn(agent, query)`` starts those reads on a small thread pool
+as the turn begins, filtered by what the query says (pet type, color, id), and
+``petstore`` hands a tool the matching prefetched result (waiting for it if still
+in flight) instead of making the request again. A guess no tool asks for costs one
+backend read. Only reads are prefetched, never cart or adoption writes, and a write
+drops the prefetches of the reads it changes (``invalidate``).
+
+Each turn also scopes ``turn_memo``: a read another sub-agent of the same
+orchestrator turn already made is not prefetched again, and each prefetch is put
+in the memo for the others to share (so it is not cancelled when unused).
+
+Each tool read during a prefetched turn counts as ``waggle.prefetch.reads`` with
+outcome hit or miss, and each prefetch no tool used counts as unused.
+PREFETCH=false turns it off.
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+import re
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from waggle_ai_agents.common import metrics, turn_memo
+
+ENABLED = os.getenv("PREFETCH", "true").lower() == "true"
+WORKERS = int(os.getenv("PREFETCH_WORKERS", "8"))
+
+_WORD = re.compile(r"[a-z]+")
+_PET_ID = re.compile(r"\bpet(?:\s*id)?\s*[:#]?\s*([\w-]*\d[\w-]*)", re.I)
+_FOOD = re.compile(r"\b(?:foods?|eat|feed|diet|kibble)\b", re.I)
+
+_pool = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="prefetch")
+
+
+@dataclass
+class _Prefetch:
+    agent: str
+    pending: dict[tuple, Future] = field(default_factory=dict)
+    used: set[tuple] = field(default_factory=set)
+
+
+_current: ContextVar[_Prefetch | None] = ContextVar("waggle_prefetch", default=None)
+
+
+def signals(query: str) -> tuple[str, str, str]:
+    """(pet type, color, pet id) mentioned in ``query``; "" where it names none."""
+    from waggle_ai_agents.common import petstore
+
+    pettype = petcolor = ""
+    for word in _WORD.findall(query.lower()):
+        for form in (word, word.removesuffix("s"), re.sub(r"ies$", "y", word)):
+            if not pettype and petstore.normalize_pet_type(form) in petstore.PET_TYPES:
+                pettype = petstore.normalize_pet_type(form)
+        if not petcolor and word in petstore.PET_COLORS:
+            petcolor = word
+    match = _PET_ID.search(query)
+    return pettype, petcolor, match.group(1) if match else ""
+
+
+def _plan(agent: str, query: str) -> list[tuple[tuple, Callable[[], Any]]]:
+    """(read key, fetch) for the reads ``agent`` is likely to make for ``query``."""
+    from waggle_ai_agents.common import petstore
+
+    pettype, petcolor, petid = signals(query)
+
+    def search(*args: str) -> tuple[tuple, Callable[[], Any]]:
+        # keyed by the normalised arguments, as petstore.search_pets looks them up
+        return (
+            ("search_pets", *args, ""),
+            functools.partial(petstore.search_pets, *(a or None for a in args)),
+        )
+
+    def catalog(pet_type: str = "") -> tuple[tuple, Callable[[], Any]]:
+        return (
+            ("list_foods", pet_type, None, None),
+            functools.partial(petstore.list_foods, pet_type or None),
+        )
+
+    foods = catalog()
+    if agent == "nutrition":
+        # its prompt has it narrow the catalog to the pet's type when it knows it
+        pets = (
+            [search(pettype, petcolor, petid)] if pettype or petcolor or petid else []
+        )
+        return pets + [catalog(pettype)]
+    if agent == "adoption":
+        # a named pet is looked up by common/resolver.py before the LLM runs
+        return [] if petid else [search(pettype, petcolor, "")]
+    if agent == "ordering":
+        return [foods]
+    if agent == "concierge" and _FOOD.search(query):
+        return [foods]
+    return []
+
+
+@contextmanager
+def turn(agent: str, query: str) -> Iterator[None]:
+    """Prefetch ``agent``'s likely reads for the duration of one turn, and memoise
+    its petstore reads (``turn_memo``) unless an enclosing turn already does."""
+    with turn_memo.turn(), _prefetching(agent, query):
+        yield
+
+
+@contextmanager
+def _prefetching(agent: str, query: str) -> Iterator[None]:
+    pending: dict[tuple, Future] = {}
+    shared = turn_memo.active()
+    for key, fetch in _plan(agent, query) if ENABLED else []:
+        future: Future = Future()
+        # claimed before it starts, so sub-agents starting together read it once
+        if shared and not turn_memo.offer(key, future):
+            continue  # another sub-agent of this turn already reads it
+        pending[key] = future
+        _pool.submit(_fill, future, fetch)
+    if not pending:
+        yield
+        return
+    state = _Prefetch(agent, pending)
+    token = _current.set(state)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+        unused = [key for key in pending if key not in state.used]
+        if not shared:  # else the turn's other sub-agents may still read them
+            for key in unused:
+                pending[key].cancel()
+        if unused:
+            _count(agent, "unused", len(unused))
+
+
+def invalidate(*reads: str) -> None:
+    """Drop this turn's prefetches of the named reads (after a write changed them)."""
+    state = _current.get()
+    if state is None:
+        return
+    for key in list(state.pending):
+        if key[0] in reads:
+            state.pending.pop(key, None)
+
+
+def _fill(future: Future, fetch: Callable[[], Any]) -> None:
+    if not future.set_running_or_notify_cancel():
+        return
+    try:
+        future.set_result(fetch())
+    except BaseException as exc:  # noqa: BLE001 - surfaced to whoever reads it
+        future.set_exception(exc)
+
+
+def _count(agent: str, outcome: str, n: int = 1) -> None:
+    metrics.counter("waggle.prefetch.reads").add(
+        n,
+        {"agent": agent, "outcome": outcome},
+    )
+
+
+def serve(key: tuple, fetch: Callable[[], Any]) -> Any:
+    """The turn's prefetched result for read ``key``, else ``fetch()``."""
+    state = _current.get()
+    if state is None:
+        return fetch()
+    future = state.pending.get(key)
+    if future is not None:
+        state.used.add(key)
+        try:
+            result = future.result()
+        except Exception:  # noqa: BLE001 - a failed guess just means a normal read
+            result = None
+        # an error payload may be transient: read again rather than serve it
+        if result is not None and not (isinstance(result, dict) and "error" in result):
+            _count(state.agent, "hit")
+            return result
+    _count(state.agent, "miss")
+    return fetch()
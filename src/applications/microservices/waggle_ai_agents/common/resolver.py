@@ -0,0 +1,247 @@
+"""Deterministic lookups from what a customer clicked or typed to catalog ids.
+
+A photo click in the chat sends the photo URL, and customers name foods loosely.
+Rather than have the LLM list the whole catalog and match URLs itself, ``foods``
+and ``pets`` look references up in in-memory indexes: image URL -> food, peturl ->
+pet, pet id -> pet, and normalised (then fuzzy) name -> food. The indexes are
+built from the full catalog and pet list, re-read every RESOLVER_TTL seconds (and
+on a miss, at most every RESOLVER_MISS_REFRESH seconds, to pick up new items), and
+only rebuilt when the data changed. ``food`` takes exact matches only, for callers
+that act without asking. ``annotate`` resolves the references in a
+message before the LLM sees it. Lookups count as ``waggle.resolver.lookups`` by
+kind and outcome (hit, ambiguous, miss).
+"""
+
+from __future__ import annotations
+
+import difflib
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+from urllib.parse import urlsplit
+
+from waggle_ai_agents.common import metrics, petstore, prefetch
+
+TTL = float(os.getenv("RESOLVER_TTL", "60"))
+MISS_REFRESH = float(os.getenv("RESOLVER_MISS_REFRESH", "5"))
+# difflib similarity a misspelt food name needs to count as a match
+FUZZY_CUTOFF = float(os.getenv("RESOLVER_FUZZY_CUTOFF", "0.6"))
+MAX_CANDIDATES = 3
+
+_URL = re.compile(r"https?://[^\s\"'<>()\[\]]+")
+_QUOTED = re.compile(r'"([^"]{2,80})"')
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def _norm(name: Any) -> str:
+    return _NON_WORD.sub(" ", str(name or "").lower()).strip()
+
+
+def _url_keys(url: Any) -> list[str]:
+    """Most to least specific: host+path, path, file name (query string ignored)."""
+    if not isinstance(url, str) or not url.strip():
+        return []
+    parts = urlsplit(url.strip().rstrip(".,;:!?"))
+    path = parts.path.strip("/")
+    keys = [f"{parts.netloc.lower()}/{path}"] if parts.netloc else []
+    return keys + [path, path.rsplit("/", 1)[-1]] if path else keys
+
+
+def _put(index: dict[str, Any], key: str, record: dict) -> None:
+    # a key two different records share resolves to neither
+    if key and index.setdefault(key, record) is not record:
+        index[key] = None
+
+
+def _records(payload: Any, key: str) -> list[dict] | None:
+    if isinstance(payload, dict):
+        payload = payload.get(key)
+    return payload if isinstance(payload, list) else None
+
+
+class _Index:
+    """One lazily loaded lookup table set, refreshed by age and rebuilt on change."""
+
+    def __init__(
+        self,
+        load: Callable[[], list[dict] | None],
+        build: Callable[[list[dict]], dict[str, dict]],
+    ) -> None:
+        self._load = load
+        self._build = build
+        self._lock = threading.Lock()
+        self._tables: dict[str, dict] = {}
+        self._digest = ""
+        self._loaded_at = float("-inf")
+
+    def tables(self, max_age: float = TTL) -> dict[str, dict]:
+        with self._lock:
+            if time.monotonic() - self._loaded_at >= max_age:
+                self._refresh()
+            return self._tables
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._loaded_at = float("-inf")
+
+    def _refresh(self) -> None:
+        records = self._load()
+        self._loaded_at = time.monotonic()
+        if records is None:  # backend error: keep serving the last good index
+            return
+        payload = json.dumps(records, sort_keys=True, default=str)
+        digest = hashlib.sha256(payload.encode()).hexdigest()
+        if digest != self._digest:
+            self._tables = self._build(records)
+            self._digest = digest
+
+
+def _build_foods(foods: list[dict]) -> dict[str, dict]:
+    by_url: dict[str, Any] = {}
+    by_id: dict[str, Any] = {}
+    by_name: dict[str, Any] = {}
+    for food in foods:
+        if not isinstance(food, dict) or not food.get("id"):
+            continue
+        by_id[str(food["id"]).lower()] = food
+        _put(by_name, _norm(food.get("name")), food)
+        for url in {food.get("image_url"), food.get("image")}:
+            for key in _url_keys(url):
+                _put(by_url, key, food)
+    return {"url": by_url, "id": by_id, "name": by_name}
+
+
+def _build_pets(pets: list[dict]) -> dict[str, dict]:
+    by_url: dict[str, Any] = {}
+    by_id: dict[str, Any] = {}
+    for pet in pets:
+        if not isinstance(pet, dict) or not pet.get("petid"):
+            continue
+        by_id[str(pet["petid"]).lower()] = pet
+        for key in _url_keys(pet.get("peturl")):
+            _put(by_url, key, pet)
+    return {"url": by_url, "id": by_id}
+
+
+_foods = _Index(lambda: _records(petstore.list_foods(), "foods"), _build_foods)
+_pets = _Index(lambda: _records(petstore.search_pets(), "pets"), _build_pets)
+
+
+def _by_url(tables: dict[str, dict], reference: str) -> list[dict]:
+    for key in _url_keys(reference):
+        if record := tables["url"].get(key):
+            return [record]
+    return []
+
+
+def _find_foods(tables: dict[str, dict], reference: str) -> list[dict]:
+    if _URL.match(reference.strip()):
+        return _by_url(tables, reference)
+    if food := tables["id"].get(reference.strip().lower()):
+        return [food]
+    names = {n: f for n, f in tables["name"].items() if f is not None}
+    wanted = _norm(reference)
+    if wanted in names:
+        return [names[wanted]]
+    words = set(wanted.split())
+    contained = [f for n, f in names.items() if words and words <= set(n.split())]
+    if contained:
+        return contained[:MAX_CANDIDATES]
+    close = difflib.get_close_matches(
+        wanted, list(names), n=MAX_CANDIDATES, cutoff=FUZZY_CUTOFF
+    )
+    return [names[n] for n in close]
+
+
+def _exact_food(tables: dict[str, dict], reference: str) -> list[dict]:
+    if _URL.match(reference.strip()):
+        return _by_url(tables, reference)
+    food = tables["id"].get(reference.strip().lower()) or tables["name"].get(
+        _norm(reference)
+    )
+    return [food] if food else []
+
+
+def _find_pets(tables: dict[str, dict], reference: str) -> list[dict]:
+    if _URL.match(reference.strip()):
+        return _by_url(tables, reference)
+    pet = tables["id"].get(reference.strip().lstrip("#").lower())
+    return [pet] if pet else []
+
+
+def _resolve(
+    kind: str,
+    index: _Index,
+    find: Callable[[dict[str, dict], str], list[dict]],
+    reference: str,
+) -> list[dict]:
+    matches = find(index.tables(), reference)
+    if not matches:  # maybe an item added since the last load
+        matches = find(index.tables(MISS_REFRESH), reference)
+    outcome = "miss" if not matches else "hit" if len(matches) == 1 else "ambiguous"
+    metrics.counter("waggle.resolver.lookups").add(
+        1,
+        {"kind": kind, "outcome": outcome},
+    )
+    return matches
+
+
+def foods(reference: str) -> list[dict]:
+    """Catalog items a photo URL, food id or (possibly misspelt) name refers to.
+
+    One item is the match; several are candidates to ask about; none, no match.
+    """
+    return _resolve("food", _foods, _find_foods, reference)
+
+
+def food(reference: str) -> dict | None:
+    """The catalog item a photo URL, food id or exact name (case and punctuation
+    aside) refers to; None when no single item matches exactly."""
+    matches = _resolve("food", _foods, _exact_food, reference)
+    return matches[0] if matches else None
+
+
+def foods_by_id() -> dict[str, dict]:
+    """The catalog by lowercased food id, from one snapshot of the index (for
+    callers looking up many ids at once; a missing id does not force a reload)."""
+    return _foods.tables().get("id", {})
+
+
+def pets(reference: str) -> list[dict]:
+    """Pets a photo URL or pet id refers to (at most one)."""
+    return _resolve("pet", _pets, _find_pets, reference)
+
+
+def invalidate_pets() -> None:
+    """Re-read the pet list on the next lookup (e.g. after an adoption)."""
+    _pets.invalidate()
+
+
+def annotate(agent: str, query: str, fields: tuple[str, ...]) -> str:
+    """A note listing what the photo URLs, quoted names and pet ids in ``query``
+    resolve to, for ``agent``'s message ("" when nothing resolves to one item)."""
+    if agent == "ordering":
+        references = _URL.findall(query) + _QUOTED.findall(query)
+        lookup = foods
+    elif agent == "adoption":
+        petid = prefetch.signals(query)[2]
+        references = _URL.findall(query) + ([petid] if petid else [])
+        lookup = pets
+    else:
+        return ""
+    resolved = {}
+    for reference in references:
+        matches = lookup(reference)
+        if len(matches) == 1:
+            resolved[reference] = {f: matches[0][f] for f in fields if f in matches[0]}
+    if not resolved:
+        return ""
+    return (
+        "\n\n[Resolved references (exact catalog lookups; use these ids): "
+        f"{petstore.compact(resolved)}]"
+    )
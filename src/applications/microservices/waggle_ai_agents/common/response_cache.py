@@ -0,0 +1,120 @@
+"""Opt-in semantic cache for general (non-transactional) agent answers.
+
+Keyed on agent + catalog version + normalised query, so every user asking the same
+general question shares one answer. An answer that uses the asking user's data (it
+names their user id) is stored under that user as well and only served to them.
+A lookup tries the exact keys first, then — when RESPONSE_CACHE_SIMILARITY > 0 —
+the most similar cached query for the same agent and catalog version, shared or the
+user's own. Turns that name the user id or carry a cart / adoption intent are never
+cached or served from cache.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+
+from waggle_ai_agents.common import embeddings, metrics, petstore
+from waggle_ai_agents.common.cache import TTLCache, normalize_query
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.getenv("RESPONSE_CACHE", "false").lower() == "true"
+TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL", "900"))
+MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_SIZE", "512"))
+# Minimum cosine similarity for a near-duplicate hit; 0 means exact match only.
+SIMILARITY = float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0.92"))
+
+# Personal or transactional turns: the answer depends on who asks or changes state.
+_BYPASS = re.compile(
+    r"\buser[\s_-]?id\b|\bcart\b|\bcheck ?out\b|\bcheckout\b|\border\b|\bbuy\b|"
+    r"\bpurchase\b|\badopt(?:ion|ing|ed)?\b|\bmy (?:account|orders?)\b",
+    re.I,
+)
+# Tokens a near-duplicate must share exactly: ids, quantities and quoted names.
+_EXACT_TOKENS = re.compile(r'\d+|"[^"]*"')
+
+_cache = TTLCache(maxsize=MAX_ENTRIES, ttl=TTL_SECONDS)
+
+
+def _cacheable(query: str, user_id: str | None) -> bool:
+    if not ENABLED or _BYPASS.search(query):
+        return False
+    return not (user_id and user_id.lower() in query.lower())
+
+
+def _version() -> str:
+    try:
+        return petstore.catalog_version()
+    except Exception as exc:  # noqa: BLE001 - no version -> no caching this turn
+        logger.warning("response_cache: catalog version unavailable: %s", exc)
+        return ""
+
+
+def lookup(agent: str, query: str, user_id: str | None = None) -> str | None:
+    """Return a cached answer for ``query`` or None (miss, bypass or disabled)."""
+    if not _cacheable(query, user_id):
+        if ENABLED:
+            metrics.counter("waggle.response_cache.requests").add(
+                1,
+                {"agent": agent, "result": "bypass"},
+            )
+        return None
+    version = _version()
+    norm = normalize_query(query)
+    users = ("", user_id) if user_id else ("",)
+    result, answer = "miss", None
+    if version:
+        entry = None
+        for user in users:
+            if (entry := _cache.get((agent, version, user, norm))) is not None:
+                break
+        if entry is not None:
+            result, answer = "exact", entry[0]
+        elif SIMILARITY > 0:
+            answer = _nearest(agent, version, users, norm)
+            result = "similar" if answer is not None else "miss"
+    metrics.counter("waggle.response_cache.requests").add(
+        1,
+        {"agent": agent, "result": result},
+    )
+    return answer
+
+
+def store(agent: str, query: str, user_id: str | None, answer: str) -> None:
+    """Cache ``answer`` for ``query`` when the turn is cacheable and succeeded."""
+    if not isinstance(answer, str) or not answer or answer.startswith("Error"):
+        return
+    if not _cacheable(query, user_id):
+        return
+    version = _version()
+    if not version:
+        return
+    norm = normalize_query(query)
+    vector = embeddings.embed(norm) if SIMILARITY > 0 else None
+    personal = bool(user_id) and user_id.lower() in answer.lower()
+    _cache.set(
+        (agent, version, user_id if personal else "", norm),
+        (answer, vector, _EXACT_TOKENS.findall(norm)),
+    )
+
+
+def _nearest(agent: str, version: str, users: tuple[str, ...], norm: str) -> str | None:
+    vector = embeddings.embed(norm)
+    pinned = _EXACT_TOKENS.findall(norm)
+    best, best_score = None, SIMILARITY
+    for (a, v, u, _), (answer, cached_vec, cached_pinned) in _cache.items():
+        if (a, v) != (agent, version) or u not in users or cached_vec is None:
+            continue
+        if cached_pinned != pinned:
+            continue
+        score = embeddings.cosine(vector, cached_vec)
+        if score >= best_score:
+            best, best_score = answer, score
+    return best
+
+
+def stats() -> dict:
+    """Hit/miss/eviction counts for the exact-key layer."""
+    return _cache.stats()
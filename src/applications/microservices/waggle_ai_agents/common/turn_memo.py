@@ -0,0 +1,129 @@
+"""Turn-scoped memoisation of petstore reads, shared by every agent in the turn.
+
+Within one orchestrator turn, several specialists often make the same read:
+nutrition and ordering both list the catalog, adoption and nutrition both search
+the pets. ``turn()`` opens a memo in a ContextVar (propagated to tool threads
+like the orchestrator's ``_current_user``), and ``petstore`` answers each read
+it has already made in that turn from the memo. Identical reads in flight at the
+same time wait for the first one instead of repeating it, and each sub-agent's
+prefetched reads are shared with the others. Only reads are
+memoised; a cart or adoption write drops the reads it changes (``invalidate``),
+and error payloads are never kept.
+
+A nested ``turn()`` (a sub-agent delegated to in-process) joins the enclosing
+memo, so one orchestrator turn reads each endpoint once. Sub-agents in worker
+processes or their own runtimes memoise their own turn. Reads count as
+``waggle.turn_memo.reads`` by read and outcome (hit, miss). TURN_MEMO=false turns
+it off.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from waggle_ai_agents.common import metrics
+
+ENABLED = os.getenv("TURN_MEMO", "true").lower() == "true"
+
+
+class _Memo:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.reads: dict[tuple, Future] = {}
+
+
+_current: ContextVar[_Memo | None] = ContextVar("waggle_turn_memo", default=None)
+
+
+@contextmanager
+def turn() -> Iterator[None]:
+    """Memoise petstore reads until the outermost ``turn()`` ends."""
+    if not ENABLED or _current.get() is not None:
+        yield
+        return
+    token = _current.set(_Memo())
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def active() -> bool:
+    """Whether reads are being memoised (inside a ``turn()``)."""
+    return _current.get() is not None
+
+
+def _count(key: tuple, outcome: str) -> None:
+    metrics.counter("waggle.turn_memo.reads").add(
+        1,
+        {"read": key[0], "outcome": outcome},
+    )
+
+
+def _failed(result: Any) -> bool:
+    return isinstance(result, dict) and "error" in result
+
+
+def offer(key: tuple, future: Future) -> bool:
+    """Make ``future`` (a prefetch about to start) the turn's read ``key``;
+    False when there is no memo or the turn already has that read."""
+    memo = _current.get()
+    if memo is None:
+        return False
+    with memo.lock:
+        if key in memo.reads:
+            return False
+        memo.reads[key] = future
+    return True
+
+
+def read(key: tuple, fetch: Callable[[], Any]) -> Any:
+    """The turn's result for read ``key``, calling ``fetch()`` the first time."""
+    memo = _current.get()
+    if memo is None:
+        return fetch()
+    while True:
+        with memo.lock:
+            future = memo.reads.get(key)
+            if future is None:
+                future = memo.reads[key] = Future()
+                break
+        try:
+            result = future.result()
+        except Exception:  # noqa: BLE001 - a failed read is just made again
+            result = None
+        if result is not None and not _failed(result):
+            _count(key, "hit")
+            return result
+        with memo.lock:  # a failed prefetch: the next reader makes it again
+            if memo.reads.get(key) is future:
+                del memo.reads[key]
+    _count(key, "miss")
+    try:
+        result = fetch()
+    except BaseException as exc:
+        with memo.lock:
+            memo.reads.pop(key, None)
+        future.set_exception(exc)
+        raise
+    if _failed(result):  # may be transient
+        with memo.lock:
+            memo.reads.pop(key, None)
+    future.set_result(result)
+    return result
+
+
+def invalidate(*reads: str) -> None:
+    """Forget this turn's results for the named reads (after a write changed them)."""
+    memo = _current.get()
+    if memo is None:
+        return
+    with memo.lock:
+        for key in [k for k in memo.reads if k[0] in reads]:
+            del memo.reads[key]
@@ -0,0 +1,98 @@
+"""Token usage per agent, including Bedrock prompt-cache reads and writes.
+
+Each framework reports usage in its own shape; the ``*_counts`` helpers map them
+onto one set of counters (``waggle.llm.tokens`` by agent and kind) so the effect
+of prompt caching (``models.prompt_caching``) shows up as ``cache_read`` tokens
+and a rising ``stats()[agent]["cache_hit_ratio"]``. ``input`` is always the
+uncached part of the prompt.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any
+
+from waggle_ai_agents.common import metrics
+
+KINDS = ("input", "output", "cache_read", "cache_write")
+
+_totals: dict[str, dict[str, int]] = {}
+_lock = threading.Lock()
+
+
+def record(
+    agent: str,
+    input_tokens: int = 0,
+    output_tokens: int = 0,
+    cache_read: int = 0,
+    cache_write: int = 0,
+) -> None:
+    """Add one model call's (or one turn's) token counts for ``agent``."""
+    counts = dict(zip(KINDS, (input_tokens, output_tokens, cache_read, cache_write)))
+    tokens = metrics.counter("waggle.llm.tokens", unit="{token}")
+    with _lock:
+        totals = _totals.setdefault(agent, dict.fromkeys(KINDS, 0))
+        for kind, n in counts.items():
+            totals[kind] += n or 0
+    for kind, n in counts.items():
+        if n:
+            tokens.add(n, {"agent": agent, "kind": kind})
+
+
+def converse_counts(usage: dict[str, Any] | None) -> tuple[int, int, int, int]:
+    """Counts from Bedrock Converse ``usage`` (also Strands' ``Usage``)."""
+    usage = usage or {}
+    return (
+        usage.get("inputTokens", 0),  # excludes cached tokens already
+        usage.get("outputTokens", 0),
+        usage.get("cacheReadInputTokens", 0),
+        usage.get("cacheWriteInputTokens", 0),
+    )
+
+
+def langchain_counts(meta: dict[str, Any] | None) -> tuple[int, int, int, int]:
+    """Counts from a LangChain message's ``usage_metadata`` (input includes cache)."""
+    meta = meta or {}
+    details = meta.get("input_token_details") or {}
+    read = details.get("cache_read", 0) or 0
+    write = details.get("cache_creation", 0) or 0
+    return (
+        meta.get("input_tokens", 0) - read - write,
+        meta.get("output_tokens", 0),
+        read,
+        write,
+    )
+
+
+def litellm_counts(usage: Any) -> tuple[int, int, int, int]:
+    """Counts from a LiteLLM ``Usage`` (prompt_tokens includes cache)."""
+    details = getattr(usage, "prompt_tokens_details", None)
+    read = getattr(details, "cached_tokens", 0) or 0
+    write = getattr(usage, "cache_creation_input_tokens", 0) or 0
+    return (
+        (getattr(usage, "prompt_tokens", 0) or 0) - read - write,
+        getattr(usage, "completion_tokens", 0) or 0,
+        read,
+        write,
+    )
+
+
+def record_strands(agent: str, result: Any) -> None:
+    """Usage of the invocation that produced a Strands ``AgentResult``."""
+    invocation = getattr(
+        getattr(result, "metrics", None),
+        "latest_agent_invocation",
+        None,
+    )
+    if invocation is not None:
+        record(agent, *converse_counts(invocation.usage))
+
+
+def stats() -> dict[str, dict[str, float]]:
+    """Token totals per agent with the share of prompt tokens served from cache."""
+    with _lock:
+        report: dict[str, dict[str, float]] = {a: dict(t) for a, t in _totals.items()}
+    for totals in report.values():
+        prompt = totals["input"] + totals["cache_read"] + totals["cache_write"]
+        totals["cache_hit_ratio"] = totals["cache_read"] / prompt if prompt else 0.0
+    return report
@@ -0,0 +1,175 @@
+"""Warm-start: pay an agent container's cold-start costs before it reports ready.
+
+``agentcore_server.build_app`` runs ``warm(agent)`` before returning the app, so
+the first user request no longer pays for lazy framework imports, SSM lookups,
+TLS handshakes and botocore client construction. Each phase is timed (and
+recorded as ``waggle.warmup.phase``); ``boot`` is the process start up to the
+warm-up, i.e. module imports and agent construction. Every phase is best-effort —
+a failure is logged and the container still starts.
+
+WARMUP=false skips it; WARMUP_MODEL_PING=true also sends a 1-token Converse call.
+"""
+
+from __future__ import annotations
+
+import importlib
+import logging
+import os
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from waggle_ai_agents.common import config, metrics, model_gate, models
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.getenv("WARMUP", "true").lower() == "true"
+MODEL_PING = os.getenv("WARMUP_MODEL_PING", "false").lower() == "true"
+EXTRA_IMPORTS = [m for m in os.getenv("WARMUP_IMPORTS", "").split(",") if m.strip()]
+
+_report: dict[str, float] = {}
+
+
+def _imports(agent: str) -> list[str]:
+    """Modules the agent would otherwise import lazily on its first request."""
+    mods = ["botocore.endpoint", "waggle_ai_agents.common.memory"]
+    if agent == "orchestrator":
+        from waggle_ai_agents.orchestrator_strands import delegate
+
+        if delegate.TRANSPORT == "local":  # sub-agents run in-process
+            mods += [
+                "waggle_ai_agents.nutrition_langgraph",
+                "waggle_ai_agents.ordering_crewai",
+                "waggle_ai_agents.adoption_llamaindex",
+                "waggle_ai_agents.concierge_openai",
+            ]
+        elif delegate.TRANSPORT == "gateway":
+            mods += ["botocore.auth", "botocore.awsrequest"]
+    elif agent == "nutrition":
+        from waggle_ai_agents.rag import retrieval
+
+        if retrieval.BACKEND != "kb":
+            mods += ["waggle_ai_agents.rag.local_index", "waggle_ai_agents.rag.hybrid"]
+    return mods + [m.strip() for m in EXTRA_IMPORTS]
+
+
+def _preload_imports(agent: str) -> None:
+    for name in _imports(agent):
+        try:
+            importlib.import_module(name)
+        except ImportError as exc:  # e.g. sub-agent deps absent from this image
+            logger.info("warmup: skipped import %s (%s)", name, exc)
+
+
+def _resolve_config(agent: str) -> None:
+    config.parameters()  # one SSM sweep (or the on-disk snapshot) serves every lookup
+
+
+def _open_http_pools(agent: str) -> None:
+    from waggle_ai_agents.common import petstore
+
+    client = petstore.http_client()
+    origins = {config.backend_url(key) for key in config.backend_parameters()}
+    origins.discard("")
+
+    def connect(origin: str) -> None:
+        # Any response will do: the point is the pooled keep-alive connection.
+        try:
+            client.head(origin, timeout=min(config.HTTP_TIMEOUT, 3.0))
+        except Exception as exc:  # noqa: BLE001
+            logger.info("warmup: %s unreachable (%s)", urlsplit(origin).netloc, exc)
+
+    if origins:
+        with ThreadPoolExecutor(max_workers=len(origins)) as pool:
+            list(pool.map(connect, origins))
+
+
+def _build_clients(agent: str) -> None:
+    from waggle_ai_agents.common import memory
+
+    if config.memory_id():
+        memory.client()
+    if agent == "orchestrator":
+        from waggle_ai_agents.orchestrator_strands import delegate
+
+        if delegate.TRANSPORT == "pool":  # workers warm up alongside this process
+            from waggle_ai_agents.common import worker_pool
+
+            worker_pool.start()
+    if agent == "nutrition":
+        from waggle_ai_agents.rag import retrieval
+
+        if retrieval.BACKEND == "kb" or config.nutrition_kb_id():
+            retrieval.client()
+        if retrieval.BACKEND != "kb":
+            from waggle_ai_agents.rag import hybrid, local_index
+
+            local_index.load()
+            hybrid.keyword_index()
+
+
+def _ping_model(agent: str) -> None:
+    import boto3
+
+    client = boto3.client("bedrock-runtime", region_name=config.AWS_REGION)
+    model_gate.attach(client, agent).converse(
+        modelId=models.model_id(agent),
+        messages=[{"role": "user", "content": [{"text": "ping"}]}],
+        inferenceConfig={"maxTokens": 1},
+    )
+
+
+_PHASES: list[tuple[str, Callable[[str], None]]] = [
+    ("imports", _preload_imports),
+    ("config", _resolve_config),
+    ("http", _open_http_pools),
+    ("clients", _build_clients),
+    ("model_ping", _ping_model),
+]
+
+
+def _since_process_start_ms() -> float | None:
+    """Milliseconds since this process started (Linux /proc; None elsewhere)."""
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return (uptime - start_ticks / os.sysconf("SC_CLK_TCK")) * 1000
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def warm(agent: str) -> dict[str, float]:
+    """Run the warm-up phases for ``agent``; return per-phase milliseconds."""
+    timings: dict[str, float] = {}
+    boot = _since_process_start_ms()
+    if boot is not None:
+        timings["boot"] = boot
+    if ENABLED:
+        for phase, step in _PHASES:
+            if phase == "model_ping" and not MODEL_PING:
+                continue
+            start = time.perf_counter()
+            try:
+                step(agent)
+            except Exception as exc:  # noqa: BLE001 - warm-up must never block startup
+                logger.warning("warmup %s failed: %s", phase, exc)
+            timings[phase] = (time.perf_counter() - start) * 1000
+    hist = metrics.histogram("waggle.warmup.phase")
+    for phase, ms in timings.items():
+        hist.record(ms, {"agent": agent, "phase": phase})
+    logger.info(
+        "warmup %s: %s",
+        agent,
+        ", ".join(f"{p}={ms:.0f}ms" for p, ms in timings.items()),
+    )
+    _report.clear()
+    _report.update(timings)
+    return timings
+
+
+def report() -> dict[str, float]:
+    """Per-phase timings of the last warm-up (ms)."""
+    return dict(_report)
@@ -0,0 +1,300 @@
+"""Warm worker processes for in-process-style delegation (``AGENT_TRANSPORT=pool``).
+
+Each sub-agent gets its own pool of ``<AGENT>_POOL_SIZE`` (default AGENT_POOL_SIZE)
+worker processes, started from a forkserver so they never inherit the
+orchestrator's threads or sockets. A worker imports only its own framework stack,
+runs ``warmup.warm`` and then answers one delegation at a time over a pipe,
+sending the answer back chunk by chunk (``stream_run``) or whole (``run``). A slow
+CrewAI turn therefore only occupies an ordering worker, and the orchestrator never
+loads the four stacks itself.
+
+A worker joins the pool only once it reports warm within AGENT_POOL_TIMEOUT
+seconds; one that does not is retired and another started. A worker is retired
+after AGENT_POOL_MAX_REQUESTS delegations (to bound memory), when it fails or
+sends anything out of protocol, or when it sends nothing for AGENT_POOL_TIMEOUT
+seconds; a fresh one is started in the background to replace it. A delegation
+waits at most AGENT_POOL_TIMEOUT seconds for an idle worker. Wait time is recorded as
+``waggle.pool.wait``, worker busy time as ``waggle.pool.busy_time`` (utilisation
+is busy time over pool size x wall time), retirements as ``waggle.pool.recycled``
+by reason; ``stats()`` reports each pool's current state.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections.abc import Iterator
+from typing import Any
+
+from waggle_ai_agents.common import metrics
+
+POOL_SIZE = int(os.getenv("AGENT_POOL_SIZE", "2"))
+MAX_REQUESTS = int(os.getenv("AGENT_POOL_MAX_REQUESTS", "200"))
+TIMEOUT = float(os.getenv("AGENT_POOL_TIMEOUT", "120"))
+# pause before starting another worker after one failed to warm up
+RELAUNCH_DELAY = 5.0
+
+PACKAGES = {
+    "nutrition": "waggle_ai_agents.nutrition_langgraph",
+    "ordering": "waggle_ai_agents.ordering_crewai",
+    "adoption": "waggle_ai_agents.adoption_llamaindex",
+    "concierge": "waggle_ai_agents.concierge_openai",
+}
+
+_mp = multiprocessing.get_context("forkserver")
+
+
+def pool_size(agent: str) -> int:
+    return max(1, int(os.getenv(f"{agent.upper()}_POOL_SIZE", str(POOL_SIZE))))
+
+
+class WorkerError(Exception):
+    """The worker failed the delegation, died, or stopped responding."""
+
+
+async def _relay(chunks: Any, conn: Any) -> None:
+    async for chunk in chunks:
+        conn.send(("chunk", chunk))
+
+
+def _serve(agent: str, conn: Any) -> None:
+    """Worker process: load and warm ``agent``, then answer until told to stop."""
+    from waggle_ai_agents.common import warmup
+
+    module = importlib.import_module(PACKAGES[agent])
+    warmup.warm(agent)
+    loop = asyncio.new_event_loop()
+    conn.send(("ready", None))
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):  # the orchestrator went away
+            break
+        if request is None:
+            break
+        streaming, query, user_id = request
+        try:
+            if streaming:
+                loop.run_until_complete(
+                    _relay(module.stream_run(query, user_id=user_id), conn)
+                )
+            else:
+                conn.send(("chunk", module.run(query, user_id=user_id)))
+            conn.send(("done", None))
+        except Exception as exc:  # noqa: BLE001 - reported to the orchestrator
+            conn.send(("error", f"{type(exc).__name__}: {exc}"))
+    loop.close()
+    conn.close()
+
+
+class _Worker:
+    def __init__(self, agent: str) -> None:
+        self.conn, child = _mp.Pipe()
+        self.process = _mp.Process(
+            target=_serve,
+            args=(agent, child),
+            name=f"{agent}-worker",
+            daemon=True,
+        )
+        self.process.start()
+        child.close()
+        self.served = 0
+        self.healthy = True
+
+    def wait_ready(self) -> bool:
+        """Whether the worker warmed up and said so within AGENT_POOL_TIMEOUT."""
+        try:
+            return self.conn.poll(TIMEOUT) and self.conn.recv() == ("ready", None)
+        except (EOFError, OSError):
+            return False
+
+    def retire(self) -> None:
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(5 if self.healthy else 0)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(1)
+        self.conn.close()
+
+
+class AgentPool:
+    """Warm worker processes for one sub-agent."""
+
+    def __init__(self, agent: str, size: int, max_requests: int = MAX_REQUESTS) -> None:
+        self.agent = agent
+        self.size = size
+        self.max_requests = max(1, max_requests)
+        self._idle: queue.Queue[_Worker] = queue.Queue()
+        self._lock = threading.Lock()
+        self._started = False
+        self._busy = 0
+        self._busy_ms = 0.0
+        self._served = 0
+        self._recycled = 0
+        self._since = time.monotonic()
+
+    def start(self) -> None:
+        """Start the pool's workers (they warm up in the background)."""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            self._since = time.monotonic()
+        for _ in range(self.size):
+            self._launch()
+
+    def _launch(self) -> None:
+        """Start a worker; it joins the idle queue once warmed up."""
+
+        def warm() -> None:
+            while True:
+                worker = _Worker(self.agent)
+                if worker.wait_ready():
+                    self._idle.put(worker)
+                    return
+                # never queue it: a late "ready" would be read as a reply
+                worker.healthy = False
+                worker.retire()
+                self._count_recycled("not_ready")
+                time.sleep(RELAUNCH_DELAY)
+
+        threading.Thread(target=warm, name=f"{self.agent}-launch", daemon=True).start()
+
+    def _replace(self, worker: _Worker, reason: str) -> None:
+        self._launch()
+        worker.retire()
+        self._count_recycled(reason)
+
+    def _count_recycled(self, reason: str) -> None:
+        with self._lock:
+            self._recycled += 1
+        metrics.counter("waggle.pool.recycled").add(
+            1,
+            {"agent": self.agent, "reason": reason},
+        )
+
+    def _receive(self, worker: _Worker) -> tuple[str, Any]:
+        if not worker.conn.poll(TIMEOUT):
+            raise WorkerError(f"{self.agent} worker sent nothing for {TIMEOUT}s")
+        try:
+            return worker.conn.recv()
+        except (EOFError, OSError):
+            raise WorkerError(f"{self.agent} worker exited") from None
+
+    def stream(
+        self,
+        query: str,
+        user_id: str | None = None,
+        streaming: bool = False,
+    ) -> Iterator[str]:
+        """The delegation's answer from an idle worker: chunks of ``stream_run``
+        when ``streaming``, else ``run``'s answer as one chunk."""
+        self.start()
+        start = time.monotonic()
+        try:
+            worker = self._idle.get(timeout=TIMEOUT)
+        except queue.Empty:
+            raise WorkerError(
+                f"no idle {self.agent} worker within {TIMEOUT}s"
+            ) from None
+        metrics.histogram("waggle.pool.wait").record(
+            (time.monotonic() - start) * 1000,
+            {"agent": self.agent},
+        )
+        with self._lock:
+            self._busy += 1
+        taken = time.monotonic()
+        finished = False
+        try:
+            worker.conn.send((streaming, query, user_id))
+            while True:
+                kind, value = self._receive(worker)
+                if kind == "chunk":
+                    yield value
+                elif kind == "done":
+                    finished = True
+                    return
+                elif kind == "error":  # the worker is fine; the delegation failed
+                    finished = True
+                    raise WorkerError(value)
+                else:  # out of step with its pipe: never reuse it
+                    raise WorkerError(f"{self.agent} worker sent unexpected {kind!r}")
+        finally:
+            busy_ms = (time.monotonic() - taken) * 1000
+            worker.served += 1
+            with self._lock:
+                self._busy -= 1
+                self._busy_ms += busy_ms
+                self._served += 1
+            metrics.counter("waggle.pool.busy_time", unit="ms").add(
+                busy_ms,
+                {"agent": self.agent},
+            )
+            if not finished:  # died, timed out, or the caller stopped reading
+                worker.healthy = False
+                reason = "failed"
+            elif worker.served >= self.max_requests:
+                reason = "max_requests"
+            else:
+                reason = ""
+            if reason:
+                threading.Thread(
+                    target=self._replace,
+                    args=(worker, reason),
+                    name=f"{self.agent}-retire",
+                    daemon=True,
+                ).start()
+            else:
+                self._idle.put(worker)
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            elapsed_ms = (time.monotonic() - self._since) * 1000
+            return {
+                "size": self.size,
+                "busy": self._busy,
+                "idle": self._idle.qsize(),
+                "served": self._served,
+                "recycled": self._recycled,
+                "utilization": (
+                    round(self._busy_ms / (self.size * elapsed_ms), 3)
+                    if self._started and elapsed_ms
+                    else 0.0
+                ),
+            }
+
+
+_pools: dict[str, AgentPool] = {}
+_pools_lock = threading.Lock()
+
+
+def pool(agent: str) -> AgentPool:
+    """The process-wide worker pool for sub-agent ``agent``."""
+    if agent not in PACKAGES:
+        raise ValueError(f"unknown agent '{agent}'")
+    with _pools_lock:
+        if agent not in _pools:
+            _pools[agent] = AgentPool(agent, pool_size(agent))
+        return _pools[agent]
+
+
+def start() -> None:
+    """Start every sub-agent's workers now rather than on first delegation."""
+    for agent in PACKAGES:
+        pool(agent).start()
+
+
+def stats() -> dict[str, dict[str, float]]:
+    """Per-agent pool size, busy and idle workers, delegations served, recycles
+    and utilisation since the pool started."""
+    with _pools_lock:
+        pools = dict(_pools)
+    return {agent: p.stats() for agent, p in pools.items()}
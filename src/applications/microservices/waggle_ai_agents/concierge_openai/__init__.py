@@ -1,5 +1,5 @@
 """Concierge sub-agent (OpenAI Agents SDK on Bedrock gpt-oss)."""
 
-from waggle_ai_agents.concierge_openai.agent import run
+from waggle_ai_agents.concierge_openai.agent import run, stream_run
 
-__all__ = ["run"]
+__all__ = ["run", "stream_run"]
@@ -2,12 +2,22 @@
 
 from __future__ import annotations
 
-import json
+import asyncio
+import itertools
 
-from agents import Agent, Runner, function_tool, set_tracing_disabled
+import litellm
+from agents import Agent, ModelSettings, Runner, function_tool, set_tracing_disabled
 from agents.extensions.models.litellm_model import LitellmModel
+from openai.types.responses import ResponseTextDeltaEvent
 
-from waggle_ai_agents.common import models, petstore
+from waggle_ai_agents.common import (
+    instrumentation,
+    model_gate,
+    models,
+    petstore,
+    prefetch,
+    response_cache,
+)
 from waggle_ai_agents.common.asyncrun import run_coro_sync
 
 # No OpenAI platform account here — disable the SDK's hosted tracing exporter.
@@ -20,23 +30,88 @@ foods are available. For specific diet recommendations, ordering, or adoptions,
 tell the customer you'll hand them to a specialist (the orchestrator will route)."""
 
 
+_FOOD_FIELDS = ("name", "pet_type", "food_type", "price")
+
+
 @function_tool
-def lookup_foods() -> str:
-    """List the available pet foods from the catalog. Returns JSON."""
-    return json.dumps(petstore.list_foods())
+@instrumentation.traced_tool("concierge")
+def lookup_foods(pet_type: str = "") -> str:
+    """List the available pet foods from the catalog, optionally only those for
+    `pet_type` (puppy | kitten | bunny). Returns JSON."""
+    return petstore.foods_view(_FOOD_FIELDS, pet_type or None)
+
+
+class _GatedLitellmModel(LitellmModel):
+    """LitellmModel whose Bedrock calls go through the shared per-model gate and
+    back off with jitter when throttled (LiteLLM never sees the boto3 events)."""
 
+    async def _fetch_response(self, *args, **kwargs):  # noqa: ANN002,ANN003,ANN202
+        gate = model_gate.gate(models.model_id("concierge"))
+        for attempt in itertools.count(1):
+            await asyncio.to_thread(gate.acquire, "concierge")
+            try:
+                response = await super()._fetch_response(*args, **kwargs)
+            except (litellm.RateLimitError, litellm.ServiceUnavailableError):
+                gate.release("concierge", throttled=True)
+                if attempt > model_gate.RETRIES:
+                    raise
+                await asyncio.sleep(model_gate.backoff(attempt))
+                continue
+            except BaseException:
+                gate.release("concierge")
+                raise
+            gate.release("concierge")
+            return response
+
+
+instrumentation.register_litellm()
+_cache_points = models.litellm_cache_points("concierge")
 
 # LiteLLM bedrock provider -> SigV4 with the standard AWS credential chain.
 _agent = Agent(
     name="Waggle Concierge",
     instructions=CONCIERGE_PROMPT,
-    model=LitellmModel(model=models.litellm_model("concierge")),
+    model=_GatedLitellmModel(model=models.litellm_model("concierge")),
+    model_settings=ModelSettings(
+        extra_args=(
+            {"cache_control_injection_points": _cache_points} if _cache_points else None
+        ),
+    ),
     tools=[lookup_foods],
 )
 
 
+@instrumentation.traced_run("concierge")
 def run(query: str, user_id: str | None = None, session_id: str | None = None) -> str:
     """Answer a general pet question and return plain text."""
+    cached = response_cache.lookup("concierge", query, user_id)
+    if cached is not None:
+        return cached
     message = query if not user_id else f"[userId={user_id}] {query}"
-    result = run_coro_sync(Runner.run(_agent, message))
+    with prefetch.turn("concierge", query):
+        result = run_coro_sync(Runner.run(_agent, message))
+    response_cache.store("concierge", query, user_id, result.final_output)
     return result.final_output
+
+
+@instrumentation.traced_stream("concierge")
+async def stream_run(
+    query: str,
+    user_id: str | None = None,
+    session_id: str | None = None,
+):
+    """Stream the answer via ``Runner.run_streamed`` text deltas (async generator)."""
+    cached = response_cache.lookup("concierge", query, user_id)
+    if cached is not None:
+        yield cached
+        return
+    message = query if not user_id else f"[userId={user_id}] {query}"
+    with prefetch.turn("concierge", query):
+        result = Runner.run_streamed(_agent, message)
+        async for event in result.stream_events():
+            if event.type == "raw_response_event" and isinstance(
+                event.data,
+                ResponseTextDeltaEvent,
+            ):
+                yield event.data.delta
+    response_cache.store("concierge", query, user_id, result.final_output)
@@ -1,9 +1,9 @@
 """AgentCore Runtime entrypoint for the Concierge agent (OpenAI Agents SDK)."""
 
-from waggle_ai_agents.common.agentcore_server import build_app
-from waggle_ai_agents.concierge_openai import run
+from waggle_ai_agents.common.agentcore_server import build_streaming_app
+from waggle_ai_agents.concierge_openai import stream_run
 
-app = build_app(run)
+app = build_streaming_app(stream_run, agent="concierge")
 
 if __name__ == "__main__":
     app.run()
@@ -1,5 +1,5 @@
 """Nutrition sub-agent (LangGraph)."""
 
-from waggle_ai_agents.nutrition_langgraph.agent import run
+from waggle_ai_agents.nutrition_langgraph.agent import run, stream_run
 
-__all__ = ["run"]
+__all__ = ["run", "stream_run"]
@@ -5,11 +5,21 @@ from __future__ import annotations
 import json
 
 from langchain_aws import ChatBedrockConverse
+from langchain_core.messages import AIMessageChunk, SystemMessage
 from langchain_core.tools import tool
 from langgraph.prebuilt import create_react_agent
 
-from waggle_ai_agents.common import config, models, petstore
-from waggle_ai_agents.rag.retrieval import retrieve
+from waggle_ai_agents.common import (
+    config,
+    fallback,
+    instrumentation,
+    model_gate,
+    models,
+    petstore,
+    prefetch,
+    response_cache,
+)
+from waggle_ai_agents.rag.retrieval import retrieve_many
 
 NUTRITION_PROMPT = """You are the Nutrition specialist for Waggle, the PetStore assistant.
 Your job: recommend the best foods for a specific pet, grounded in evidence.
@@ -18,7 +28,8 @@ Process:
 1. Use `get_pet_profile` to fetch the pet's characteristics (type, color, id).
 2. Use `retrieve_nutrition_guidance` to pull relevant nutrition guidance
    (life stage, breed size, health conditions like sensitive stomach/allergies).
-3. Use `get_available_foods` to see the catalog.
+3. Use `get_available_foods` to see the catalog, passing the pet's type (and a
+   price range if the customer gave a budget).
 4. Match foods to the pet using the retrieved guidance. Return 2-3 concrete
    recommendations, each with a short reason grounded in the guidance, and cite
    the food name/id. Show each recommended food's photo as markdown
@@ -29,27 +40,61 @@ Be precise and factual. Prefer the retrieved guidance over guesses; if guidance
 is missing, say so. If you lack pet details, say what you'd need."""
 
 
+# Fields each tool passes to the model (see petstore.foods_view / pets_view).
+_PET_FIELDS = ("petid", "pettype", "petcolor")
+_FOOD_FIELDS = (
+    "id",
+    "name",
+    "pet_type",
+    "food_type",
+    "price",
+    "nutritional_info",
+    "ingredients",
+    "feeding_guidelines",
+    "image_url",
+)
+
+
 @tool
+@instrumentation.traced_tool("nutrition")
 def get_pet_profile(pettype: str = "", petcolor: str = "", petid: str = "") -> str:
     """Look up pet(s) from the pet-search service by type, color, and/or id.
     Valid pettype: puppy | kitten | bunny (say kitten for a cat, puppy for a dog).
     Valid petcolor: black | brown | white. All args optional; pass what you know."""
-    return json.dumps(
-        petstore.search_pets(pettype or None, petcolor or None, petid or None),
+    return petstore.pets_view(
+        _PET_FIELDS, pettype or None, petcolor or None, petid or None
     )
 
 
 @tool
-def get_available_foods() -> str:
-    """List every available pet food from the catalog. Returns JSON."""
-    return json.dumps(petstore.list_foods())
+@instrumentation.traced_tool("nutrition")
+def get_available_foods(
+    pet_type: str = "",
+    min_price: float = 0,
+    max_price: float = 0,
+) -> str:
+    """List available pet foods from the catalog, optionally only those for
+    `pet_type` (puppy | kitten | bunny) and within a price range (0 = no bound).
+    Returns JSON; `more_available` means more matches exist, so narrow the filters."""
+    return petstore.foods_view(
+        _FOOD_FIELDS, pet_type or None, min_price or None, max_price or None
+    )
 
 
 @tool
+@instrumentation.traced_tool("nutrition")
 def retrieve_nutrition_guidance(query: str) -> str:
     """Search the pet-nutrition knowledge base for guidance relevant to `query`
-    (life stage, breed size, health conditions, diet types). Returns cited passages."""
-    hits = retrieve(query, k=4)
+    (life stage, breed size, health conditions, diet types). To cover several
+    topics in one call, separate them with ';' (e.g. "kitten life stage; sensitive
+    stomach"). Returns cited passages."""
+    topics = [t.strip() for t in query.split(";") if t.strip()] or [query]
+    hits, seen = [], set()
+    for batch in retrieve_many(topics, k=4):
+        for h in batch:
+            if (h["source"], h["text"]) not in seen:
+                seen.add((h["source"], h["text"]))
+                hits.append(h)
     if not hits:
         return json.dumps(
             {"note": "no nutrition KB configured or no matching guidance"},
@@ -68,16 +113,88 @@ if config.guardrail_id():  # apply the Bedrock Guardrail when configured
         "guardrailVersion": config.guardrail_version(),
     }
 _llm = ChatBedrockConverse(**_llm_kwargs)
+fallback.attach(model_gate.attach(_llm.client, "nutrition"), "nutrition")
+
+# A cache point after the system prompt caches it together with the tool schemas before it.
+_prompt = NUTRITION_PROMPT
+if models.prompt_caching("nutrition"):
+    _prompt = SystemMessage(
+        content=[
+            {"type": "text", "text": NUTRITION_PROMPT},
+            ChatBedrockConverse.create_cache_point(),
+        ],
+    )
 
 _graph = create_react_agent(
     _llm,
     tools=[get_pet_profile, retrieve_nutrition_guidance, get_available_foods],
-    prompt=NUTRITION_PROMPT,
+    prompt=_prompt,
 )
 
 
+_callbacks = [instrumentation.langchain_callbacks("nutrition")]
+
+
+@instrumentation.traced_run("nutrition")
 def run(query: str, user_id: str | None = None, session_id: str | None = None) -> str:
     """Answer a nutrition/food-matching question and return plain text."""
+    cached = response_cache.lookup("nutrition", query, user_id)
+    if cached is not None:
+        return cached
+    message = query if not user_id else f"[userId={user_id}] {query}"
+    with prefetch.turn("nutrition", query):
+        result = _graph.invoke(
+            {"messages": [("user", message)]},
+            config={"callbacks": _callbacks},
+        )
+    answer = result["messages"][-1].content
+    response_cache.store("nutrition", query, user_id, answer)
+    return answer
+
+
+def _text(content: str | list) -> str:
+    """Text of a message chunk (Converse chunks carry a list of typed blocks)."""
+    if isinstance(content, str):
+        return content
+    return "".join(
+        block.get("text", "")
+        for block in content
+        if isinstance(block, dict) and block.get("type") == "text"
+    )
+
+
+@instrumentation.traced_stream("nutrition")
+async def stream_run(
+    query: str,
+    user_id: str | None = None,
+    session_id: str | None = None,
+):
+    """Stream the answer token by token (async generator); tools still run whole."""
+    cached = response_cache.lookup("nutrition", query, user_id)
+    if cached is not None:
+        yield cached
+        return
     message = query if not user_id else f"[userId={user_id}] {query}"
-    result = _graph.invoke({"messages": [("user", message)]})
-    return result["messages"][-1].content
+    # The cached answer is the final message only, as in run(), not any text
+    # the model streamed ahead of its tool calls.
+    by_message: dict[str, list[str]] = {}
+    last = ""
+    with prefetch.turn("nutrition", query):
+        async for chunk, meta in _graph.astream(
+            {"messages": [("user", message)]},
+            config={"callbacks": _callbacks},
+            stream_mode="messages",
+        ):
+            if (
+                not isinstance(chunk, AIMessageChunk)
+                or meta.get("langgraph_node") != "agent"
+            ):
+                continue
+            text = _text(chunk.content)
+            if text:
+                last = chunk.id or ""
+                by_message.setdefault(last, []).append(text)
+                yield text
+    answer = "".join(by_message.get(last, []))
+    if answer:
+        response_cache.store("nutrition", query, user_id, answer)
@@ -1,9 +1,9 @@
 """AgentCore Runtime entrypoint for the Nutrition agent (LangGraph)."""
 
-from waggle_ai_agents.common.agentcore_server import build_app
-from waggle_ai_agents.nutrition_langgraph import run
+from waggle_ai_agents.common.agentcore_server import build_streaming_app
+from waggle_ai_agents.nutrition_langgraph import stream_run
 
-app = build_app(run)
+app = build_streaming_app(stream_run, agent="nutrition")
 
 if __name__ == "__main__":
     app.run()
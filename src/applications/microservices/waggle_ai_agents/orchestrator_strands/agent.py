@@ -2,15 +2,34 @@
 
 from __future__ import annotations
 
+import asyncio
+import time
 from contextvars import ContextVar
 
 from strands import Agent, tool
 from strands.models import BedrockModel
 
-from waggle_ai_agents.common import config, models
-from waggle_ai_agents.orchestrator_strands.delegate import delegate
+from waggle_ai_agents.common import (
+    config,
+    fallback,
+    instrumentation,
+    model_gate,
+    models,
+    turn_memo,
+    usage,
+)
+from waggle_ai_agents.orchestrator_strands import commands
+from waggle_ai_agents.orchestrator_strands.delegate import delegate, delegate_stream
+from waggle_ai_agents.orchestrator_strands.router import FastRouter
+
+try:  # strands >= 1.2x; older releases only know cache_prompt / cache_tools
+    from strands.models.model import CacheConfig
+except ImportError:
+    CacheConfig = None
 
 _current_user: ContextVar[str | None] = ContextVar("current_user", default=None)
+# Milliseconds spent inside sub-agents this turn, so the router can tell LLM overhead apart.
+_delegated_ms: ContextVar[list[float] | None] = ContextVar("delegated_ms", default=None)
 
 ORCHESTRATOR_PROMPT = """You are the orchestrator for Waggle, the PetStore assistant.
 You do not answer directly; you route each user request to exactly one specialist tool:
@@ -30,32 +49,46 @@ the user clicked), and keep any markdown image links `![alt](url)` the specialis
 returns intact in your reply — the chat UI renders those as clickable photos."""
 
 
+def _timed_delegate(agent: str, query: str) -> str:
+    start = time.perf_counter()
+    try:
+        return delegate(agent, query, user_id=_current_user.get())
+    finally:
+        spent = _delegated_ms.get()
+        if spent is not None:
+            spent.append((time.perf_counter() - start) * 1000)
+
+
 @tool
+@instrumentation.traced_tool("orchestrator")
 def nutrition_advisor(query: str) -> str:
     """Delegate to the Nutrition specialist (LangGraph) for pet diet analysis
     and food recommendations. Input: the user's nutrition question."""
-    return delegate("nutrition", query, user_id=_current_user.get())
+    return _timed_delegate("nutrition", query)
 
 
 @tool
+@instrumentation.traced_tool("orchestrator")
 def food_ordering(query: str) -> str:
     """Delegate to the Ordering clerk (CrewAI) to add food to a cart, review the
     cart, and check out / place a food order."""
-    return delegate("ordering", query, user_id=_current_user.get())
+    return _timed_delegate("ordering", query)
 
 
 @tool
+@instrumentation.traced_tool("orchestrator")
 def adoption(query: str) -> str:
     """Delegate to the Adoption specialist (LlamaIndex) to browse pets available
     for adoption or complete an adoption."""
-    return delegate("adoption", query, user_id=_current_user.get())
+    return _timed_delegate("adoption", query)
 
 
 @tool
+@instrumentation.traced_tool("orchestrator")
 def concierge_chat(query: str) -> str:
     """Delegate to the Concierge (OpenAI Agents SDK) for general, conversational
     pet questions and small talk."""
-    return delegate("concierge", query, user_id=_current_user.get())
+    return _timed_delegate("concierge", query)
 
 
 _model_kwargs: dict = {
@@ -65,33 +98,73 @@ _model_kwargs: dict = {
 if config.guardrail_id():  # apply the Bedrock Guardrail when configured (SSM/env)
     _model_kwargs["guardrail_id"] = config.guardrail_id()
     _model_kwargs["guardrail_version"] = config.guardrail_version()
+if models.prompt_caching("orchestrator"):  # system prompt + tool specs are static
+    if CacheConfig is not None:
+        _model_kwargs["cache_config"] = CacheConfig(strategy="auto", tools_ttl=True)
+    else:
+        _model_kwargs["cache_prompt"] = "default"
+        _model_kwargs["cache_tools"] = "default"
 _model = BedrockModel(**_model_kwargs)
+fallback.attach(model_gate.attach(_model.client, "orchestrator"), "orchestrator")
 
 _orchestrator = Agent(
     model=_model,
     system_prompt=ORCHESTRATOR_PROMPT,
     tools=[nutrition_advisor, food_ordering, adoption, concierge_chat],
     callback_handler=None,
+    hooks=[instrumentation.StrandsHooks("orchestrator")],
+)
+
+_router = FastRouter(
+    {
+        "nutrition": nutrition_advisor.tool_spec["description"],
+        "ordering": food_ordering.tool_spec["description"],
+        "adoption": adoption.tool_spec["description"],
+        "concierge": concierge_chat.tool_spec["description"],
+    },
 )
 
 
+@instrumentation.traced_run("orchestrator")
 def run(query: str, user_id: str | None = None, session_id: str | None = None) -> str:
     """Route a user message through the orchestrator and return plain text."""
     from waggle_ai_agents.common import memory
 
+    reply = commands.execute(query, user_id)
+    if reply is not None:  # a UI cart/adoption command, done without any LLM call
+        memory.record_turn(user_id, session_id, query, reply)
+        return reply
+
+    route = _router.route(query)
+    if route:  # unambiguous intent: straight to the specialist, no routing LLM call
+        answer = delegate(route.agent, query, user_id=user_id)
+        memory.record_turn(user_id, session_id, query, answer)
+        return answer
+
     recalled = memory.recall(user_id, query, session_id=session_id)
     prompt = f"{recalled}\n\n---\nCurrent user message: {query}" if recalled else query
 
     token = _current_user.set(user_id)
+    spent = _delegated_ms.set([])
+    start = time.perf_counter()
     try:
-        answer = str(_orchestrator(prompt))
+        with turn_memo.turn():  # sub-agents delegated to in this turn share reads
+            result = _orchestrator(prompt)
+        answer = str(result)
+        usage.record_strands("orchestrator", result)
+        _router.record_llm_turn(
+            (time.perf_counter() - start) * 1000,
+            sum(_delegated_ms.get() or ()),
+        )
     finally:
+        _delegated_ms.reset(spent)
         _current_user.reset(token)
 
     memory.record_turn(user_id, session_id, query, answer)
     return answer
 
 
+@instrumentation.traced_stream("orchestrator")
 async def stream_run(
     query: str,
     user_id: str | None = None,
@@ -100,18 +173,43 @@ async def stream_run(
     """Stream the orchestrator's final answer as text chunks (async generator)."""
     from waggle_ai_agents.common import memory
 
+    reply = await asyncio.to_thread(commands.execute, query, user_id)
+    if reply is not None:
+        yield reply
+        memory.record_turn(user_id, session_id, query, reply)
+        return
+
+    route = _router.route(query)
+    if route:
+        chunks: list[str] = []
+        async for chunk in delegate_stream(route.agent, query, user_id):
+            chunks.append(chunk)
+            yield chunk
+        memory.record_turn(user_id, session_id, query, "".join(chunks))
+        return
+
     recalled = memory.recall(user_id, query, session_id=session_id)
     prompt = f"{recalled}\n\n---\nCurrent user message: {query}" if recalled else query
 
     token = _current_user.set(user_id)
+    spent = _delegated_ms.set([])
+    start = time.perf_counter()
     parts: list[str] = []
     try:
-        async for event in _orchestrator.stream_async(prompt):
-            text = event.get("data") if isinstance(event, dict) else None
-            if text:
-                parts.append(text)
-                yield text
+        with turn_memo.turn():  # sub-agents delegated to in this turn share reads
+            async for event in _orchestrator.stream_async(prompt):
+                if isinstance(event, dict) and "result" in event:
+                    usage.record_strands("orchestrator", event["result"])
+                text = event.get("data") if isinstance(event, dict) else None
+                if text:
+                    parts.append(text)
+                    yield text
+        _router.record_llm_turn(
+            (time.perf_counter() - start) * 1000,
+            sum(_delegated_ms.get() or ()),
+        )
     finally:
+        _delegated_ms.reset(spent)
         _current_user.reset(token)
 
     memory.record_turn(user_id, session_id, query, "".join(parts))
@@ -0,0 +1,248 @@
+"""Structured fast path — runs the chat UI's cart and adoption commands without an LLM.
+
+Runs ahead of the fast router. A message that is exactly one of these commands
+(the phrasings the UI sends on clicks, plus the obvious typed forms) is parsed,
+its food or pet is looked up exactly by id, photo URL or name (``resolver``), and
+the petstore call is made directly, with a templated confirmation as the answer:
+
+- ``add [N [of|x]] (food <id> | "<name>" | the food in this photo) to my cart[: <url>]``
+- ``I want to buy "<name>". Please add it to my cart and check out.`` (or the photo)
+- ``show my cart`` / ``view my cart``
+- ``adopt pet <id>[, the <type>]`` / ``I would like to adopt the pet in this photo: <url>``
+  changes nothing yet: it states the pet's id, type and fee and asks for
+- ``confirm adopt pet <id>``, which completes the adoption
+
+Anything ambiguous returns None and goes to the agents as before: an unknown or
+inexact reference, a pet type that is not the pet's, a pet not available, a
+quantity above COMMANDS_MAX_QUANTITY, an unexpected cart payload, or no user id.
+A failed petstore call is reported, not retried. Outcomes count as
+``waggle.commands.requests`` (by command and outcome: done, confirm, failed,
+fallback) and their latency as ``waggle.commands.latency``. COMMANDS=false turns
+it off.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import time
+from collections.abc import Callable
+from typing import Any
+
+from waggle_ai_agents.common import metrics, petstore, resolver
+
+ENABLED = os.getenv("COMMANDS", "true").lower() == "true"
+MAX_QUANTITY = int(os.getenv("COMMANDS_MAX_QUANTITY", "20"))
+
+_URL = r"https?://\S+"
+_QUANTITY = r"(?:(?P<quantity>\d+) (?:of |x )?)?"
+_FOOD = r'(?:"(?P<name>[^"]+)"|food (?P<id>[\w-]+)|the food in this photo)'
+_CHECKOUT = r"please add it to my cart and check out"
+
+# (command, pattern) — each must match the WHOLE message, like the router's rules
+_GRAMMAR: list[tuple[str, re.Pattern[str]]] = [
+    (
+        "add_food",
+        re.compile(
+            rf"(?:please )?add {_QUANTITY}{_FOOD} to my cart(?:: (?P<url>{_URL}))?\.?",
+            re.I,
+        ),
+    ),
+    (
+        "buy_food",
+        re.compile(rf'i want to buy "(?P<name>[^"]+)"\. {_CHECKOUT}\.?', re.I),
+    ),
+    (
+        "buy_food",
+        re.compile(
+            rf"i want to buy the food in this photo\. {_CHECKOUT}: (?P<url>{_URL})",
+            re.I,
+        ),
+    ),
+    ("view_cart", re.compile(r"(?:please )?(?:show|view) my cart\.?", re.I)),
+    (
+        "adopt_pet",
+        re.compile(
+            r"(?:i would like to |i'd like to |i want to |please )?adopt pet "
+            r"#?(?P<id>[\w-]+)(?:,? the (?P<type>puppy|kitten|bunny))?\.?",
+            re.I,
+        ),
+    ),
+    (
+        "adopt_pet",
+        re.compile(
+            rf"i would like to adopt the pet in this photo: (?P<url>{_URL})", re.I
+        ),
+    ),
+    (
+        "confirm_adoption",
+        re.compile(
+            r"(?:yes,? )?confirm adopt(?:ion of)? pet #?(?P<id>[\w-]+)\.?", re.I
+        ),
+    ),
+]
+
+
+def parse(query: str) -> tuple[str, dict[str, str]] | None:
+    """(command, its fields) when ``query`` is exactly one command, else None."""
+    for command, pattern in _GRAMMAR:
+        if match := pattern.fullmatch(query.strip()):
+            return command, {k: v for k, v in match.groupdict().items() if v}
+    return None
+
+
+def _error(result: Any) -> str | None:
+    return result["error"] if isinstance(result, dict) and "error" in result else None
+
+
+def _food(fields: dict[str, str]) -> dict | None:
+    reference = fields.get("id") or fields.get("name") or fields.get("url")
+    food = resolver.food(reference) if reference else None
+    if food is None or food.get("availability_status", "in_stock") != "in_stock":
+        return None
+    return food
+
+
+def _describe(food: dict) -> str:
+    return f"**{food.get('name', food['id'])}** (${food.get('price', '?')})"
+
+
+def _photo(food: dict) -> str:
+    # the chat UI renders markdown images as clickable photos
+    if not food.get("image_url"):
+        return ""
+    return f"\n\n![{food.get('name', food['id'])}]({food['image_url']})"
+
+
+def _add_food(fields: dict[str, str], user_id: str) -> tuple[str, str] | None:
+    food = _food(fields)
+    quantity = int(fields.get("quantity", "1"))
+    if food is None or not 1 <= quantity <= MAX_QUANTITY:
+        return None
+    if error := _error(petstore.add_to_cart(user_id, food["id"], quantity)):
+        return "failed", f"Sorry, I couldn't add that to your cart: {error}"
+    return "done", f"Added {quantity} x {_describe(food)} to your cart.{_photo(food)}"
+
+
+def _buy_food(fields: dict[str, str], user_id: str) -> tuple[str, str] | None:
+    food = _food(fields)
+    if food is None:
+        return None
+    if error := _error(petstore.add_to_cart(user_id, food["id"], 1)):
+        return "failed", f"Sorry, I couldn't add that to your cart: {error}"
+    order = petstore.checkout(user_id)
+    if error := _error(order):
+        return (
+            "failed",
+            f"Added {_describe(food)} to your cart, but checkout failed: {error}",
+        )
+    placed = f"Added {_describe(food)} to your cart and placed your order"
+    if isinstance(order, dict) and order.get("order_id"):
+        placed += f" (order {order['order_id']})"
+    if isinstance(order, dict) and order.get("total_amount"):
+        placed += f", total ${order['total_amount']}"
+    return "done", f"{placed}.{_photo(food)}"
+
+
+def _view_cart(fields: dict[str, str], user_id: str) -> tuple[str, str] | None:
+    cart = petstore.get_cart(user_id)
+    if error := _error(cart):
+        return "failed", f"Sorry, I couldn't load your cart: {error}"
+    items = cart.get("items") if isinstance(cart, dict) else None
+    if not isinstance(items, list):
+        return None
+    if not items:
+        return "done", "Your cart is empty."
+    catalog = resolver.foods_by_id()  # one snapshot for every line
+    lines = []
+    for item in items:
+        if not isinstance(item, dict) or not item.get("food_id"):
+            return None
+        food = catalog.get(str(item["food_id"]).lower(), {})
+        name = food.get("name", item["food_id"])
+        price = f" (${food['price']} each)" if food.get("price") else ""
+        lines.append(f"- {item.get('quantity', 1)} x {name}{price}")
+    if cart.get("total_price"):
+        lines.append(f"\nTotal: ${cart['total_price']}")
+    return "done", "Your cart:\n" + "\n".join(lines)
+
+
+def _pet(fields: dict[str, str]) -> tuple[dict, str] | None:
+    """The one available pet ``fields`` refer to, with its pet type."""
+    matches = resolver.pets(fields.get("id") or fields.get("url", ""))
+    if len(matches) != 1:
+        return None
+    pet = matches[0]
+    pettype = petstore.normalize_pet_type(str(pet.get("pettype", "")))
+    stated = fields.get("type")
+    if pet.get("availability") != "yes" or (
+        stated and petstore.normalize_pet_type(stated) != pettype
+    ):
+        return None
+    return pet, pettype
+
+
+def _pet_photo(pet: dict, pettype: str) -> str:
+    if not pet.get("peturl"):
+        return ""
+    return f"\n\n![{pet['petid']} {pettype}]({pet['peturl']})"
+
+
+def _adopt_pet(fields: dict[str, str], user_id: str) -> tuple[str, str] | None:
+    # adopting cannot be undone from the chat: state the pet and fee, and wait
+    # for an explicit confirmation
+    if (found := _pet(fields)) is None:
+        return None
+    pet, pettype = found
+    color = f"{pet['petcolor']} " if pet.get("petcolor") else ""
+    fee = f" The adoption fee is ${pet['price']}." if pet.get("price") else ""
+    return (
+        "confirm",
+        f"You're about to adopt pet {pet['petid']}, the {color}{pettype}.{fee} "
+        f"To go ahead, reply **confirm adopt pet {pet['petid']}**."
+        f"{_pet_photo(pet, pettype)}",
+    )
+
+
+def _confirm_adoption(fields: dict[str, str], user_id: str) -> tuple[str, str] | None:
+    if (found := _pet(fields)) is None:
+        return None
+    pet, pettype = found
+    result = petstore.complete_adoption(pet["petid"], pettype, user_id)
+    resolver.invalidate_pets()  # the pet's availability just changed
+    if error := _error(result):
+        return "failed", f"Sorry, the adoption of pet {pet['petid']} failed: {error}"
+    color = f"{pet['petcolor']} " if pet.get("petcolor") else ""
+    return (
+        "done",
+        f"Congratulations, you adopted the {color}{pettype}!"
+        f"{_pet_photo(pet, pettype)}\n\nPet ID: {pet['petid']}",
+    )
+
+
+_HANDLERS: dict[str, Callable[[dict[str, str], str], tuple[str, str] | None]] = {
+    "add_food": _add_food,
+    "buy_food": _buy_food,
+    "view_cart": _view_cart,
+    "adopt_pet": _adopt_pet,
+    "confirm_adoption": _confirm_adoption,
+}
+
+
+def execute(query: str, user_id: str | None) -> str | None:
+    """Run ``query`` as a command for ``user_id`` and return the confirmation, or
+    None to hand it to the agents."""
+    parsed = parse(query) if ENABLED and user_id else None
+    if parsed is None:
+        return None
+    command, fields = parsed
+    start = time.perf_counter()
+    done = _HANDLERS[command](fields, user_id)
+    outcome, reply = done if done else ("fallback", None)
+    attrs = {"command": command, "outcome": outcome}
+    metrics.counter("waggle.commands.requests").add(1, attrs)
+    metrics.histogram("waggle.commands.latency").record(
+        (time.perf_counter() - start) * 1000,
+        attrs,
+    )
+    return reply
@@ -1,9 +1,17 @@
-"""Transport for orchestrator -> sub-agent delegation."""
+"""Transport for orchestrator -> sub-agent delegation.
+
+AGENT_TRANSPORT=local runs the sub-agent on the caller's thread, ``pool`` in a warm
+worker process (``common/worker_pool.py``), ``gateway`` in its own AgentCore
+runtime behind the Gateway.
+"""
 
 from __future__ import annotations
 
+import asyncio
 import json
 import os
+import threading
+from collections.abc import AsyncIterator
 
 from waggle_ai_agents.common import config
 
@@ -22,9 +30,60 @@ def delegate(agent: str, query: str, user_id: str | None = None) -> str:
     """Route a delegation to a sub-agent via the configured transport."""
     if TRANSPORT == "gateway":
         return _via_gateway(agent, query, user_id)
+    if TRANSPORT == "pool":
+        return _via_pool(agent, query, user_id)
     return _in_process(agent, query, user_id)
 
 
+async def delegate_stream(
+    agent: str,
+    query: str,
+    user_id: str | None = None,
+) -> AsyncIterator[str]:
+    """Stream a delegation's answer: chunk by chunk from a worker pool, else whole."""
+    if TRANSPORT != "pool":
+        yield await asyncio.to_thread(delegate, agent, query, user_id)
+        return
+    from waggle_ai_agents.common import worker_pool
+
+    loop = asyncio.get_running_loop()
+    chunks: asyncio.Queue[str | Exception | None] = asyncio.Queue()
+    stopped = threading.Event()
+
+    def put(chunk: str | Exception | None) -> None:
+        try:
+            loop.call_soon_threadsafe(chunks.put_nowait, chunk)
+        except RuntimeError:  # the reader's loop is gone
+            pass
+
+    def drive() -> None:
+        # The worker's generator is only ever touched from this thread: closing
+        # it from the reader's side while a next() is running here would raise
+        # "generator already executing" and leave the worker busy for good.
+        answer = worker_pool.pool(agent).stream(query, user_id, streaming=True)
+        try:
+            for chunk in answer:
+                if stopped.is_set():
+                    break
+                put(chunk)
+        except worker_pool.WorkerError as exc:
+            put(json.dumps({"error": f"worker pool call to '{agent}' failed: {exc}"}))
+        except Exception as exc:  # noqa: BLE001 - re-raised on the reader's side
+            put(exc)
+        finally:
+            answer.close()  # a reader that stopped early retires the worker mid-answer
+            put(None)
+
+    loop.run_in_executor(None, drive)
+    try:
+        while (chunk := await chunks.get()) is not None:
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+    finally:
+        stopped.set()  # cancelled or closed early: stop at the next chunk
+
+
 def _in_process(agent: str, query: str, user_id: str | None) -> str:
     # Lazy imports so the gateway-transport orchestrator container never needs sub-agent deps.
     if agent == "nutrition":
@@ -40,6 +99,15 @@ def _in_process(agent: str, query: str, user_id: str | None) -> str:
     return run(query, user_id=user_id)
 
 
+def _via_pool(agent: str, query: str, user_id: str | None) -> str:
+    from waggle_ai_agents.common import worker_pool
+
+    try:
+        return "".join(worker_pool.pool(agent).stream(query, user_id))
+    except worker_pool.WorkerError as exc:
+        return json.dumps({"error": f"worker pool call to '{agent}' failed: {exc}"})
+
+
 def _via_gateway(agent: str, query: str, user_id: str | None) -> str:
     """POST to the Gateway HTTP runtime target, signed with SigV4 (local creds)."""
     gateway = config.gateway_url()
@@ -68,9 +136,21 @@ def _via_gateway(agent: str, query: str, user_id: str | None) -> str:
     try:
         resp = httpx.post(url, content=body, headers=dict(signed.headers), timeout=120)
         resp.raise_for_status()
+        if resp.headers.get("content-type", "").startswith("text/event-stream"):
+            return _join_events(resp.text)  # streaming sub-agent runtimes
         data = resp.json()
     except Exception as exc:  # noqa: BLE001 - surface to the orchestrator
         return json.dumps({"error": f"gateway call to '{agent}' failed: {exc}"})
     if isinstance(data, dict):
         return data.get("output") or data.get("result") or json.dumps(data)
     return str(data)
+
+
+def _join_events(text: str) -> str:
+    """Reassemble an AgentCore SSE body (``data: <json string>`` per chunk)."""
+    parts = []
+    for line in text.splitlines():
+        if line.startswith("data: "):
+            chunk = json.loads(line.removeprefix("data: "))
+            parts.append(chunk if isinstance(chunk, str) else json.dumps(chunk))
+    return "".join(parts)
@@ -0,0 +1,161 @@
+"""Fast-path router — sends unambiguous requests straight to a sub-agent.
+
+Runs ahead of the LLM orchestrator. Pattern rules catch the intents the chat UI
+generates on photo clicks ("I would like to adopt pet 042, the puppy."); an optional
+local embedding classifier scores free text against the tool descriptions. Anything
+not matched with high confidence falls through to the LLM (``route`` returns None).
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+
+from waggle_ai_agents.common import embeddings, metrics
+
+FAST_ROUTER = os.getenv("FAST_ROUTER", "true").lower() == "true"
+EMBEDDING_ROUTER = os.getenv("FAST_ROUTER_EMBEDDINGS", "false").lower() == "true"
+# Embedding route needs the best score above THRESHOLD and ahead of the runner-up by MARGIN.
+EMBEDDING_THRESHOLD = float(os.getenv("FAST_ROUTER_THRESHOLD", "0.45"))
+EMBEDDING_MARGIN = float(os.getenv("FAST_ROUTER_MARGIN", "0.15"))
+
+_URL = r"https?://\S+"
+
+# (rule name, agent, pattern) — each must match the WHOLE message, so anything extra
+# ("adopt pet 042 and recommend food for it") falls through to the LLM.
+_RULES: list[tuple[str, str, re.Pattern[str]]] = [
+    (
+        "adopt_pet",
+        "adoption",
+        re.compile(
+            r"(?:i would like to |i'd like to |i want to |please )?adopt pet [\w-]+"
+            r"(?:,? the (?:puppy|kitten|bunny))?\.?",
+            re.I,
+        ),
+    ),
+    (
+        "adopt_photo",
+        "adoption",
+        re.compile(rf"i would like to adopt the pet in this photo: {_URL}", re.I),
+    ),
+    (
+        "buy_food",
+        "ordering",
+        re.compile(
+            r'i want to buy "[^"]+"\. please add it to my cart and check out\.?',
+            re.I,
+        ),
+    ),
+    (
+        "buy_photo",
+        "ordering",
+        re.compile(
+            rf"i want to buy the food in this photo\. please add it to my cart and check out: {_URL}",
+            re.I,
+        ),
+    ),
+    (
+        "add_food",
+        "ordering",
+        re.compile(
+            rf'(?:please )?add (?:\d+ (?:of |x )?)?(?:"[^"]+"|food [\w-]+|the food in this photo) '
+            rf"to my cart(?:: {_URL})?\.?",
+            re.I,
+        ),
+    ),
+    ("view_cart", "ordering", re.compile(r"(?:show|view) my cart\.?", re.I)),
+]
+
+
+@dataclass(frozen=True)
+class Route:
+    """A fast-path routing decision."""
+
+    agent: str
+    confidence: float
+    rule: str
+
+
+class FastRouter:
+    """Rule + embedding pre-router with bypass and latency-saved accounting."""
+
+    def __init__(self, descriptions: dict[str, str]) -> None:
+        self._prototypes = (
+            {agent: embeddings.embed(text) for agent, text in descriptions.items()}
+            if EMBEDDING_ROUTER
+            else {}
+        )
+        self._lock = threading.Lock()
+        self._total = 0
+        self._fast = 0
+        self._saved_ms = 0.0
+        self._overhead_ms: float | None = None  # EWMA of the LLM's own routing time
+
+    def route(self, query: str) -> Route | None:
+        """Return a confident route for ``query``, or None to use the LLM."""
+        start = time.perf_counter()
+        decision = self._classify(query.strip()) if FAST_ROUTER else None
+        decided_ms = (time.perf_counter() - start) * 1000
+
+        with self._lock:
+            self._total += 1
+            saved = 0.0
+            if decision:
+                self._fast += 1
+                if self._overhead_ms is not None:
+                    saved = max(self._overhead_ms - decided_ms, 0.0)
+                    self._saved_ms += saved
+        path = "fast" if decision else "llm"
+        attrs = {"path": path, "rule": decision.rule if decision else "none"}
+        metrics.counter("waggle.router.requests").add(1, attrs)
+        if decision and saved:
+            metrics.histogram("waggle.router.latency_saved").record(saved, attrs)
+        return decision
+
+    def record_llm_turn(self, total_ms: float, delegated_ms: float) -> None:
+        """Fold an LLM-routed turn's own overhead (total minus sub-agent time) into the EWMA."""
+        overhead = max(total_ms - delegated_ms, 0.0)
+        metrics.histogram("waggle.router.llm_overhead").record(overhead)
+        with self._lock:
+            prev = self._overhead_ms
+            self._overhead_ms = (
+                overhead if prev is None else 0.8 * prev + 0.2 * overhead
+            )
+
+    def stats(self) -> dict:
+        """Bypass ratio and latency saved so far in this process."""
+        with self._lock:
+            return {
+                "requests": self._total,
+                "bypassed": self._fast,
+                "bypass_ratio": self._fast / self._total if self._total else 0.0,
+                "latency_saved_ms": round(self._saved_ms, 1),
+                "llm_overhead_ms": (
+                    round(self._overhead_ms, 1)
+                    if self._overhead_ms is not None
+                    else None
+                ),
+            }
+
+    def _classify(self, query: str) -> Route | None:
+        for rule, agent, pattern in _RULES:
+            if pattern.fullmatch(query):
+                return Route(agent=agent, confidence=1.0, rule=rule)
+        if not self._prototypes:
+            return None
+        vec = embeddings.embed(query)
+        scored = sorted(
+            (
+                (embeddings.cosine(vec, proto), agent)
+                for agent, proto in self._prototypes.items()
+            ),
+            reverse=True,
+        )
+        best, agent = scored[0]
+        runner_up = scored[1][0] if len(scored) > 1 else 0.0
+        if best >= EMBEDDING_THRESHOLD and best - runner_up >= EMBEDDING_MARGIN:
+            return Route(agent=agent, confidence=best, rule="embedding")
+        return None
@@ -3,7 +3,7 @@
 from waggle_ai_agents.common.agentcore_server import build_streaming_app
 from waggle_ai_agents.orchestrator_strands import stream_run
 
-app = build_streaming_app(stream_run)
+app = build_streaming_app(stream_run, agent="orchestrator")
 
 if __name__ == "__main__":
     app.run()
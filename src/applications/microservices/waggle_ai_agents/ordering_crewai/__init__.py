@@ -5,6 +5,6 @@ import os
 # Disable CrewAI telemetry here, before .agent imports crewai; this agent deploys on its own.
 os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
 
-from waggle_ai_agents.ordering_crewai.agent import run  # noqa: E402
+from waggle_ai_agents.ordering_crewai.agent import run, stream_run  # noqa: E402
 
-__all__ = ["run"]
+__all__ = ["run", "stream_run"]
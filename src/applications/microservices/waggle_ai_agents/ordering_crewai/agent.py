@@ -2,58 +2,156 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextvars
+import functools
 import json
+import logging
+import os
+import queue
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
 
 from crewai import LLM, Agent, Crew, Process, Task
+from crewai.agents.parser import AgentFinish
+from crewai.llms.providers.bedrock.completion import BedrockCompletion
 from crewai.tools import tool
 
-from waggle_ai_agents.common import models, petstore
+from waggle_ai_agents.common import (
+    fallback,
+    instrumentation,
+    model_gate,
+    models,
+    petstore,
+    prefetch,
+    resolver,
+)
+
+logger = logging.getLogger(__name__)
+
+_FOOD_FIELDS = ("id", "name", "pet_type", "price", "image_url")
 
 
 @tool("list_available_foods")
-def list_available_foods() -> str:
-    """List every available pet food from the catalog. Each item has its `id`, name,
-    price and `image_url`. ALWAYS use this first to resolve a food name OR a photo
-    URL to a real `food_id` — the cart rejects unknown ids with 404. Returns JSON."""
-    return json.dumps(petstore.list_foods())
+@instrumentation.traced_tool("ordering")
+def list_available_foods(pet_type: str = "") -> str:
+    """List available pet foods from the catalog, optionally only those for
+    `pet_type` (puppy | kitten | bunny), to browse or show them. Each item has its
+    `id`, name, price and `image_url`. To find the food a name or photo URL refers
+    to, use resolve_food instead. Returns JSON; if it reports `more_available`,
+    call again with a pet_type."""
+    return petstore.foods_view(_FOOD_FIELDS, pet_type or None)
+
+
+@tool("resolve_food")
+@instrumentation.traced_tool("ordering")
+def resolve_food(reference: str) -> str:
+    """Find the catalog food a PHOTO URL, food name (typos are fine) or id refers to,
+    with its real `id`. One match in `foods` is that food; several are candidates to
+    ask the customer about; none means no such food. Returns JSON."""
+    return petstore.compact(
+        {
+            "foods": [
+                {f: food[f] for f in _FOOD_FIELDS if f in food}
+                for food in resolver.foods(reference)
+            ],
+        },
+    )
 
 
 @tool("add_food_to_cart")
+@instrumentation.traced_tool("ordering")
 def add_food_to_cart(user_id: str, food_id: str, quantity: int = 1) -> str:
     """Add `quantity` of a food item to `user_id`'s cart. `food_id` MUST be a real id
-    from `list_available_foods` (not a name or a guess), or the cart returns 404.
-    Returns JSON."""
+    from resolve_food or list_available_foods (not a name or a guess), or the cart
+    returns 404. Returns JSON."""
     return json.dumps(petstore.add_to_cart(user_id, food_id, quantity))
 
 
 @tool("view_cart")
+@instrumentation.traced_tool("ordering")
 def view_cart(user_id: str) -> str:
     """Return the current contents of `user_id`'s cart as JSON."""
     return json.dumps(petstore.get_cart(user_id))
 
 
 @tool("checkout_cart")
+@instrumentation.traced_tool("ordering")
 def checkout_cart(user_id: str) -> str:
     """Check out `user_id`'s cart, placing the food order. Returns JSON."""
     return json.dumps(petstore.checkout(user_id))
 
 
+def _bedrock_client(llm: Any) -> Any:
+    """The boto3 client of CrewAI's native Bedrock provider, or None.
+
+    ``_get_sync_client`` is private to the provider, so its presence is checked.
+    """
+    get_client = getattr(llm, "_get_sync_client", None)
+    if not isinstance(llm, BedrockCompletion) or not callable(get_client):
+        return None
+    return get_client()
+
+
 _llm = LLM(model=models.litellm_model("ordering"))
+if (_bedrock := _bedrock_client(_llm)) is not None:
+    fallback.attach(model_gate.attach(_bedrock, "ordering"), "ordering")
+    # CrewAI calls Bedrock itself, not through LiteLLM: report its steps off the client
+    instrumentation.converse_hooks(_bedrock, "ordering")
+    # The backstory and tool schemas never change, so they are worth caching. The
+    # native provider sends no cache points, so they go in on the client.
+    if models.prompt_caching("ordering"):
+        for _operation in ("Converse", "ConverseStream"):
+            _bedrock.meta.events.register(
+                f"before-parameter-build.bedrock-runtime.{_operation}",
+                models.add_cache_points,
+            )
+else:
+    logger.warning(
+        "ordering: %s has no Bedrock client to attach to; model gate, fallback, "
+        "prompt caching and LLM step metrics are off",
+        type(_llm).__name__,
+    )
 
 
-def run(query: str, user_id: str | None = None, session_id: str | None = None) -> str:
-    """Execute a food-ordering request and return plain text."""
+# Idle prebuilt crews kept for reuse; busy crews are never shared between requests.
+CREW_POOL_SIZE = int(os.getenv("ORDERING_CREW_POOL", "4"))
+
+_TASK_DESCRIPTION = (
+    "Customer request: {query}\n"
+    "user_id to act on: {user_id}\n"
+    "Use tools to actually perform the action. Report exactly what happened."
+)
+_UNKNOWN_USER = "UNKNOWN — ask the customer for it before any cart action"
+
+# Where step_callback sends each agent step: set per kickoff by stream_run, unset
+# (steps dropped) for run().
+_steps: contextvars.ContextVar[Callable[[Any], None] | None] = contextvars.ContextVar(
+    "ordering_steps",
+    default=None,
+)
+
+
+def _on_step(step: Any) -> None:
+    sink = _steps.get()
+    if sink is not None:
+        sink(step)
+
+
+def _build_crew() -> Crew:
+    """Build the clerk and its one-task crew; the task is filled in per kickoff."""
     clerk = Agent(
         role="Pet Food Ordering Clerk",
         goal="Add the right foods to the cart and complete checkout accurately.",
         backstory=(
             "You run the PetStore food-ordering desk. You add foods to carts, "
-            "review cart contents, and place orders via checkout. When a customer "
-            "names a food, you FIRST call list_available_foods to find its real "
-            "food_id, then add that id to the cart — you never guess an id, because "
-            "the cart rejects unknown ids. If the customer refers to a food by PHOTO "
-            "URL (they clicked a photo in the chat), call list_available_foods and "
-            "match that URL against each item's image_url to identify the food. "
+            "review cart contents, and place orders via checkout. If the request "
+            "comes with resolved references, use those food ids as given. Otherwise, "
+            "when a customer names a food or refers to one by PHOTO URL (they "
+            "clicked a photo in the chat), you FIRST call resolve_food with that "
+            "name or URL to get its real food_id, then add that id to the cart — you "
+            "never guess an id, because the cart rejects unknown ids. "
             "Checkout places a real order, so state what you are about to buy and its "
             "price, and only check out when the customer asked to buy or confirmed. "
             "When you list foods, show each one as markdown ![name](image_url) so the "
@@ -61,20 +159,94 @@ def run(query: str, user_id: str | None = None, session_id: str | None = None) -
             "surface any errors."
         ),
         llm=_llm,
-        tools=[list_available_foods, add_food_to_cart, view_cart, checkout_cart],
+        tools=[
+            resolve_food,
+            list_available_foods,
+            add_food_to_cart,
+            view_cart,
+            checkout_cart,
+        ],
         verbose=False,
         allow_delegation=False,
     )
 
     task = Task(
-        description=(
-            f"Customer request: {query}\n"
-            f"user_id to act on: {user_id or 'UNKNOWN — ask the customer for it before any cart action'}\n"
-            "Use tools to actually perform the action. Report exactly what happened."
-        ),
+        description=_TASK_DESCRIPTION,
         expected_output="A short confirmation of the ordering action taken and its result.",
         agent=clerk,
     )
 
-    crew = Crew(agents=[clerk], tasks=[task], process=Process.sequential, verbose=False)
-    return str(crew.kickoff())
+    return Crew(
+        agents=[clerk],
+        tasks=[task],
+        process=Process.sequential,
+        verbose=False,
+        step_callback=_on_step,
+    )
+
+
+# kickoff() interpolates inputs into its tasks in place, so each crew serves one
+# request at a time: take an idle one (or build one if all are busy) and return it.
+_idle: queue.LifoQueue[Crew] = queue.LifoQueue(maxsize=CREW_POOL_SIZE)
+_idle.put_nowait(_build_crew())
+
+
+@contextmanager
+def _crew() -> Iterator[Crew]:
+    try:
+        crew = _idle.get_nowait()
+    except queue.Empty:
+        crew = _build_crew()
+    yield crew  # not returned to the pool if the kickoff raised
+    try:
+        _idle.put_nowait(crew)
+    except queue.Full:
+        pass
+
+
+def _kickoff(crew: Crew, query: str, user_id: str | None) -> Any:
+    # photo URLs and quoted names resolved up front save a resolve_food step
+    note = resolver.annotate("ordering", query, _FOOD_FIELDS)
+    return crew.kickoff(
+        inputs={"query": query + note, "user_id": user_id or _UNKNOWN_USER},
+    )
+
+
+@instrumentation.traced_run("ordering")
+def run(query: str, user_id: str | None = None, session_id: str | None = None) -> str:
+    """Execute a food-ordering request and return plain text."""
+    with prefetch.turn("ordering", query), _crew() as crew:
+        return str(_kickoff(crew, query, user_id))
+
+
+@instrumentation.traced_stream("ordering")
+async def stream_run(
+    query: str,
+    user_id: str | None = None,
+    session_id: str | None = None,
+):
+    """Yield the clerk's answer as soon as its final step lands (async generator).
+
+    Tool calls are not streamed: CrewAI's Bedrock provider drops tool use when
+    streaming, so the kickoff runs as in run() on a worker thread and the answer is
+    taken from the AgentFinish step, ahead of the crew's own wrap-up.
+    """
+    loop = asyncio.get_running_loop()
+    steps: asyncio.Queue[Any] = asyncio.Queue()
+    answered = False
+    with prefetch.turn("ordering", query), _crew() as crew:
+        ctx = contextvars.copy_context()
+        ctx.run(
+            _steps.set,
+            lambda step: loop.call_soon_threadsafe(steps.put_nowait, step),
+        )
+        kickoff = functools.partial(_kickoff, crew, query, user_id)
+        done = loop.run_in_executor(None, ctx.run, kickoff)
+        done.add_done_callback(lambda _: steps.put_nowait(None))
+        while (step := await steps.get()) is not None:
+            if isinstance(step, AgentFinish) and not answered:
+                answered = True
+                yield str(step.output)
+        result = await done
+        if not answered:
+            yield str(result)
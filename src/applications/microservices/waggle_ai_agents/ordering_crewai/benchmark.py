@@ -0,0 +1,61 @@
+"""Per-call construction overhead of the ordering crew: build-per-request vs pooled.
+
+Times only what ``run`` does before ``kickoff`` (no model calls, no network):
+building a fresh clerk ``Agent`` + ``Task`` + ``Crew`` as every request used to,
+against checking a prebuilt crew out of the pool and back in.
+
+    python -m waggle_ai_agents.ordering_crewai.benchmark [--n 50]
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from collections.abc import Callable
+
+from waggle_ai_agents.ordering_crewai import agent
+
+
+def _time(fn: Callable[[], object], n: int) -> list[float]:
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _pooled() -> None:
+    with agent._crew():
+        pass
+
+
+def evaluate(n: int = 50) -> dict[str, dict[str, float]]:
+    """Return mean/p50/max milliseconds per mode over ``n`` iterations."""
+    report = {}
+    for mode, fn in {"build": agent._build_crew, "pooled": _pooled}.items():
+        samples = _time(fn, n)
+        report[mode] = {
+            "mean_ms": statistics.fmean(samples),
+            "p50_ms": statistics.median(samples),
+            "max_ms": max(samples),
+        }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n", type=int, default=50, help="iterations per mode")
+    args = parser.parse_args()
+
+    print(f"{'mode':<7} {'mean ms':>8} {'p50 ms':>8} {'max ms':>8}")
+    for mode, row in evaluate(args.n).items():
+        print(
+            f"{mode:<7} {row['mean_ms']:>8.3f} {row['p50_ms']:>8.3f} "
+            f"{row['max_ms']:>8.3f}",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,9 @@
 """AgentCore Runtime entrypoint for the Ordering agent (CrewAI)."""
 
-from waggle_ai_agents.common.agentcore_server import build_app
-from waggle_ai_agents.ordering_crewai import run
+from waggle_ai_agents.common.agentcore_server import build_streaming_app
+from waggle_ai_agents.ordering_crewai import stream_run
 
-app = build_app(run)
+app = build_streaming_app(stream_run, agent="ordering")
 
 if __name__ == "__main__":
     app.run()
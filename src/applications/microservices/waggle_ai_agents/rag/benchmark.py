@@ -0,0 +1,93 @@
+"""Offline relevance benchmark for the nutrition retrieval modes.
+
+Scores keyword (BM25), vector (local index) and hybrid (RRF) retrieval against a
+small labelled query set, with no network. A turn whose expected document is not in
+the top k is counted as costing the agent one more retrieval round-trip, so
+``calls/turn`` estimates how many ``retrieve_nutrition_guidance`` steps each mode
+needs per nutrition turn.
+
+    python -m waggle_ai_agents.rag.benchmark [--k 4]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from collections.abc import Callable
+from typing import Any
+
+from waggle_ai_agents.rag import hybrid, local_index
+
+# (query, the knowledge document that should answer it)
+LABELLED_QUERIES: list[tuple[str, str]] = [
+    ("renal diet for a senior cat", "kidney-renal-support.md"),
+    ("my dog has CKD, what should he eat", "kidney-renal-support.md"),
+    ("low phosphorus food", "kidney-renal-support.md"),
+    ("omega-3 for a dull coat", "skin-coat-and-omega.md"),
+    ("my puppy has dandruff and sheds a lot", "skin-coat-and-omega.md"),
+    ("taurine for kittens", "cat-life-stages.md"),
+    ("how much protein does an adult cat need", "cat-life-stages.md"),
+    ("growing puppy calcium and phosphorus", "dog-life-stages.md"),
+    ("food for a Great Dane puppy", "breed-size-nutrition.md"),
+    ("small breed dog calorie needs", "breed-size-nutrition.md"),
+    ("chicken allergy in dogs", "food-allergies.md"),
+    ("elimination diet with a novel protein", "food-allergies.md"),
+    ("glucosamine for arthritis", "joint-and-mobility.md"),
+    ("senior dog stiff hips", "joint-and-mobility.md"),
+    ("vomiting and loose stools after switching food", "sensitive-stomach.md"),
+    ("easily digestible food for an upset tummy", "sensitive-stomach.md"),
+    ("my cat is obese", "weight-management.md"),
+    ("how to help an overweight dog lose weight", "weight-management.md"),
+    ("kibble or canned food", "wet-vs-dry-and-hydration.md"),
+    ("my cat doesn't drink enough water", "wet-vs-dry-and-hydration.md"),
+]
+
+
+def _modes() -> dict[str, Callable[[str, int], list[dict[str, Any]]]]:
+    return {
+        "keyword": lambda q, k: hybrid.keyword_index().search(q, k),
+        "vector": local_index.search,
+        "hybrid": lambda q, k: hybrid.fuse(q, local_index.search(q, k * 2), k),
+    }
+
+
+def evaluate(k: int = 4) -> dict[str, dict[str, float]]:
+    """Return hit@k, MRR, estimated calls/turn and mean latency per mode."""
+    report = {}
+    for mode, search in _modes().items():
+        hits, rr, elapsed = 0, 0.0, 0.0
+        for query, expected in LABELLED_QUERIES:
+            start = time.perf_counter()
+            results = search(query, k)
+            elapsed += time.perf_counter() - start
+            docs = [r["source"].rsplit("/", 1)[-1] for r in results]
+            if expected in docs:
+                hits += 1
+                rr += 1.0 / (docs.index(expected) + 1)
+        n = len(LABELLED_QUERIES)
+        report[mode] = {
+            "hit_at_k": hits / n,
+            "mrr": rr / n,
+            "calls_per_turn": 1 + (n - hits) / n,
+            "mean_ms": elapsed / n * 1000,
+        }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--k", type=int, default=4, help="passages per retrieval")
+    args = parser.parse_args()
+
+    local_index.load()  # build/mmap once, outside the timings
+    hybrid.keyword_index()
+    print(f"{'mode':<8} {'hit@k':>6} {'MRR':>6} {'calls/turn':>11} {'ms':>7}")
+    for mode, row in evaluate(args.k).items():
+        print(
+            f"{mode:<8} {row['hit_at_k']:>6.2f} {row['mrr']:>6.2f} "
+            f"{row['calls_per_turn']:>11.2f} {row['mean_ms']:>7.3f}",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Hybrid retrieval: BM25 keyword search fused with vector results (RRF), optional re-rank.
+
+Vector search alone can miss exact condition terms ("renal", "omega"), which costs
+the nutrition agent another retrieval step. A small in-memory BM25 inverted index
+over the same chunks as ``local_index`` catches those; reciprocal-rank fusion
+merges the two rankings without having to calibrate their scores. Setting
+RETRIEVAL_RERANK_MODEL_ID re-orders the fused candidates with a Bedrock reranker.
+It is opt-in (RETRIEVAL_BACKEND=hybrid): on the labelled queries in
+``rag/benchmark.py`` BM25 alone still ranks better.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Any
+
+from waggle_ai_agents.common import config
+
+RRF_K = int(os.getenv("RETRIEVAL_RRF_K", "60"))
+RERANK_MODEL_ID = os.getenv("RETRIEVAL_RERANK_MODEL_ID", "")  # e.g. amazon.rerank-v1:0
+RERANK_CANDIDATES = int(os.getenv("RETRIEVAL_RERANK_CANDIDATES", "10"))
+
+_WORD = re.compile(r"[a-z0-9]+")
+_STOP = frozenset(
+    "a an and are as at be by can do does for from how i in is it my of on or should "
+    "the their this to what when which with you your".split(),
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens, stopwords dropped, naive plural stemming."""
+    tokens = []
+    for word in _WORD.findall(text.lower()):
+        if word in _STOP:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of ``{text, source}`` chunks."""
+
+    def __init__(self, chunks: list[dict[str, str]], k1: float = 1.5, b: float = 0.75):
+        self.chunks = chunks
+        self.k1, self.b = k1, b
+        self._postings: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        self._lengths = []
+        for i, chunk in enumerate(chunks):
+            terms = Counter(tokenize(chunk["text"]))
+            self._lengths.append(sum(terms.values()))
+            for term, tf in terms.items():
+                self._postings[term].append((i, tf))
+        self._avg_len = sum(self._lengths) / len(chunks) if chunks else 0.0
+
+    def search(self, query: str, k: int = 4) -> list[dict[str, Any]]:
+        n = len(self.chunks)
+        scores: dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for i, tf in postings:
+                norm = 1 - self.b + self.b * self._lengths[i] / self._avg_len
+                scores[i] += idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+        top = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:k]
+        return [{**self.chunks[i], "score": score} for i, score in top]
+
+
+_lock = threading.Lock()
+_bm25: BM25Index | None = None
+_reranker = None
+
+
+def keyword_index() -> BM25Index:
+    """The process-wide BM25 index over ``local_index.chunk_corpus()``."""
+    global _bm25
+    with _lock:
+        if _bm25 is None:
+            from waggle_ai_agents.rag import local_index
+
+            _bm25 = BM25Index(local_index.chunk_corpus())
+        return _bm25
+
+
+def passage_key(text: str) -> str:
+    """Content hash of a passage's case- and whitespace-normalised text."""
+    return hashlib.sha1(" ".join(text.lower().split()).encode()).hexdigest()
+
+
+def rrf(rankings: list[list[dict[str, Any]]], k: int = RRF_K) -> list[dict[str, Any]]:
+    """Reciprocal-rank fusion. The same passage from two backends (a KB ``s3://``
+    chunk and its ``local://`` BM25 twin) is merged on ``passage_key`` and keeps the
+    source and fields of its best-ranked hit."""
+    fused: dict[str, tuple[int, dict[str, Any]]] = {}
+    for ranking in rankings:
+        for rank, hit in enumerate(ranking):
+            key = passage_key(hit.get("text", ""))
+            score = 1.0 / (k + rank + 1)
+            if key not in fused:
+                fused[key] = (rank, {**hit, "score": score})
+                continue
+            best, entry = fused[key]
+            if rank < best:
+                fused[key] = (rank, {**hit, "score": entry["score"] + score})
+            else:
+                entry["score"] += score
+    return sorted(
+        (e for _, e in fused.values()), key=lambda h: h["score"], reverse=True
+    )
+
+
+def rerank(query: str, hits: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Re-order ``hits`` with the Bedrock Rerank API; unchanged if that fails."""
+    global _reranker
+    if not hits:
+        return hits
+    try:
+        if _reranker is None:
+            import boto3
+
+            _reranker = boto3.client(
+                "bedrock-agent-runtime",
+                region_name=config.AWS_REGION,
+            )
+        resp = _reranker.rerank(
+            queries=[{"type": "TEXT", "textQuery": {"text": query}}],
+            sources=[
+                {
+                    "type": "INLINE",
+                    "inlineDocumentSource": {
+                        "type": "TEXT",
+                        "textDocument": {"text": h["text"]},
+                    },
+                }
+                for h in hits
+            ],
+            rerankingConfiguration={
+                "type": "BEDROCK_RERANKING_MODEL",
+                "bedrockRerankingConfiguration": {
+                    "modelConfiguration": {
+                        "modelArn": (
+                            f"arn:aws:bedrock:{config.AWS_REGION}::foundation-model/"
+                            f"{RERANK_MODEL_ID}"
+                        ),
+                    },
+                    "numberOfResults": len(hits),
+                },
+            },
+        )
+    except Exception:  # noqa: BLE001 - re-ranking is an optimisation, never a failure
+        return hits
+    return [{**hits[r["index"]], "score": r["relevanceScore"]} for r in resp["results"]]
+
+
+def fuse(
+    query: str,
+    vector_hits: list[dict[str, Any]],
+    k: int = 4,
+) -> list[dict[str, Any]]:
+    """Fuse ``vector_hits`` with BM25 hits for ``query``; return the top ``k``."""
+    keyword_hits = keyword_index().search(query, max(k * 2, RERANK_CANDIDATES))
+    fused = rrf([vector_hits, keyword_hits])
+    if RERANK_MODEL_ID:
+        fused = rerank(query, fused[:RERANK_CANDIDATES])
+    return fused[:k]
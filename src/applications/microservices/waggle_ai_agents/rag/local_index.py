@@ -0,0 +1,130 @@
+"""In-process vector index over ``knowledge/*.md`` — an offline retrieval backend.
+
+The corpus is chunked by paragraph, embedded, and stored as a float32 numpy matrix
+(``vectors.npy``, memory-mapped on load) plus a JSON sidecar with the chunk text,
+source and a corpus fingerprint. A stale or missing index is rebuilt on first use.
+Search is a single matrix-vector product: sub-millisecond, no network.
+
+Embeddings default to the local hashed embedder (``common/embeddings.py``); set
+LOCAL_INDEX_EMBEDDINGS=titan to embed with Titan Text Embeddings v2 instead, at the
+cost of one Bedrock call per query.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from waggle_ai_agents.common import config, embeddings
+
+KNOWLEDGE_DIR = Path(__file__).resolve().parent / "knowledge"
+INDEX_DIR = Path(
+    os.getenv("LOCAL_INDEX_DIR", str(Path(__file__).resolve().parent / ".index")),
+)
+EMBEDDER = os.getenv("LOCAL_INDEX_EMBEDDINGS", "hashed")
+CHUNK_CHARS = int(os.getenv("LOCAL_INDEX_CHUNK_CHARS", "500"))
+TITAN_MODEL_ID = "amazon.titan-embed-text-v2:0"
+
+_lock = threading.Lock()
+_indexes: dict[Path, tuple[np.ndarray, list[dict[str, str]]]] = {}
+_bedrock = None
+
+
+def _embed(texts: list[str]) -> np.ndarray:
+    if EMBEDDER == "titan":
+        return np.array([_titan(t) for t in texts], dtype=np.float32)
+    return np.array([embeddings.embed(t) for t in texts], dtype=np.float32)
+
+
+def _titan(text: str) -> list[float]:
+    global _bedrock
+    if _bedrock is None:
+        import boto3
+
+        _bedrock = boto3.client("bedrock-runtime", region_name=config.AWS_REGION)
+    resp = _bedrock.invoke_model(
+        modelId=TITAN_MODEL_ID,
+        body=json.dumps({"inputText": text, "normalize": True}),
+    )
+    return json.loads(resp["body"].read())["embedding"]
+
+
+def chunk_corpus() -> list[dict[str, str]]:
+    """Split every knowledge document into ~CHUNK_CHARS passages, title-prefixed."""
+    chunks: list[dict[str, str]] = []
+    for doc in sorted(KNOWLEDGE_DIR.glob("*.md")):
+        text = doc.read_text(encoding="utf-8")
+        lines = text.splitlines()
+        title = lines[0].lstrip("# ").strip() if lines else doc.stem
+        body = "\n".join(lines[1:]) if lines and lines[0].startswith("#") else text
+        current = ""
+        for para in (p.strip() for p in body.split("\n\n")):
+            if not para:
+                continue
+            if current and len(current) + len(para) > CHUNK_CHARS:
+                chunks.append(_chunk(doc.name, title, current))
+                current = ""
+            current = f"{current}\n\n{para}" if current else para
+        if current:
+            chunks.append(_chunk(doc.name, title, current))
+    return chunks
+
+
+def _chunk(name: str, title: str, text: str) -> dict[str, str]:
+    return {"source": f"local://nutrition/{name}", "text": f"{title}\n\n{text}"}
+
+
+def _fingerprint() -> str:
+    digest = hashlib.sha256(f"{EMBEDDER}:{embeddings.DIM}:{CHUNK_CHARS}".encode())
+    for doc in sorted(KNOWLEDGE_DIR.glob("*.md")):
+        digest.update(doc.name.encode())
+        digest.update(doc.read_bytes())
+    return digest.hexdigest()
+
+
+def build(index_dir: Path = INDEX_DIR) -> tuple[np.ndarray, list[dict[str, str]]]:
+    """Chunk, embed and persist the corpus; return (vectors, chunks)."""
+    chunks = chunk_corpus()
+    vectors = _embed([c["text"] for c in chunks])
+    index_dir.mkdir(parents=True, exist_ok=True)
+    np.save(index_dir / "vectors.npy", vectors)
+    meta = {"fingerprint": _fingerprint(), "chunks": chunks}
+    (index_dir / "chunks.json").write_text(json.dumps(meta), encoding="utf-8")
+    return vectors, chunks
+
+
+def load(index_dir: Path = INDEX_DIR) -> tuple[np.ndarray, list[dict[str, str]]]:
+    """Memory-map the persisted index, rebuilding it if missing or stale.
+
+    Loaded once per (resolved) ``index_dir``.
+    """
+    key = Path(index_dir).resolve()
+    with _lock:
+        if key not in _indexes:
+            try:
+                meta = json.loads((key / "chunks.json").read_text("utf-8"))
+                if meta.get("fingerprint") != _fingerprint():
+                    raise ValueError("stale index")
+                vectors = np.load(key / "vectors.npy", mmap_mode="r")
+                _indexes[key] = (vectors, meta["chunks"])
+            except (OSError, ValueError, KeyError):
+                _indexes[key] = build(key)
+        return _indexes[key]
+
+
+def search(query: str, k: int = 4) -> list[dict[str, Any]]:
+    """Return the top-``k`` chunks by cosine similarity as {text, source, score}."""
+    vectors, chunks = load()
+    if not chunks:
+        return []
+    scores = vectors @ _embed([query])[0]  # rows are L2-normalised: dot == cosine
+    k = min(k, len(chunks))
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+    return [{**chunks[i], "score": float(scores[i])} for i in top]
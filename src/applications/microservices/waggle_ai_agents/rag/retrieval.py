@@ -1,33 +1,59 @@
-"""Query the nutrition Knowledge Base (Bedrock Retrieve API)."""
+"""Query the nutrition Knowledge Base (Bedrock Retrieve API).
+
+RETRIEVAL_BACKEND selects where passages come from: ``kb`` (default, the Bedrock
+Knowledge Base), ``local`` (the in-process vector index in ``local_index.py``) or
+``hybrid`` (KB — or local, without a KB — vectors fused with BM25, ``hybrid.py``).
+KB and hybrid results are cached per (normalised query, k) in a bounded LRU+TTL cache,
+concurrent identical lookups share one in-flight call, and ``retrieve_many``
+resolves several queries in parallel.
+"""
 
 from __future__ import annotations
 
+import copy
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Any
 
 import boto3
 
-from waggle_ai_agents.common import config
+from waggle_ai_agents.common import config, metrics
+from waggle_ai_agents.common.cache import TTLCache, normalize_query
+
+BACKEND = os.getenv("RETRIEVAL_BACKEND", "kb")
+CACHE_TTL = float(os.getenv("RETRIEVAL_CACHE_TTL", "600"))
+CACHE_SIZE = int(os.getenv("RETRIEVAL_CACHE_SIZE", "256"))
+BATCH_WORKERS = int(os.getenv("RETRIEVAL_BATCH_WORKERS", "4"))
 
 _client = None
+_cache = TTLCache(maxsize=CACHE_SIZE, ttl=CACHE_TTL)
+_inflight: dict[tuple[str, int], Future] = {}
+_inflight_lock = threading.Lock()
+_deduped = 0
+_latency = metrics.LatencyHistogram(
+    "waggle.retrieval.latency",
+    "Nutrition retrieval latency (KB cache misses and local index searches)",
+)
 
 
-def _runtime():
+def client():
+    """The shared ``bedrock-agent-runtime`` client for Knowledge Base retrieval."""
     global _client
     if _client is None:
         _client = boto3.client("bedrock-agent-runtime", region_name=config.AWS_REGION)
     return _client
 
 
-def retrieve(query: str, k: int = 4) -> list[dict[str, Any]]:
-    """Return up to `k` relevant passages from the nutrition KB."""
-    kb_id = config.nutrition_kb_id()
-    if not kb_id:
-        return []
-    resp = _runtime().retrieve(
+def _query_kb(kb_id: str, query: str, k: int) -> list[dict[str, Any]]:
+    start = time.perf_counter()
+    resp = client().retrieve(
         knowledgeBaseId=kb_id,
         retrievalQuery={"text": query},
         retrievalConfiguration={"vectorSearchConfiguration": {"numberOfResults": k}},
     )
+    _latency.record((time.perf_counter() - start) * 1000, {"backend": "kb"})
     results = []
     for r in resp.get("retrievalResults", []):
         results.append(
@@ -38,3 +64,82 @@ def retrieve(query: str, k: int = 4) -> list[dict[str, Any]]:
             },
         )
     return results
+
+
+def _query_local(query: str, k: int) -> list[dict[str, Any]]:
+    from waggle_ai_agents.rag import local_index  # numpy only when selected
+
+    start = time.perf_counter()
+    results = local_index.search(query, k)
+    _latency.record((time.perf_counter() - start) * 1000, {"backend": "local"})
+    return results
+
+
+def _query_hybrid(kb_id: str, query: str, k: int) -> list[dict[str, Any]]:
+    from waggle_ai_agents.rag import hybrid
+
+    # Over-fetch vectors so fusion has candidates beyond the final k.
+    if kb_id:
+        vector_hits = _query_kb(kb_id, query, k * 2)
+    else:
+        vector_hits = _query_local(query, k * 2)
+    return hybrid.fuse(query, vector_hits, k)
+
+
+def retrieve(query: str, k: int = 4) -> list[dict[str, Any]]:
+    """Return up to `k` relevant passages from the configured nutrition backend."""
+    global _deduped
+    if BACKEND == "local":
+        return _query_local(query, k)
+    kb_id = config.nutrition_kb_id()
+    if not kb_id and BACKEND != "hybrid":
+        return []
+    key = (normalize_query(query), k)
+    cached = _cache.get(key)
+    if cached is not None:
+        metrics.counter("waggle.retrieval.requests").add(1, {"result": "hit"})
+        return copy.deepcopy(cached)
+
+    with _inflight_lock:
+        pending = _inflight.get(key)
+        if pending is None:
+            _inflight[key] = owned = Future()
+        else:
+            _deduped += 1
+    if pending is not None:  # an identical lookup is already on the wire
+        metrics.counter("waggle.retrieval.requests").add(1, {"result": "deduped"})
+        return copy.deepcopy(pending.result())
+
+    metrics.counter("waggle.retrieval.requests").add(1, {"result": "miss"})
+    try:
+        if BACKEND == "hybrid":
+            results = _query_hybrid(kb_id, query, k)
+        else:
+            results = _query_kb(kb_id, query, k)
+    except Exception as exc:
+        owned.set_exception(exc)
+        raise
+    else:
+        _cache.set(key, results)
+        owned.set_result(results)
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+    return copy.deepcopy(results)
+
+
+def retrieve_many(queries: list[str], k: int = 4) -> list[list[dict[str, Any]]]:
+    """Resolve several queries concurrently; results are in the order given."""
+    if len(queries) <= 1:
+        return [retrieve(q, k) for q in queries]
+    with ThreadPoolExecutor(max_workers=min(len(queries), BATCH_WORKERS)) as pool:
+        return list(pool.map(lambda q: retrieve(q, k), queries))
+
+
+def cache_stats() -> dict:
+    """Cache hit/miss/eviction counts, in-flight dedups and miss latency histogram."""
+    return {
+        **_cache.stats(),
+        "deduped": _deduped,
+        "latency": _latency.snapshot(),
+    }
@@ -2,8 +2,12 @@
 
 from __future__ import annotations
 
+import argparse
+import hashlib
 import json
 import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import boto3
@@ -27,6 +31,11 @@ VEC_INDEX = "nutrition-index"
 ROLE_NAME = "waggle-ai-nutrition-kb-role"
 KB_NAME = "waggle-ai-nutrition-kb"
 DS_NAME = "nutrition-docs"
+DOC_PREFIX = "nutrition/"
+# Content hashes of what is in the bucket; kept outside DOC_PREFIX so it is never ingested.
+MANIFEST_KEY = "manifests/nutrition.json"
+UPLOAD_WORKERS = 8
+INGEST_TIMEOUT = 900  # seconds
 
 VEC_BUCKET_ARN = f"arn:aws:s3vectors:{REGION}:{ACCOUNT}:bucket/{VEC_BUCKET}"
 VEC_INDEX_ARN = f"{VEC_BUCKET_ARN}/index/{VEC_INDEX}"
@@ -43,6 +52,70 @@ def log(msg: str) -> None:
     print(f"[setup_kb] {msg}")
 
 
+def _poll(
+    describe: Callable[[], str],
+    done: tuple[str, ...],
+    what: str,
+    timeout: float = INGEST_TIMEOUT,
+) -> str:
+    """Call ``describe`` until it returns a status in ``done``, with exponential backoff."""
+    delay, deadline = 2.0, time.monotonic() + timeout
+    while True:
+        status = describe()
+        log(f"  {what} status: {status}")
+        if status in done:
+            return status
+        if time.monotonic() + delay > deadline:
+            raise TimeoutError(f"{what} still {status} after {timeout:.0f}s")
+        time.sleep(delay)
+        delay = min(delay * 2, 30.0)
+
+
+def _load_manifest() -> dict[str, str]:
+    try:
+        body = s3.get_object(Bucket=SRC_BUCKET, Key=MANIFEST_KEY)["Body"].read()
+        return json.loads(body)
+    except s3.exceptions.NoSuchKey:
+        return {}
+
+
+def sync_documents(force: bool = False) -> bool:
+    """Upload new/changed docs in parallel and delete removed ones; True if anything changed."""
+    knowledge = Path(__file__).parent / "knowledge"
+    local = {
+        doc.name: hashlib.sha256(doc.read_bytes()).hexdigest()
+        for doc in sorted(knowledge.glob("*.md"))
+    }
+    remote = _load_manifest()  # even when forced: it lists the docs to delete
+    changed = [
+        name for name, digest in local.items() if force or remote.get(name) != digest
+    ]
+    removed = [name for name in remote if name not in local]
+
+    def upload(name: str) -> None:
+        s3.upload_file(
+            str(knowledge / name),
+            SRC_BUCKET,
+            f"{DOC_PREFIX}{name}",
+            ExtraArgs={"Metadata": {"sha256": local[name]}},
+        )
+
+    with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as pool:
+        list(pool.map(upload, changed))
+    if removed:
+        s3.delete_objects(
+            Bucket=SRC_BUCKET,
+            Delete={"Objects": [{"Key": f"{DOC_PREFIX}{name}"} for name in removed]},
+        )
+    if changed or removed or not remote:
+        s3.put_object(Bucket=SRC_BUCKET, Key=MANIFEST_KEY, Body=json.dumps(local))
+    log(
+        f"docs: {len(changed)} uploaded, {len(removed)} deleted, "
+        f"{len(local) - len(changed)} unchanged (s3://{SRC_BUCKET}/{DOC_PREFIX})",
+    )
+    return bool(changed or removed)
+
+
 def create_source_bucket() -> None:
     try:
         if REGION == "us-east-1":
@@ -56,12 +129,6 @@ def create_source_bucket() -> None:
     except s3.exceptions.BucketAlreadyOwnedByYou:
         log(f"source bucket {SRC_BUCKET} already exists")
 
-    knowledge = Path(__file__).parent / "knowledge"
-    docs = sorted(knowledge.glob("*.md"))
-    for doc in docs:
-        s3.upload_file(str(doc), SRC_BUCKET, f"nutrition/{doc.name}")
-    log(f"uploaded {len(docs)} docs to s3://{SRC_BUCKET}/nutrition/")
-
 
 def create_vector_store() -> None:
     try:
@@ -192,16 +259,15 @@ def create_kb(role_arn: str) -> str:
 
 
 def wait_kb_active(kb_id: str) -> None:
-    while True:
-        st = bedrock.get_knowledge_base(knowledgeBaseId=kb_id)["knowledgeBase"][
+    status = _poll(
+        lambda: bedrock.get_knowledge_base(knowledgeBaseId=kb_id)["knowledgeBase"][
             "status"
-        ]
-        log(f"  kb status: {st}")
-        if st == "ACTIVE":
-            return
-        if st == "FAILED":
-            raise RuntimeError("knowledge base creation FAILED")
-        time.sleep(5)
+        ],
+        ("ACTIVE", "FAILED"),
+        "kb",
+    )
+    if status == "FAILED":
+        raise RuntimeError("knowledge base creation FAILED")
 
 
 def find_data_source(kb_id: str) -> str | None:
@@ -226,7 +292,7 @@ def create_data_source(kb_id: str) -> str:
             "type": "S3",
             "s3Configuration": {
                 "bucketArn": f"arn:aws:s3:::{SRC_BUCKET}",
-                "inclusionPrefixes": ["nutrition/"],
+                "inclusionPrefixes": [DOC_PREFIX],
             },
         },
     )
@@ -235,33 +301,55 @@ def create_data_source(kb_id: str) -> str:
     return ds_id
 
 
+def last_ingestion_complete(kb_id: str, ds_id: str) -> bool:
+    """True if the data source's most recent ingestion job finished successfully."""
+    jobs = bedrock.list_ingestion_jobs(
+        knowledgeBaseId=kb_id,
+        dataSourceId=ds_id,
+        sortBy={"attribute": "STARTED_AT", "order": "DESCENDING"},
+        maxResults=1,
+    ).get("ingestionJobSummaries", [])
+    return bool(jobs) and jobs[0]["status"] == "COMPLETE"
+
+
 def ingest(kb_id: str, ds_id: str) -> None:
     job = bedrock.start_ingestion_job(knowledgeBaseId=kb_id, dataSourceId=ds_id)
     job_id = job["ingestionJob"]["ingestionJobId"]
     log(f"started ingestion job {job_id}; polling...")
-    while True:
-        status = bedrock.get_ingestion_job(
+    status = _poll(
+        lambda: bedrock.get_ingestion_job(
             knowledgeBaseId=kb_id,
             dataSourceId=ds_id,
             ingestionJobId=job_id,
-        )["ingestionJob"]["status"]
-        log(f"  ingestion status: {status}")
-        if status in ("COMPLETE", "FAILED"):
-            break
-        time.sleep(10)
+        )["ingestionJob"]["status"],
+        ("COMPLETE", "FAILED", "STOPPED"),
+        "ingestion",
+    )
     if status != "COMPLETE":
         raise RuntimeError(f"ingestion job ended in status {status}")
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="re-upload every document and re-ingest even if nothing changed",
+    )
+    args = parser.parse_args()
+
     log(f"account={ACCOUNT} region={REGION}")
     create_source_bucket()
+    changed = sync_documents(force=args.force)
     create_vector_store()
     role_arn = create_role()
     kb_id = create_kb(role_arn)
     wait_kb_active(kb_id)  # can't ingest while the KB is still CREATING
     ds_id = create_data_source(kb_id)
-    ingest(kb_id, ds_id)
+    if changed or args.force or not last_ingestion_complete(kb_id, ds_id):
+        ingest(kb_id, ds_id)
+    else:
+        log("no document changes and last ingestion COMPLETE; skipping ingestion")
     ssm.put_parameter(Name=KB_SSM_NAME, Value=kb_id, Type="String", Overwrite=True)
     log(f"wrote KB id to SSM {KB_SSM_NAME}")
     print(f"\n✅ Nutrition KB ready. knowledgeBaseId = {kb_id}")
@@ -0,0 +1,11 @@
+"""Shared setup for the waggle_ai_agents unit tests."""
+
+import os
+import sys
+
+# Import the package as ``waggle_ai_agents`` from its parent directory
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
@@ -0,0 +1,115 @@
+"""Unit tests for the concurrency limit and bounded queue in common/admission.py."""
+
+import asyncio
+import threading
+
+import pytest
+
+from waggle_ai_agents.common import admission
+
+
+class TestGate:
+    """Test cases for admission.Gate."""
+
+    def test_sheds_when_the_queue_is_full(self):
+        gate = admission.Gate("nutrition", limit=1, queue_size=0)
+
+        async def overfill():
+            release = await gate.admit()
+            with pytest.raises(admission.Busy) as busy:
+                await gate.admit()
+            release()
+            return busy.value
+
+        busy = asyncio.run(overfill())
+
+        assert busy.reason == "queue_full"
+        assert busy.retry_after == admission.RETRY_AFTER
+        assert f"retry in {admission.RETRY_AFTER}s" in str(busy)
+        assert gate.stats()["shed"] == 1
+
+    def test_sheds_after_the_queue_timeout(self):
+        gate = admission.Gate("nutrition", limit=1, queue_size=1, timeout=0.05)
+
+        async def wait_too_long():
+            release = await gate.admit()
+            try:
+                await gate.admit()
+            finally:
+                release()
+
+        with pytest.raises(admission.Busy) as busy:
+            asyncio.run(wait_too_long())
+
+        assert busy.value.reason == "timeout"
+        assert gate.stats()["waiting"] == 0
+
+    def test_queued_turn_runs_once_a_slot_frees(self):
+        gate = admission.Gate("nutrition", limit=1, queue_size=1, timeout=5)
+
+        async def queue_behind():
+            release = await gate.admit()
+            waiter = asyncio.ensure_future(gate.admit())
+            await asyncio.sleep(0.05)
+            assert not waiter.done() and gate.stats()["waiting"] == 1
+            release()
+            (await waiter)()
+
+        asyncio.run(queue_behind())
+
+        assert gate.stats() == {
+            "limit": 1,
+            "in_flight": 0,
+            "waiting": 0,
+            "queue_size": 1,
+            "shed": 0,
+        }
+
+    def test_release_is_idempotent(self):
+        gate = admission.Gate("nutrition", limit=1, queue_size=0)
+
+        release = asyncio.run(gate.admit())
+        release()
+        release()
+
+        assert gate.in_flight == 0
+        asyncio.run(gate.admit())()
+
+    def test_call_holds_the_slot_until_fn_returns(self):
+        gate = admission.Gate("nutrition", limit=1, queue_size=0)
+        seen = []
+
+        def run(prompt, user_id=None):
+            seen.append(gate.in_flight)
+            return f"{prompt} for {user_id}"
+
+        assert asyncio.run(gate.call(run, "hi", user_id="alice")) == "hi for alice"
+        assert seen == [1]
+        assert gate.in_flight == 0
+
+    def test_stream_holds_the_slot_while_streaming(self):
+        gate = admission.Gate("nutrition", limit=1, queue_size=0)
+        seen = []
+
+        async def answer(prompt):
+            for word in prompt.split():
+                seen.append(gate.in_flight)
+                yield word
+
+        async def read():
+            chunks = await gate.stream(answer, "a b")
+            return [chunk async for chunk in chunks]
+
+        assert asyncio.run(read()) == ["a", "b"]
+        assert seen == [1, 1]
+        assert gate.in_flight == 0
+
+    def test_call_runs_off_the_event_loop(self):
+        gate = admission.Gate("nutrition", limit=1, queue_size=0)
+
+        async def call():
+            return await gate.call(threading.get_ident), threading.get_ident()
+
+        worker, loop = asyncio.run(call())
+
+        assert worker != loop
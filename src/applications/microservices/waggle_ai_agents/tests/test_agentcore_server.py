@@ -0,0 +1,67 @@
+"""Unit tests for the busy response of common/agentcore_server.py."""
+
+import asyncio
+import functools
+
+import pytest
+
+pytest.importorskip("bedrock_agentcore")
+
+from starlette.testclient import TestClient  # noqa: E402
+
+from waggle_ai_agents.common import admission, agentcore_server  # noqa: E402
+
+
+@pytest.fixture
+def gates(monkeypatch):
+    """The gates the apps build: one slot, no queue."""
+    built, make = [], admission.Gate
+
+    def gate(agent):
+        built.append(make(agent, limit=1, queue_size=0))
+        return built[-1]
+
+    monkeypatch.setattr(admission, "Gate", gate)
+    return built
+
+
+def _run(prompt, user_id=None, session_id=None):
+    return f"answer to {prompt}"
+
+
+async def _stream(prompt, user_id=None, session_id=None):
+    for word in ("answer", "to", prompt):
+        yield word
+
+
+class TestBusy:
+    """A turn over capacity gets a 503 with Retry-After."""
+
+    @pytest.mark.parametrize(
+        "build",
+        [
+            functools.partial(agentcore_server.build_app, _run),
+            functools.partial(agentcore_server.build_streaming_app, _stream),
+        ],
+        ids=["run", "stream"],
+    )
+    def test_over_capacity_is_503_with_retry_after(self, gates, build):
+        client = TestClient(build())
+        release = asyncio.run(gates[0].admit())  # a turn already in flight
+
+        response = client.post("/invocations", json={"prompt": "hi"})
+        release()
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == str(admission.RETRY_AFTER)
+        assert response.json()["error"] == "busy"
+        assert response.json()["reason"] == "queue_full"
+
+    def test_admitted_turn_is_answered(self, gates):
+        client = TestClient(agentcore_server.build_app(_run))
+
+        response = client.post("/invocations", json={"prompt": "hi"})
+
+        assert response.status_code == 200
+        assert response.json() == "answer to hi"
+        assert gates[0].in_flight == 0
@@ -0,0 +1,51 @@
+"""Unit tests for the bench's baseline comparison (bench/run.py)."""
+
+from waggle_ai_agents.bench import run
+
+BASE = {
+    "ordering": {
+        "llm_steps": 3.0,
+        "tool_calls": 2.0,
+        "tool_bytes": 134.0,
+        "overhead_ms": 40.0,
+        "cache_read": 684.0,
+    }
+}
+
+
+def _row(**changes):
+    return {**BASE["ordering"], **changes}
+
+
+class TestRegressions:
+    """Test cases for run.regressions."""
+
+    def test_within_tolerance(self):
+        report = {"ordering": _row(tool_bytes=160.0, overhead_ms=40.0 * 1.2 + 20)}
+
+        assert run.regressions(report, BASE, 0.2) == []
+
+    def test_more_steps_is_a_regression(self):
+        found = run.regressions({"ordering": _row(llm_steps=4.0)}, BASE, 0.2)
+
+        assert found == ["ordering: llm_steps 4.0 vs baseline 3.0 (limit 3.6)"]
+
+    def test_overhead_gets_slack(self):
+        slow = 40.0 * 1.2 + run.OVERHEAD_SLACK_MS + 1
+
+        found = run.regressions({"ordering": _row(overhead_ms=slow)}, BASE, 0.2)
+
+        assert [f.split(" ")[1] for f in found] == ["overhead_ms"]
+
+    def test_losing_the_prompt_cache_is_a_regression(self):
+        found = run.regressions({"ordering": _row(cache_read=0.0)}, BASE, 0.2)
+
+        assert [f.split(" ")[1] for f in found] == ["cache_read"]
+
+    def test_agents_without_baseline_or_skipped_are_not_compared(self):
+        report = {
+            "orchestrator": _row(llm_steps=99.0),
+            "ordering": {"skipped": "No module named 'crewai'"},
+        }
+
+        assert run.regressions(report, BASE, 0.2) == []
@@ -0,0 +1,170 @@
+"""Unit tests for the structured command fast path (orchestrator_strands/commands.py)."""
+
+import pytest
+
+pytest.importorskip("strands")
+
+from waggle_ai_agents.common import petstore, resolver  # noqa: E402
+from waggle_ai_agents.orchestrator_strands import commands  # noqa: E402
+
+FOOD = {
+    "id": "F1",
+    "name": "Puppy Chow",
+    "price": "12.99",
+    "image_url": "http://x/f1.jpg",
+}
+PET = {
+    "petid": "017",
+    "pettype": "kitten",
+    "petcolor": "brown",
+    "price": "199",
+    "availability": "yes",
+    "peturl": "http://x/017.jpg",
+}
+
+
+class TestParse:
+    """Test cases for commands.parse."""
+
+    @pytest.mark.parametrize(
+        "query, command, fields",
+        [
+            ("Add 2 of food F1 to my cart.", "add_food", {"quantity": "2", "id": "F1"}),
+            ('please add "Puppy Chow" to my cart', "add_food", {"name": "Puppy Chow"}),
+            (
+                "Add the food in this photo to my cart: http://x/f1.jpg",
+                "add_food",
+                {"url": "http://x/f1.jpg"},
+            ),
+            (
+                'I want to buy "Puppy Chow". Please add it to my cart and check out.',
+                "buy_food",
+                {"name": "Puppy Chow"},
+            ),
+            ("show my cart", "view_cart", {}),
+            (
+                "I would like to adopt pet 017, the kitten.",
+                "adopt_pet",
+                {"id": "017", "type": "kitten"},
+            ),
+            (
+                "I would like to adopt the pet in this photo: http://x/017.jpg",
+                "adopt_pet",
+                {"url": "http://x/017.jpg"},
+            ),
+            ("confirm adopt pet 017", "confirm_adoption", {"id": "017"}),
+            ("Yes, confirm adopt pet #017.", "confirm_adoption", {"id": "017"}),
+        ],
+    )
+    def test_commands(self, query, command, fields):
+        assert commands.parse(query) == (command, fields)
+
+    @pytest.mark.parametrize(
+        "query",
+        [
+            "adopt pet 017 and recommend food for it",
+            "what should I add to my cart?",
+            "show my cart and check out",
+            "",
+        ],
+    )
+    def test_anything_else_is_not_a_command(self, query):
+        assert commands.parse(query) is None
+
+
+class TestExecute:
+    """Test cases for commands.execute against a stubbed petstore."""
+
+    @pytest.fixture(autouse=True)
+    def petstore_calls(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(commands, "ENABLED", True)
+        monkeypatch.setattr(
+            resolver, "food", lambda ref: FOOD if ref in ("F1", "Puppy Chow") else None
+        )
+        monkeypatch.setattr(
+            resolver, "pets", lambda ref: [dict(PET)] if ref == "017" else []
+        )
+        monkeypatch.setattr(resolver, "invalidate_pets", lambda: None)
+        monkeypatch.setattr(
+            petstore,
+            "add_to_cart",
+            lambda *args: calls.append(("add_to_cart", *args)) or {"ok": True},
+        )
+        monkeypatch.setattr(
+            petstore,
+            "complete_adoption",
+            lambda *args: calls.append(("complete_adoption", *args)) or {"ok": True},
+        )
+        return calls
+
+    def test_add_food(self, petstore_calls):
+        reply = commands.execute("add 2 of food F1 to my cart", "u1")
+
+        assert reply.startswith("Added 2 x **Puppy Chow** ($12.99)")
+        assert petstore_calls == [("add_to_cart", "u1", "F1", 2)]
+
+    def test_adopt_asks_for_confirmation_first(self, petstore_calls):
+        reply = commands.execute("I would like to adopt pet 017, the kitten.", "u1")
+
+        assert "pet 017, the brown kitten" in reply
+        assert "$199" in reply
+        assert "confirm adopt pet 017" in reply
+        assert petstore_calls == []
+
+    def test_confirm_completes_adoption(self, petstore_calls):
+        reply = commands.execute("confirm adopt pet 017", "u1")
+
+        assert reply.startswith("Congratulations, you adopted the brown kitten!")
+        assert petstore_calls == [("complete_adoption", "017", "kitten", "u1")]
+
+    def test_confirm_unavailable_pet_goes_to_the_agents(self, monkeypatch):
+        monkeypatch.setattr(
+            resolver, "pets", lambda ref: [{**PET, "availability": "no"}]
+        )
+
+        assert commands.execute("confirm adopt pet 017", "u1") is None
+
+    def test_mismatched_pet_type_goes_to_the_agents(self, petstore_calls):
+        assert commands.execute("adopt pet 017, the puppy", "u1") is None
+
+    def test_view_cart_uses_one_catalog_snapshot(self, monkeypatch):
+        snapshots = []
+        monkeypatch.setattr(
+            petstore,
+            "get_cart",
+            lambda user: {
+                "items": [
+                    {"food_id": "F1", "quantity": 2},
+                    {"food_id": "F-gone", "quantity": 1},
+                ],
+                "total_price": "30.97",
+            },
+        )
+        monkeypatch.setattr(
+            resolver,
+            "foods_by_id",
+            lambda: snapshots.append(1) or {"f1": FOOD},
+        )
+
+        reply = commands.execute("view my cart", "u1")
+
+        assert reply == (
+            "Your cart:\n- 2 x Puppy Chow ($12.99 each)\n- 1 x F-gone\n\nTotal: $30.97"
+        )
+        assert snapshots == [1]
+
+    def test_quantity_over_limit_goes_to_the_agents(self, petstore_calls):
+        assert commands.execute("add 500 of food F1 to my cart", "u1") is None
+        assert petstore_calls == []
+
+    def test_no_user_id(self, petstore_calls):
+        assert commands.execute("add food F1 to my cart", None) is None
+        assert petstore_calls == []
+
+    def test_failed_call_is_reported(self, monkeypatch):
+        monkeypatch.setattr(petstore, "add_to_cart", lambda *a: {"error": "HTTP 503"})
+
+        reply = commands.execute("add food F1 to my cart", "u1")
+
+        assert reply == "Sorry, I couldn't add that to your cart: HTTP 503"
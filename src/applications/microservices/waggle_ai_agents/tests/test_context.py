@@ -0,0 +1,31 @@
+"""Unit tests for memory context assembly in common/context.py."""
+
+from waggle_ai_agents.common import context
+
+
+class TestBuild:
+    """Test cases for context.build."""
+
+    def test_recent_lines_stay_verbatim(self):
+        lines = ["user: I have a puppy.", "assistant: Great, puppies need protein."]
+
+        block = context.build([], lines, "what food?")
+
+        assert block == "Recent conversation this session:\n" + "\n".join(lines)
+
+    def test_old_irrelevant_lines_are_truncated(self):
+        old = "user: Tell me about parrots. They are loud and clever birds."
+        recent = [f"user: recent line {n}." for n in range(context.RECENT_LINES)]
+
+        block = context.build([], [old, *recent], "kitten food")
+
+        assert "user (truncated): Tell me about parrots. …" in block
+        assert "loud and clever" not in block
+
+    def test_stays_within_budget(self):
+        lines = [f"user: line {n} " + "word " * 50 for n in range(40)]
+
+        block = context.build(["likes salmon"], lines, "food", budget=200)
+
+        assert context.estimate_tokens(block) <= 200 + 20  # headings are not budgeted
+        assert "likes salmon" in block
@@ -0,0 +1,106 @@
+"""Unit tests for streamed delegation over the worker pool (orchestrator_strands/delegate.py)."""
+
+import asyncio
+import json
+import threading
+
+import pytest
+
+pytest.importorskip("strands")
+
+from waggle_ai_agents.common import worker_pool  # noqa: E402
+from waggle_ai_agents.orchestrator_strands import delegate  # noqa: E402
+
+
+class _Pool:
+    """Stands in for an AgentPool: streams ``chunks``, pausing before ``pause_at``."""
+
+    def __init__(self, chunks, pause_at=None, error=None):
+        self.chunks, self.pause_at, self.error = chunks, pause_at, error
+        self.paused, self.resume = threading.Event(), threading.Event()
+        self.closed = threading.Event()
+        self.threads = set()
+
+    def stream(self, query, user_id=None, streaming=False):
+        self.threads.add(threading.get_ident())
+        try:
+            for i, chunk in enumerate(self.chunks):
+                if i == self.pause_at:
+                    self.paused.set()
+                    self.resume.wait(5)
+                self.threads.add(threading.get_ident())
+                yield chunk
+            if self.error:
+                raise self.error
+        finally:
+            self.threads.add(threading.get_ident())
+            self.closed.set()
+
+
+@pytest.fixture
+def use_pool(monkeypatch):
+    monkeypatch.setattr(delegate, "TRANSPORT", "pool")
+
+    def install(fake):
+        monkeypatch.setattr(worker_pool, "pool", lambda agent: fake)
+        return fake
+
+    return install
+
+
+async def _collect(agen):
+    return [chunk async for chunk in agen]
+
+
+class TestDelegateStream:
+    """Test cases for delegate.delegate_stream with AGENT_TRANSPORT=pool."""
+
+    def test_streams_every_chunk(self, use_pool):
+        fake = use_pool(_Pool(["a", "b", "c"]))
+
+        assert asyncio.run(_collect(delegate.delegate_stream("nutrition", "q"))) == [
+            "a",
+            "b",
+            "c",
+        ]
+        assert fake.closed.is_set()
+
+    def test_worker_error_becomes_an_error_answer(self, use_pool):
+        use_pool(_Pool(["a"], error=worker_pool.WorkerError("boom")))
+
+        chunks = asyncio.run(_collect(delegate.delegate_stream("nutrition", "q")))
+
+        assert chunks[0] == "a"
+        assert json.loads(chunks[1]) == {
+            "error": "worker pool call to 'nutrition' failed: boom"
+        }
+
+    def test_other_errors_reach_the_reader(self, use_pool):
+        use_pool(_Pool(["a"], error=OSError("pipe closed")))
+
+        with pytest.raises(OSError, match="pipe closed"):
+            asyncio.run(_collect(delegate.delegate_stream("nutrition", "q")))
+
+    def test_cancelled_reader_closes_the_generator_on_its_own_thread(self, use_pool):
+        """Cancelling mid-next() must not raise "generator already executing"."""
+        fake = use_pool(_Pool(["a", "b", "c"], pause_at=1))
+
+        async def cancel_mid_answer():
+            seen = []
+
+            async def read():
+                async for chunk in delegate.delegate_stream("nutrition", "q"):
+                    seen.append(chunk)
+
+            task = asyncio.create_task(read())
+            await asyncio.to_thread(fake.paused.wait, 5)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            fake.resume.set()
+            await asyncio.to_thread(fake.closed.wait, 5)
+            return seen
+
+        assert asyncio.run(cancel_mid_answer()) == ["a"]
+        assert fake.closed.is_set()
+        assert len(fake.threads) == 1
@@ -0,0 +1,47 @@
+"""Unit tests for reciprocal-rank fusion in rag/hybrid.py."""
+
+from waggle_ai_agents.rag import hybrid
+
+
+def _hit(text, source, score=1.0):
+    return {"text": text, "source": source, "score": score}
+
+
+class TestRRF:
+    """Test cases for hybrid.rrf."""
+
+    def test_merges_same_passage_across_backends(self):
+        """A KB chunk and its local BM25 twin are one passage."""
+        kb = [_hit("Renal diets limit phosphorus.", "s3://kb/kidney-renal-support.md")]
+        bm25 = [
+            _hit("Taurine matters for cats.", "local://cat-life-stages.md"),
+            _hit("renal diets  limit\nphosphorus.", "local://kidney-renal-support.md"),
+        ]
+
+        fused = hybrid.rrf([kb, bm25], k=60)
+
+        assert len(fused) == 2
+        assert fused[0]["text"] == "Renal diets limit phosphorus."
+        assert fused[0]["score"] == 1 / 61 + 1 / 62
+
+    def test_keeps_best_ranked_source(self):
+        """The merged passage carries the fields of its best-ranked hit."""
+        vector = [
+            _hit("Other passage.", "s3://kb/other.md"),
+            _hit("Omega-3 helps a dull coat.", "s3://kb/skin-coat-and-omega.md"),
+        ]
+        keyword = [_hit("Omega-3 helps a dull coat.", "local://skin-coat-and-omega.md")]
+
+        fused = hybrid.rrf([vector, keyword], k=60)
+
+        assert fused[0]["source"] == "local://skin-coat-and-omega.md"
+        assert fused[0]["score"] == 1 / 62 + 1 / 61
+
+    def test_distinct_passages_are_ranked_by_score(self):
+        fused = hybrid.rrf([[_hit("a", "x"), _hit("b", "x")], [_hit("c", "y")]], k=1)
+
+        assert [h["text"] for h in fused] == ["a", "c", "b"]
+        assert [h["score"] for h in fused] == [0.5, 0.5, 1 / 3]
+
+    def test_empty_rankings(self):
+        assert hybrid.rrf([[], []]) == []
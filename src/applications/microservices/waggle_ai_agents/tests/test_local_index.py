@@ -0,0 +1,39 @@
+"""Unit tests for the offline vector index (rag/local_index.py)."""
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from waggle_ai_agents.rag import local_index  # noqa: E402
+
+
+class TestLoad:
+    """Test cases for local_index.load."""
+
+    def test_each_directory_gets_its_own_index(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(local_index, "_indexes", {})
+        first, second = tmp_path / "a", tmp_path / "b"
+
+        vectors, chunks = local_index.load(first)
+        local_index.load(second)
+
+        assert (first / "chunks.json").exists()
+        assert (second / "chunks.json").exists()
+        assert len(vectors) == len(chunks) > 0
+
+    def test_same_directory_is_loaded_once(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(local_index, "_indexes", {})
+
+        index = local_index.load(tmp_path / "idx")
+
+        assert local_index.load(tmp_path / "x" / ".." / "idx") is index
+
+    def test_stale_index_is_rebuilt(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(local_index, "_indexes", {})
+        local_index.load(tmp_path)
+        (tmp_path / "chunks.json").write_text('{"fingerprint": "old"}')
+        monkeypatch.setattr(local_index, "_indexes", {})
+
+        vectors, chunks = local_index.load(tmp_path)
+
+        assert chunks and len(vectors) == len(chunks)
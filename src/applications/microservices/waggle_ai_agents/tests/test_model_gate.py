@@ -0,0 +1,193 @@
+"""Unit tests for rate limiting and retries in common/model_gate.py."""
+
+import json
+
+import boto3
+import pytest
+from botocore.awsrequest import AWSResponse
+from botocore.exceptions import ClientError
+
+from waggle_ai_agents.common import model_gate
+
+_MODEL = "anthropic.claude-test"
+_ANSWER = {
+    "output": {"message": {"role": "assistant", "content": [{"text": "hi"}]}},
+    "stopReason": "end_turn",
+    "usage": {"inputTokens": 1, "outputTokens": 1, "totalTokens": 2},
+    "metrics": {"latencyMs": 1},
+}
+
+
+class _Raw:
+    def __init__(self, body):
+        self.body = body
+
+    def stream(self, **_):
+        yield self.body
+
+
+def _response(status, body):
+    raw = _Raw(json.dumps(body).encode())
+    return AWSResponse("https://bedrock", status, {}, raw)
+
+
+def _error(status, code):
+    return _response(status, {"message": code, "__type": code})
+
+
+class TestBackoff:
+    """Test cases for model_gate.backoff."""
+
+    def test_full_jitter_up_to_the_doubling_base(self, monkeypatch):
+        monkeypatch.setattr(model_gate.random, "uniform", lambda low, high: high)
+
+        assert [model_gate.backoff(n) for n in (1, 2, 3)] == [
+            model_gate.RETRY_BASE,
+            model_gate.RETRY_BASE * 2,
+            model_gate.RETRY_BASE * 4,
+        ]
+
+    def test_capped(self, monkeypatch):
+        monkeypatch.setattr(model_gate.random, "uniform", lambda low, high: high)
+
+        assert model_gate.backoff(50) == model_gate.RETRY_CAP
+
+    def test_jittered_from_zero(self):
+        delays = {model_gate.backoff(3) for _ in range(50)}
+
+        assert len(delays) > 1
+        assert all(0 <= d <= model_gate.RETRY_BASE * 4 for d in delays)
+
+
+class TestModelGate:
+    """Test cases for ModelGate's concurrency limit and token bucket."""
+
+    def test_throttle_halves_the_limit_and_success_grows_it_back(self):
+        gate = model_gate.ModelGate(_MODEL, rps=0, max_concurrency=8)
+
+        gate.acquire("nutrition")
+        gate.release("nutrition", throttled=True)
+        assert gate.stats()["limit"] == 4
+        assert gate.stats()["throttles"] == 1
+
+        gate.acquire("nutrition")
+        gate.release("nutrition")
+        assert gate.stats()["limit"] == 4.25
+
+    def test_limit_never_drops_below_one(self):
+        gate = model_gate.ModelGate(_MODEL, rps=0, max_concurrency=2)
+
+        for _ in range(3):
+            gate.acquire("nutrition")
+            gate.release("nutrition", throttled=True)
+
+        assert gate.stats()["limit"] == 1
+
+    def test_full_gate_goes_ahead_after_the_queue_timeout(self):
+        gate = model_gate.ModelGate(_MODEL, rps=0, max_concurrency=1, timeout=0.05)
+
+        gate.acquire("nutrition")
+        gate.acquire("nutrition")
+
+        assert gate.stats()["in_flight"] == 2
+        assert gate.stats()["timeouts"] == 1
+
+    def test_empty_bucket_waits_for_a_token(self):
+        gate = model_gate.ModelGate(_MODEL, rps=1, burst=1, timeout=0.05)
+
+        gate.acquire("nutrition")
+        gate.acquire("nutrition")
+
+        assert gate.stats()["timeouts"] == 1
+
+    def test_limits_per_model(self, monkeypatch):
+        monkeypatch.setenv("MODEL_LIMITS", f"{_MODEL}=2/3, other=5")
+
+        assert model_gate._limits() == {
+            _MODEL: (2.0, 3),
+            "other": (5.0, model_gate.MAX_CONCURRENCY),
+        }
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """A gated bedrock-runtime client answering from ``client.replies``."""
+    monkeypatch.setattr(model_gate, "_gates", {})
+    monkeypatch.setattr(model_gate, "_LIMITS", {})
+    delays = []
+
+    def backoff(attempt):
+        delays.append(attempt)
+        return 0
+
+    monkeypatch.setattr(model_gate, "backoff", backoff)
+    bedrock = boto3.client(
+        "bedrock-runtime",
+        region_name="us-east-1",
+        aws_access_key_id="test",
+        aws_secret_access_key="test",
+    )
+    model_gate.attach(bedrock, "nutrition")
+    bedrock.replies, bedrock.delays, bedrock.sent = [], delays, []
+
+    def send(request, **_):
+        bedrock.sent.append(request.url)
+        return bedrock.replies.pop(0)
+
+    bedrock.meta.events.register("before-send.bedrock-runtime", send)
+    return bedrock
+
+
+def _converse(client):
+    return client.converse(
+        modelId=_MODEL, messages=[{"role": "user", "content": [{"text": "hi"}]}]
+    )
+
+
+class TestAttach:
+    """Test cases for model_gate.attach on a boto3 client."""
+
+    def test_throttle_is_retried_after_a_backoff(self, client):
+        client.replies = [_error(429, "ThrottlingException"), _response(200, _ANSWER)]
+
+        assert _converse(client)["stopReason"] == "end_turn"
+
+        assert len(client.sent) == 2
+        assert client.delays == [1]
+        stats = model_gate.stats()[_MODEL]
+        assert stats["throttles"] == 1
+        assert stats["in_flight"] == 0
+        assert stats["limit"] < model_gate.MAX_CONCURRENCY
+
+    def test_server_error_is_retried_without_counting_a_throttle(self, client):
+        client.replies = [
+            _error(503, "InternalServerException"),
+            _response(200, _ANSWER),
+        ]
+
+        _converse(client)
+
+        assert client.delays == [1]
+        assert model_gate.stats()[_MODEL]["throttles"] == 0
+
+    def test_gives_up_after_retries(self, client):
+        client.replies = [
+            _error(429, "ThrottlingException") for _ in range(model_gate.RETRIES + 1)
+        ]
+
+        with pytest.raises(ClientError, match="ThrottlingException"):
+            _converse(client)
+
+        assert len(client.sent) == model_gate.RETRIES + 1
+        assert client.delays == list(range(1, model_gate.RETRIES + 1))
+        assert model_gate.stats()[_MODEL]["in_flight"] == 0
+
+    def test_client_error_is_not_retried(self, client):
+        client.replies = [_error(400, "ValidationException")]
+
+        with pytest.raises(ClientError, match="ValidationException"):
+            _converse(client)
+
+        assert len(client.sent) == 1
+        assert client.delays == []
+        assert model_gate.stats()[_MODEL]["in_flight"] == 0
@@ -0,0 +1,106 @@
+"""Unit tests for answer-cache keying in common/response_cache.py."""
+
+from unittest.mock import patch
+
+import pytest
+
+from waggle_ai_agents.common import petstore, response_cache
+from waggle_ai_agents.common.cache import TTLCache
+
+
+class TestKeying:
+    """Shared vs per-user entries."""
+
+    @pytest.fixture(autouse=True)
+    def cache(self, monkeypatch):
+        """An enabled, empty cache on a fixed catalog version."""
+        monkeypatch.setattr(response_cache, "ENABLED", True)
+        monkeypatch.setattr(response_cache, "SIMILARITY", 0.0)
+        monkeypatch.setattr(response_cache, "_cache", TTLCache(maxsize=16, ttl=60))
+        monkeypatch.setattr(petstore, "catalog_version", lambda: "v1")
+
+    def test_general_answer_is_shared_across_users(self):
+        response_cache.store(
+            "concierge", "What do puppies eat?", "alice", "Puppy food."
+        )
+
+        assert response_cache.lookup("concierge", "what do puppies eat", "bob") == (
+            "Puppy food."
+        )
+        assert response_cache.lookup("concierge", "What do puppies eat?") == (
+            "Puppy food."
+        )
+
+    def test_answer_using_user_data_stays_with_that_user(self):
+        response_cache.store(
+            "nutrition", "What should my pet eat?", "alice", "For ALICE's puppy: X."
+        )
+
+        assert response_cache.lookup("nutrition", "What should my pet eat?", "alice")
+        assert (
+            response_cache.lookup("nutrition", "What should my pet eat?", "bob") is None
+        )
+        assert response_cache.lookup("nutrition", "What should my pet eat?") is None
+
+    def test_keyed_per_agent(self):
+        response_cache.store("concierge", "What do puppies eat?", None, "Puppy food.")
+
+        assert response_cache.lookup("nutrition", "What do puppies eat?") is None
+
+    def test_catalog_change_invalidates(self, monkeypatch):
+        response_cache.store("concierge", "What do puppies eat?", None, "Puppy food.")
+        monkeypatch.setattr(petstore, "catalog_version", lambda: "v2")
+
+        assert response_cache.lookup("concierge", "What do puppies eat?") is None
+
+    @pytest.mark.parametrize(
+        "query",
+        ["Add Puppy Chow to my cart", "I want to adopt a kitten", "show alice's pets"],
+    )
+    def test_transactional_or_personal_turns_bypass(self, query):
+        response_cache.store("concierge", query, "alice", "Done.")
+
+        assert response_cache.lookup("concierge", query, "alice") is None
+
+    def test_failed_answers_are_not_stored(self):
+        response_cache.store("concierge", "What do puppies eat?", None, "Error: boom")
+
+        assert response_cache.lookup("concierge", "What do puppies eat?") is None
+
+    def test_similar_lookup_respects_user_scope(self, monkeypatch):
+        monkeypatch.setattr(response_cache, "SIMILARITY", 0.5)
+        response_cache.store(
+            "nutrition", "What should my pet eat?", "alice", "alice: feed X."
+        )
+
+        assert (
+            response_cache.lookup("nutrition", "what should my pet eat now", "bob")
+            is None
+        )
+        assert response_cache.lookup("nutrition", "what should my pet eat now", "alice")
+
+
+class TestCatalogVersion:
+    """petstore.catalog_version on backend errors."""
+
+    @pytest.fixture(autouse=True)
+    def fresh(self, monkeypatch):
+        monkeypatch.delenv("CATALOG_VERSION", raising=False)
+        monkeypatch.setattr(petstore, "_catalog_version", (0.0, ""))
+        monkeypatch.setattr(petstore, "CATALOG_VERSION_TTL", 0.0)
+
+    def test_error_payload_is_not_a_version(self):
+        with patch.object(petstore, "list_foods", return_value={"error": "503"}):
+            assert petstore.catalog_version() == ""
+
+    def test_error_keeps_previous_version(self):
+        with patch.object(petstore, "list_foods", return_value=[{"id": "F1"}]):
+            version = petstore.catalog_version()
+        with patch.object(petstore, "list_foods", return_value={"error": "503"}):
+            assert petstore.catalog_version() == version
+
+    def test_catalog_change_changes_version(self):
+        with patch.object(petstore, "list_foods", return_value=[{"id": "F1"}]):
+            first = petstore.catalog_version()
+        with patch.object(petstore, "list_foods", return_value=[{"id": "F2"}]):
+            assert petstore.catalog_version() != first
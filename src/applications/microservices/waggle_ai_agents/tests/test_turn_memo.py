@@ -0,0 +1,152 @@
+"""Unit tests for turn-scoped read memoisation in common/turn_memo.py."""
+
+import contextvars
+import threading
+from concurrent.futures import Future
+
+import pytest
+
+from waggle_ai_agents.common import turn_memo
+
+
+class _Fetch:
+    """Counts calls and returns (or raises) the next of ``results``."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+@pytest.fixture(autouse=True)
+def enabled(monkeypatch):
+    monkeypatch.setattr(turn_memo, "ENABLED", True)
+
+
+class TestRead:
+    """Test cases for turn_memo.read."""
+
+    def test_outside_a_turn_always_fetches(self):
+        fetch = _Fetch(["a"], ["b"])
+
+        assert turn_memo.read(("pets",), fetch) == ["a"]
+        assert turn_memo.read(("pets",), fetch) == ["b"]
+        assert fetch.calls == 2
+
+    def test_second_read_in_a_turn_is_a_hit(self):
+        fetch = _Fetch(["a"])
+
+        with turn_memo.turn():
+            assert turn_memo.read(("pets",), fetch) == ["a"]
+            assert turn_memo.read(("pets",), fetch) == ["a"]
+
+        assert fetch.calls == 1
+
+    def test_nested_turn_joins_the_outer_memo(self):
+        fetch = _Fetch(["a"])
+
+        with turn_memo.turn():
+            turn_memo.read(("pets",), fetch)
+            with turn_memo.turn():
+                assert turn_memo.read(("pets",), fetch) == ["a"]
+
+        assert fetch.calls == 1
+
+    def test_error_payload_is_not_kept(self):
+        fetch = _Fetch({"error": "503"}, ["a"])
+
+        with turn_memo.turn():
+            assert turn_memo.read(("pets",), fetch) == {"error": "503"}
+            assert turn_memo.read(("pets",), fetch) == ["a"]
+            assert turn_memo.read(("pets",), fetch) == ["a"]
+
+        assert fetch.calls == 2
+
+    def test_exception_propagates_and_the_read_is_made_again(self):
+        fetch = _Fetch(OSError("reset"), ["a"])
+
+        with turn_memo.turn():
+            with pytest.raises(OSError):
+                turn_memo.read(("pets",), fetch)
+            assert turn_memo.read(("pets",), fetch) == ["a"]
+
+        assert fetch.calls == 2
+
+    def test_failed_prefetch_is_refetched(self):
+        prefetch = Future()
+        fetch = _Fetch(["a"])
+
+        with turn_memo.turn():
+            assert turn_memo.offer(("pets",), prefetch)
+            prefetch.set_exception(OSError("reset"))
+            assert turn_memo.read(("pets",), fetch) == ["a"]
+
+        assert fetch.calls == 1
+
+    def test_prefetch_error_payload_is_refetched(self):
+        prefetch = Future()
+        prefetch.set_result({"error": "timeout"})
+        fetch = _Fetch(["a"])
+
+        with turn_memo.turn():
+            turn_memo.offer(("pets",), prefetch)
+            assert turn_memo.read(("pets",), fetch) == ["a"]
+
+        assert fetch.calls == 1
+
+    def test_concurrent_readers_wait_for_the_first(self):
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return ["a"]
+
+        results = []
+        with turn_memo.turn():
+            # tool threads run in a copy of the turn's context
+            context = contextvars.copy_context()
+            first = threading.Thread(
+                target=context.run,
+                args=(lambda: results.append(turn_memo.read(("pets",), fetch)),),
+            )
+            first.start()
+            started.wait(5)
+            release.set()
+            results.append(turn_memo.read(("pets",), fetch))
+            first.join(5)
+
+        assert results == [["a"], ["a"]]
+        assert len(calls) == 1
+
+    def test_invalidate_drops_only_the_named_reads(self):
+        pets, cart = _Fetch(["a"], ["b"]), _Fetch({"items": []})
+
+        with turn_memo.turn():
+            turn_memo.read(("pets",), pets)
+            turn_memo.read(("cart", "alice"), cart)
+            turn_memo.invalidate("pets")
+            assert turn_memo.read(("pets",), pets) == ["b"]
+            assert turn_memo.read(("cart", "alice"), cart) == {"items": []}
+
+        assert (pets.calls, cart.calls) == (2, 1)
+
+
+class TestOffer:
+    """Test cases for turn_memo.offer."""
+
+    def test_no_memo_outside_a_turn(self):
+        assert not turn_memo.offer(("pets",), Future())
+
+    def test_first_offer_wins(self):
+        with turn_memo.turn():
+            assert turn_memo.offer(("pets",), Future())
+            assert not turn_memo.offer(("pets",), Future())
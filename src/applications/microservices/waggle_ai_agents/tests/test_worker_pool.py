@@ -0,0 +1,147 @@
+"""Unit tests for worker recycling in common/worker_pool.py.
+
+Workers are stand-ins with a scripted pipe; no processes are started.
+"""
+
+import threading
+
+import pytest
+
+from waggle_ai_agents.common import worker_pool
+
+
+class _Conn:
+    """The orchestrator's end of a worker pipe, replying from ``replies``."""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.sent = []
+
+    def send(self, message):
+        self.sent.append(message)
+
+    def poll(self, timeout=None):
+        return True
+
+    def recv(self):
+        reply = self.replies.pop(0) if self.replies else EOFError()
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+
+class _Worker:
+    def __init__(self, *replies):
+        self.conn = _Conn(replies)
+        self.served = 0
+        self.healthy = True
+        self.retired = threading.Event()
+
+    def retire(self):
+        self.retired.set()
+
+
+def _answer(*chunks):
+    return [("chunk", chunk) for chunk in chunks] + [("done", None)]
+
+
+@pytest.fixture
+def make_pool(monkeypatch):
+    monkeypatch.setattr(worker_pool, "TIMEOUT", 0.05)
+
+    def make(*workers, max_requests=worker_pool.MAX_REQUESTS):
+        pool = worker_pool.AgentPool("nutrition", len(workers), max_requests)
+        pool._started = True
+        pool.launched = 0
+
+        def launch():
+            pool.launched += 1
+
+        monkeypatch.setattr(pool, "_launch", launch)
+        for worker in workers:
+            pool._idle.put(worker)
+        return pool
+
+    return make
+
+
+class TestStream:
+    """Test cases for AgentPool.stream."""
+
+    def test_answer_is_streamed_and_worker_reused(self, make_pool):
+        worker = _Worker(*_answer("a", "b"))
+        pool = make_pool(worker)
+
+        assert list(pool.stream("q", "alice", streaming=True)) == ["a", "b"]
+        assert worker.conn.sent == [(True, "q", "alice")]
+        assert pool._idle.get_nowait() is worker
+        assert not worker.retired.is_set()
+
+    def test_delegation_error_keeps_the_worker(self, make_pool):
+        worker = _Worker(("error", "ValueError: bad query"))
+        pool = make_pool(worker)
+
+        with pytest.raises(worker_pool.WorkerError, match="bad query"):
+            list(pool.stream("q"))
+        assert pool._idle.get_nowait() is worker
+        assert worker.healthy
+
+    @pytest.mark.parametrize(
+        "replies",
+        [
+            [("chunk", "a"), EOFError()],
+            [("chunk", "a"), ("ready", None)],
+        ],
+        ids=["worker_exited", "out_of_protocol"],
+    )
+    def test_failed_worker_is_retired_and_replaced(self, make_pool, replies):
+        worker = _Worker(*replies)
+        pool = make_pool(worker)
+
+        with pytest.raises(worker_pool.WorkerError):
+            list(pool.stream("q", streaming=True))
+
+        assert worker.retired.wait(5)
+        assert not worker.healthy
+        assert pool.launched == 1
+        assert pool._idle.empty()
+        assert pool.stats()["recycled"] == 1
+
+    def test_caller_stopping_early_retires_the_worker(self, make_pool):
+        worker = _Worker(*_answer("a", "b"))
+        pool = make_pool(worker)
+
+        answer = pool.stream("q", streaming=True)
+        assert next(answer) == "a"
+        answer.close()
+
+        # the rest of the answer is still in its pipe: never reuse it
+        assert worker.retired.wait(5)
+        assert pool._idle.empty()
+
+    def test_worker_retired_after_max_requests(self, make_pool):
+        worker = _Worker(*_answer("a"), *_answer("b"))
+        pool = make_pool(worker, max_requests=2)
+
+        assert list(pool.stream("q")) == ["a"]
+        assert pool._idle.qsize() == 1
+        assert list(pool.stream("q")) == ["b"]
+
+        assert worker.retired.wait(5)
+        assert worker.healthy
+        assert pool.launched == 1
+        assert pool.stats()["served"] == 2
+
+    def test_no_idle_worker_times_out(self, make_pool):
+        pool = make_pool()
+
+        with pytest.raises(worker_pool.WorkerError, match="no idle nutrition worker"):
+            list(pool.stream("q"))
+
+
+class TestPool:
+    """Test cases for the module-level pool registry."""
+
+    def test_unknown_agent(self):
+        with pytest.raises(ValueError, match="unknown agent"):
+            worker_pool.pool("billing")